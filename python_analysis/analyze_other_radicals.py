@@ -8,7 +8,7 @@ from pathlib import Path
 
 from ttc_parser import parse_ttc_csv
 from radical_cooccurrence import RadicalCoOccurrenceMatrix
-from radical_dictionary import get_radical_category, get_radicals, RADICAL_MAP
+from radical_dictionary import get_radical_category, RADICAL_MAP
 
 # Load data
 csv_path = Path(__file__).parent.parent / "public" / "Just Characters-Table 1.csv"
@@ -22,11 +22,10 @@ matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
 radical_counts = Counter()
 radical_to_chars = defaultdict(list)
 
-for char_obj in characters:
-    radicals = get_radicals(char_obj.char)
-    for radical in radicals:
-        radical_counts[radical] += 1
-        radical_to_chars[radical].append(char_obj.char)
+for idx, radical_id in zip(matrix.occurrence_index.tolist(), matrix.radical_ids.tolist()):
+    radical = matrix.unique_radicals[radical_id]
+    radical_counts[radical] += 1
+    radical_to_chars[radical].append(characters.char_vocab[characters.char_ids[idx]])
 
 # Separate by category
 categorized_radicals = defaultdict(list)
@@ -0,0 +1,221 @@
+"""
+Batch translation of the full Dao De Jing text
+Translates every chapter in worker processes and writes the layered results as JSONL
+"""
+
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional
+
+from ttc_parser import parse_ttc_csv, Character, Corpus
+from translation_engine import TranslationEngine
+
+# Engine and settings shared by every task, installed once per worker process
+_STATE = {}
+
+
+def chapter_segments(
+    characters: List[Character],
+    chunk_size: Optional[int] = None
+) -> List[Tuple[int, List[Tuple[int, str]]]]:
+    """
+    Split the text into chapters, and optionally each chapter into segments.
+
+    The CSV has no punctuation, so segments are runs of chunk_size characters
+    rather than clauses.
+
+    Args:
+        characters: Corpus or list of Character objects
+        chunk_size: Characters per segment (default: one segment per chapter)
+
+    Returns:
+        List of (chapter, [(start position, segment text), ...]) in text order
+    """
+    corpus = Corpus.from_characters(characters)
+    chars = corpus.chars
+
+    # Chapters are contiguous runs in text order
+    starts = np.flatnonzero(np.diff(corpus.chapters, prepend=corpus.chapters[0] - 1))
+    ends = np.append(starts[1:], len(corpus))
+
+    chapters = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        step = chunk_size or end - start
+        segments = [
+            (int(corpus.positions[i]), "".join(chars[i:min(i + step, end)]))
+            for i in range(start, end, step)
+        ]
+        chapters.append((int(corpus.chapters[start]), segments))
+
+    return chapters
+
+
+def chapter_coverage(characters: List[Character],
+                     engine: Optional[TranslationEngine] = None) -> pd.DataFrame:
+    """
+    Share of each chapter the translation engine can decompose.
+
+    Args:
+        characters: Corpus or list of Character objects
+        engine: TranslationEngine to check against (default: a new engine)
+
+    Returns:
+        DataFrame with one row per chapter: character count, how many are
+        curated in CHARACTER_OPERATIONS, synthesized from radical_dictionary
+        or missing, and the curated and total coverage ratios
+    """
+    corpus = Corpus.from_characters(characters)
+    engine = engine or TranslationEngine()
+    table = engine.lookup_table(fallback=True)
+
+    # 0 = curated, 1 = synthesized, 2 = missing, per distinct character
+    status = np.array([0 if c in engine.structures else 1 if c in table else 2
+                       for c in corpus.char_vocab], dtype=np.int64)
+
+    chapters, chapter_ids = np.unique(corpus.chapters, return_inverse=True)
+    counts = np.zeros((len(chapters), 3), dtype=np.int64)
+    np.add.at(counts, (chapter_ids, status[corpus.char_ids]), 1)
+    totals = counts.sum(axis=1)
+
+    return pd.DataFrame({
+        'chapter': chapters,
+        'characters': totals,
+        'curated': counts[:, 0],
+        'synthesized': counts[:, 1],
+        'missing': counts[:, 2],
+        'curated_ratio': counts[:, 0] / totals,
+        'coverage_ratio': (counts[:, 0] + counts[:, 1]) / totals,
+    })
+
+
+def _init_worker(layers: Optional[List[str]], output_dir: str, fallback: bool):
+    _STATE['engine'] = TranslationEngine(fallback=fallback)
+    _STATE['layers'] = layers
+    _STATE['output_dir'] = Path(output_dir)
+
+
+def _translate_chapter(task: Tuple[int, List[Tuple[int, str]]]) -> Dict:
+    """
+    Translate one chapter and write it as JSONL, one line per segment.
+
+    Args:
+        task: (chapter, [(start position, segment text), ...])
+
+    Returns:
+        Timing record for the chapter
+    """
+    chapter, segments = task
+    engine = _STATE['engine']
+    path = _STATE['output_dir'] / f"chapter_{chapter:03d}.jsonl"
+
+    start = time.perf_counter()
+    texts = (text for _, text in segments)
+    with open(path, 'w', encoding='utf-8') as f:
+        for (position, _), (text, layers) in zip(
+                segments, engine.iter_translations(texts, layers=_STATE['layers'])):
+            record = {
+                'chapter': chapter,
+                'start_position': position,
+                'text': text,
+                'layers': {layer.level: layer.content for layer in layers},
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    elapsed = time.perf_counter() - start
+
+    return {
+        'chapter': chapter,
+        'characters': sum(len(text) for _, text in segments),
+        'segments': len(segments),
+        'seconds': elapsed,
+        'path': str(path),
+    }
+
+
+def translate_corpus(
+    characters: List[Character],
+    output_dir: Optional[str] = None,
+    layers: Optional[List[str]] = None,
+    chunk_size: Optional[int] = None,
+    n_workers: Optional[int] = None,
+    fallback: bool = False
+) -> pd.DataFrame:
+    """
+    Translate the whole text chapter by chapter across worker processes.
+
+    Each chapter is written to output_dir/chapter_NNN.jsonl, one JSON object
+    per segment with its chapter, start position, text and layer contents.
+
+    Args:
+        characters: Corpus or list of Character objects
+        output_dir: Directory for the JSONL files (default: output/translations)
+        layers: Layer levels to build (default: all)
+        chunk_size: Characters per segment (default: whole chapters)
+        n_workers: Worker processes (default: CPU count; 1 runs in-process)
+        fallback: Translate characters outside CHARACTER_OPERATIONS with
+            structures synthesized from radical_dictionary
+
+    Returns:
+        DataFrame with one row per chapter: characters, segments, seconds
+        spent translating and writing, output path and coverage (see
+        chapter_coverage)
+    """
+    if output_dir is None:
+        output_dir = Path(__file__).parent / "output" / "translations"
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tasks = chapter_segments(characters, chunk_size)
+    engine = TranslationEngine(fallback=fallback)
+    if layers is not None:
+        # Fail on unknown layer names here rather than inside every worker
+        engine.translate_multilayer("", layers=layers)
+
+    # Synthesizing here also writes the fallback cache before workers read it
+    coverage = chapter_coverage(characters, engine)
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(tasks))
+    if n_workers <= 1:
+        _init_worker(layers, str(output_dir), fallback)
+        results = [_translate_chapter(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(layers, str(output_dir), fallback)) as executor:
+            chunks = max(1, len(tasks) // (4 * n_workers))
+            results = list(executor.map(_translate_chapter, tasks, chunksize=chunks))
+
+    timing = pd.DataFrame(results, columns=['chapter', 'characters', 'segments', 'seconds', 'path'])
+    return timing.merge(coverage.drop(columns='characters'), on='chapter', how='left')
+
+
+if __name__ == "__main__":
+    csv_path = Path(__file__).parent.parent / "public" / "Just Characters-Table 1.csv"
+    print("Loading Dao De Jing data...")
+    characters = parse_ttc_csv(str(csv_path))
+
+    print("Translating full text...")
+    start = time.perf_counter()
+    timing = translate_corpus(characters, fallback=True)
+    elapsed = time.perf_counter() - start
+
+    print(f"Translated {timing['characters'].sum()} characters in {len(timing)} chapters "
+          f"in {elapsed:.2f}s on {os.cpu_count()} CPU(s)")
+    print(f"Per-chapter time: mean {timing['seconds'].mean() * 1000:.2f} ms, "
+          f"max {timing['seconds'].max() * 1000:.2f} ms")
+
+    # Curated entries only cover part of the text; synthesized ones fill most gaps
+    total = timing['characters'].sum()
+    print(f"Coverage: {timing['curated'].sum() / total:.1%} curated, "
+          f"{timing['synthesized'].sum() / total:.1%} synthesized, "
+          f"{timing['missing'].sum() / total:.1%} missing")
+    print("\nLeast covered chapters:")
+    print(timing.sort_values('coverage_ratio')[
+        ['chapter', 'characters', 'curated_ratio', 'coverage_ratio']].head(5).to_string(index=False))
+    print("\nSlowest chapters:")
+    print(timing.sort_values('seconds', ascending=False)[
+        ['chapter', 'characters', 'segments', 'seconds']].head(5).to_string(index=False))
+    print(f"\nWrote {len(timing)} files to {Path(timing['path'].iloc[0]).parent}/")
@@ -0,0 +1,95 @@
+"""
+Benchmark the vectorized co-occurrence engine against the original nested loop
+Verifies both produce the same matrix and reports timings per window size
+"""
+
+import time
+import numpy as np
+from collections import defaultdict
+from pathlib import Path
+
+from ttc_parser import parse_ttc_csv
+from radical_cooccurrence import RadicalCoOccurrenceMatrix, window_sensitivity_sweep
+from cooccurrence_engine import count_window_cooccurrences
+
+
+def loop_cooccurrence_counts(radical_occurrences, unique_radicals, window_size):
+    """
+    Reference implementation: the original nested-loop matrix build.
+
+    Args:
+        radical_occurrences: List of RadicalOccurrence objects
+        unique_radicals: Sorted list of unique radicals
+        window_size: Characters within ±window_size are considered co-occurring
+
+    Returns:
+        Symmetric numpy array of co-occurrence counts
+    """
+    pair_counts = defaultdict(int)
+
+    for i, occ1 in enumerate(radical_occurrences):
+        for j in range(i + 1, len(radical_occurrences)):
+            occ2 = radical_occurrences[j]
+            distance = abs(occ2.global_position - occ1.global_position)
+            if distance > window_size:
+                break
+            if occ1.global_position == occ2.global_position:
+                continue
+            radical_pair = tuple(sorted([occ1.radical, occ2.radical]))
+            pair_counts[radical_pair] += 1
+
+    n = len(unique_radicals)
+    matrix_data = np.zeros((n, n), dtype=int)
+    for (rad1, rad2), count in pair_counts.items():
+        idx1 = unique_radicals.index(rad1)
+        idx2 = unique_radicals.index(rad2)
+        matrix_data[idx1, idx2] = count
+        matrix_data[idx2, idx1] = count
+
+    return matrix_data
+
+
+def best_time(func, repeats: int = 5) -> float:
+    """Return the best wall-clock time of several runs, in seconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    csv_path = Path(__file__).parent.parent / "public" / "Just Characters-Table 1.csv"
+    print("Loading Dao De Jing data...")
+    characters = parse_ttc_csv(str(csv_path))
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    n = len(matrix.unique_radicals)
+    print(f"{len(characters)} characters, {len(matrix.radical_occurrences)} radical occurrences, "
+          f"{n} radicals\n")
+
+    print(f"{'window':>6}  {'loop (ms)':>10}  {'vectorized (ms)':>16}  {'speedup':>8}  match")
+    for window_size in [1, 5, 10, 20]:
+        expected = loop_cooccurrence_counts(matrix.radical_occurrences, matrix.unique_radicals,
+                                            window_size)
+        actual = count_window_cooccurrences(matrix.radical_ids, matrix.occurrence_positions,
+                                            n, window_size)
+
+        loop_time = best_time(lambda: loop_cooccurrence_counts(
+            matrix.radical_occurrences, matrix.unique_radicals, window_size), repeats=3)
+        vector_time = best_time(lambda: count_window_cooccurrences(
+            matrix.radical_ids, matrix.occurrence_positions, n, window_size))
+
+        match = "✓" if np.array_equal(expected, actual) else "✗"
+        print(f"{window_size:>6}  {loop_time * 1000:>10.1f}  {vector_time * 1000:>16.2f}  "
+              f"{loop_time / vector_time:>7.1f}x  {match}")
+
+    # Window-sensitivity sweep: one histogram pass vs. one rebuild per window
+    sweep = list(range(1, 21))
+    rebuild_time = best_time(lambda: [RadicalCoOccurrenceMatrix(characters, window_size=w)
+                                      for w in sweep], repeats=3)
+    sweep_time = best_time(lambda: window_sensitivity_sweep(characters, sweep), repeats=3)
+    print(f"\nWindow sweep 1..20: {rebuild_time * 1000:.1f} ms rebuilding, "
+          f"{sweep_time * 1000:.1f} ms from one distance histogram "
+          f"({rebuild_time / sweep_time:.1f}x)")
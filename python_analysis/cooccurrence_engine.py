@@ -0,0 +1,364 @@
+"""
+Vectorized co-occurrence engine for radical analysis
+Counts window pairs over integer-encoded radical occurrences with shifted-array passes
+"""
+
+import numpy as np
+from scipy import sparse
+from typing import List, Dict, Tuple, Optional, Callable
+
+
+def expand_radicals(char_ids: np.ndarray, indptr: np.ndarray,
+                    indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expand a sequence of characters into one entry per radical occurrence.
+
+    Args:
+        char_ids: Character id of each text entry
+        indptr: Row pointers of the character → radical table
+        indices: Radical ids of the character → radical table
+
+    Returns:
+        Tuple of (entry index of each occurrence, radical id of each
+        occurrence), in text order with a character's radicals in table order
+    """
+    starts = indptr[char_ids]
+    counts = indptr[char_ids + 1] - starts
+    entry_index = np.repeat(np.arange(len(char_ids), dtype=np.int64), counts)
+
+    # Offset of each occurrence within its character's radical list
+    group_starts = np.repeat(np.cumsum(counts) - counts, counts)
+    offsets = np.arange(len(entry_index), dtype=np.int64) - group_starts
+    radical_ids = indices[np.repeat(starts, counts) + offsets]
+
+    return entry_index, radical_ids
+
+
+def window_pair_indices(positions: np.ndarray, window_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find every pair of occurrences that fall within the co-occurrence window.
+
+    Occurrences must be sorted by position. Pairs are compared by shifting the
+    position array against itself one offset at a time, so each pass is a single
+    vectorized comparison. Occurrences at the same position (radicals of the same
+    character) are never paired.
+
+    Args:
+        positions: Global position of each occurrence, in ascending order
+        window_size: Occurrences within ±window_size positions co-occur
+
+    Returns:
+        Tuple of (left occurrence indices, right occurrence indices), ordered
+        the same way as a nested left-to-right scan
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    lefts = []
+    rights = []
+
+    for offset in range(1, len(positions)):
+        distance = positions[offset:] - positions[:-offset]
+
+        # Distances only grow with the offset, so once nothing is left inside
+        # the window no larger offset can contribute either
+        in_window = distance <= window_size
+        if not in_window.any():
+            break
+
+        left = np.flatnonzero(in_window & (distance > 0))
+        lefts.append(left)
+        rights.append(left + offset)
+
+    if not lefts:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    left = np.concatenate(lefts)
+    right = np.concatenate(rights)
+    order = np.lexsort((right, left))
+
+    return left[order], right[order]
+
+
+def count_pairs(radical_ids: np.ndarray, left: np.ndarray, right: np.ndarray,
+                n_radicals: int) -> np.ndarray:
+    """
+    Accumulate occurrence pairs into a symmetric radical × radical count matrix.
+
+    Args:
+        radical_ids: Radical id of each occurrence
+        left: Left occurrence index of each pair
+        right: Right occurrence index of each pair
+        n_radicals: Number of distinct radical ids
+
+    Returns:
+        Symmetric (n_radicals, n_radicals) integer array of pair counts
+    """
+    a = radical_ids[left]
+    b = radical_ids[right]
+    low = np.minimum(a, b)
+    high = np.maximum(a, b)
+
+    counts = np.bincount(low * n_radicals + high, minlength=n_radicals * n_radicals)
+    counts = counts.reshape(n_radicals, n_radicals).astype(int)
+
+    # Mirror the upper triangle; the diagonal is already a single count
+    return counts + counts.T - np.diag(np.diag(counts))
+
+
+def count_pairs_sparse(radical_ids: np.ndarray, left: np.ndarray, right: np.ndarray,
+                       n_radicals: int) -> sparse.csr_matrix:
+    """
+    Accumulate occurrence pairs into a symmetric sparse count matrix.
+
+    Only radical pairs that actually co-occur are stored, so memory grows with
+    the number of distinct co-occurring pairs rather than with n_radicals².
+
+    Args:
+        radical_ids: Radical id of each occurrence
+        left: Left occurrence index of each pair
+        right: Right occurrence index of each pair
+        n_radicals: Number of distinct radical ids
+
+    Returns:
+        Symmetric (n_radicals, n_radicals) CSR matrix of pair counts
+    """
+    a = radical_ids[left]
+    b = radical_ids[right]
+    codes, counts = np.unique(np.minimum(a, b) * n_radicals + np.maximum(a, b),
+                              return_counts=True)
+    rows, cols = np.divmod(codes, n_radicals)
+
+    # Mirror off-diagonal entries; diagonal entries are stored once
+    off_diagonal = rows != cols
+    data = np.concatenate([counts, counts[off_diagonal]]).astype(int)
+    rows, cols = (np.concatenate([rows, cols[off_diagonal]]),
+                  np.concatenate([cols, rows[off_diagonal]]))
+
+    return sparse.csr_matrix((data, (rows, cols)), shape=(n_radicals, n_radicals))
+
+
+def count_window_cooccurrences(radical_ids: np.ndarray, positions: np.ndarray,
+                               n_radicals: int, window_size: int) -> np.ndarray:
+    """
+    Count radical co-occurrences within ±window_size positions.
+
+    Args:
+        radical_ids: Radical id of each occurrence
+        positions: Global position of each occurrence, in ascending order
+        n_radicals: Number of distinct radical ids
+        window_size: Occurrences within ±window_size positions co-occur
+
+    Returns:
+        Symmetric (n_radicals, n_radicals) integer array of co-occurrence counts
+    """
+    left, right = window_pair_indices(positions, window_size)
+    return count_pairs(radical_ids, left, right, n_radicals)
+
+
+def distance_histogram(radical_ids: np.ndarray, positions: np.ndarray,
+                       n_radicals: int, max_distance: int,
+                       segment_ids: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Count radical co-occurrences separately for every distance up to max_distance.
+
+    One pass over the occurrence pairs within the largest window fills the whole
+    histogram; the matrix for any smaller window is a cumulative sum away
+    (see window_stack).
+
+    Args:
+        radical_ids: Radical id of each occurrence
+        positions: Global position of each occurrence, in ascending order
+        n_radicals: Number of distinct radical ids
+        max_distance: Largest distance to record
+        segment_ids: Optional segment (e.g. clause) of each occurrence; pairs
+            in different segments are not counted
+
+    Returns:
+        Integer array of shape (n_radicals, n_radicals, max_distance), symmetric
+        in the first two axes, where [:, :, d - 1] counts pairs exactly d apart
+    """
+    left, right = window_pair_indices(positions, max_distance)
+    if segment_ids is not None:
+        same_segment = segment_ids[left] == segment_ids[right]
+        left, right = left[same_segment], right[same_segment]
+    distance = positions[right] - positions[left]
+
+    a = radical_ids[left]
+    b = radical_ids[right]
+    codes = (np.minimum(a, b) * n_radicals + np.maximum(a, b)) * max_distance + (distance - 1)
+
+    counts = np.bincount(codes, minlength=n_radicals * n_radicals * max_distance)
+    counts = counts.reshape(n_radicals, n_radicals, max_distance).astype(int)
+
+    # Mirror the upper triangle at every distance, keeping the diagonal single
+    diagonal = np.arange(n_radicals)
+    mirrored = counts + counts.transpose(1, 0, 2)
+    mirrored[diagonal, diagonal, :] = counts[diagonal, diagonal, :]
+
+    return mirrored
+
+
+def chapter_pair_counts(radical_ids: np.ndarray, positions: np.ndarray, chapter_ids: np.ndarray,
+                        n_chapters: int, n_radicals: int, window_size: int) -> np.ndarray:
+    """
+    Co-occurrence counts split by chapter.
+
+    Each pair is attributed to the chapter of its earlier occurrence, so pairs
+    that straddle a chapter boundary are counted once and the chapter slices
+    sum to the whole-text matrix.
+
+    Args:
+        radical_ids: Radical id of each occurrence
+        positions: Global position of each occurrence, in ascending order
+        chapter_ids: Chapter index (0..n_chapters-1) of each occurrence
+        n_chapters: Number of chapters
+        n_radicals: Number of distinct radical ids
+        window_size: Occurrences within ±window_size positions co-occur
+
+    Returns:
+        Integer array of shape (n_chapters, n_radicals, n_radicals), symmetric
+        in the last two axes
+    """
+    left, right = window_pair_indices(positions, window_size)
+
+    a = radical_ids[left]
+    b = radical_ids[right]
+    codes = (chapter_ids[left] * n_radicals + np.minimum(a, b)) * n_radicals + np.maximum(a, b)
+
+    counts = np.bincount(codes, minlength=n_chapters * n_radicals * n_radicals)
+    counts = counts.reshape(n_chapters, n_radicals, n_radicals).astype(int)
+
+    # Mirror the upper triangle in every chapter, keeping the diagonal single
+    diagonal = np.arange(n_radicals)
+    mirrored = counts + counts.transpose(0, 2, 1)
+    mirrored[:, diagonal, diagonal] = counts[:, diagonal, diagonal]
+
+    return mirrored
+
+
+def window_stack(histogram: np.ndarray, window_sizes: List[int]) -> np.ndarray:
+    """
+    Co-occurrence matrices for several window sizes from one distance histogram.
+
+    Args:
+        histogram: Output of distance_histogram
+        window_sizes: Window sizes, each at most the histogram's max distance
+
+    Returns:
+        Integer array of shape (len(window_sizes), n_radicals, n_radicals)
+    """
+    max_distance = histogram.shape[2]
+    if any(w > max_distance for w in window_sizes):
+        raise ValueError(f"Window sizes must be at most {max_distance} for this histogram")
+
+    # cumulative[..., w] is the matrix for window w (index 0 is the empty window)
+    cumulative = np.zeros(histogram.shape[:2] + (max_distance + 1,), dtype=histogram.dtype)
+    np.cumsum(histogram, axis=2, out=cumulative[:, :, 1:])
+
+    return np.moveaxis(cumulative[:, :, [max(w, 0) for w in window_sizes]], 2, 0)
+
+
+def count_entry_pairs(char_ids: np.ndarray, left: np.ndarray, right: np.ndarray,
+                      indptr: np.ndarray, indices: np.ndarray, n_radicals: int) -> np.ndarray:
+    """
+    Radical co-occurrence counts contributed by a set of character-level pairs.
+
+    Each (left, right) entry pair contributes every combination of the left
+    character's radicals with the right character's radicals, exactly as the
+    occurrence pairs between those two positions do in count_pairs.
+
+    Args:
+        char_ids: Character id of each text entry
+        left: Left entry index of each pair
+        right: Right entry index of each pair
+        indptr: Row pointers of the character → radical table
+        indices: Radical ids of the character → radical table
+        n_radicals: Number of distinct radical ids
+
+    Returns:
+        Symmetric (n_radicals, n_radicals) integer array of pair counts
+    """
+    n_pairs = len(left)
+    left_pair, left_radicals = expand_radicals(char_ids[left], indptr, indices)
+    right_pair, right_radicals = expand_radicals(char_ids[right], indptr, indices)
+
+    # Join every left occurrence with the right occurrences of the same pair
+    right_counts = np.bincount(right_pair, minlength=n_pairs)
+    right_starts = np.cumsum(right_counts) - right_counts
+    repeats = right_counts[left_pair]
+    join_left = np.repeat(np.arange(len(left_pair)), repeats)
+    offsets = np.arange(len(join_left)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    join_right = np.repeat(right_starts[left_pair], repeats) + offsets
+
+    radical_ids = np.concatenate([left_radicals, right_radicals])
+    return count_pairs(radical_ids, join_left, len(left_radicals) + join_right, n_radicals)
+
+
+def _uniform_kernel(distance: np.ndarray) -> np.ndarray:
+    return np.ones(len(distance))
+
+
+def _exponential_kernel(distance: np.ndarray, scale: float = 2.0) -> np.ndarray:
+    return np.exp(-distance / scale)
+
+
+def _inverse_kernel(distance: np.ndarray, power: float = 1.0) -> np.ndarray:
+    return distance ** -power
+
+
+def _gaussian_kernel(distance: np.ndarray, sigma: float = 2.0) -> np.ndarray:
+    return np.exp(-distance ** 2 / (2 * sigma ** 2))
+
+
+# Distance-decay kernels: weight of a pair d positions apart, for d = 1..max
+DECAY_KERNELS: Dict[str, Callable[..., np.ndarray]] = {
+    'uniform': _uniform_kernel,
+    'exponential': _exponential_kernel,
+    'inverse': _inverse_kernel,
+    'gaussian': _gaussian_kernel,
+}
+
+
+def register_kernel(name: str, kernel: Callable[..., np.ndarray]):
+    """
+    Add a distance-decay kernel.
+
+    Args:
+        name: Kernel name used by kernel_weights
+        kernel: Function mapping an array of distances (1..max) and keyword
+            parameters to an array of pair weights
+    """
+    DECAY_KERNELS[name] = kernel
+
+
+def kernel_weights(kernel: str, max_distance: int, **params) -> np.ndarray:
+    """
+    Weight of each distance 1..max_distance under a kernel.
+
+    Args:
+        kernel: Name in DECAY_KERNELS
+        max_distance: Largest distance
+        **params: Kernel parameters (e.g. scale, power, sigma)
+
+    Returns:
+        Float array of length max_distance
+    """
+    if kernel not in DECAY_KERNELS:
+        raise ValueError(f"Unknown kernel: {kernel!r} (expected one of {sorted(DECAY_KERNELS)})")
+
+    distance = np.arange(1, max_distance + 1, dtype=float)
+    return np.asarray(DECAY_KERNELS[kernel](distance, **params), dtype=float)
+
+
+def weighted_cooccurrences(histogram: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Distance-weighted co-occurrence matrix from a distance histogram.
+
+    Args:
+        histogram: Output of distance_histogram
+        weights: Weight per distance 1..histogram.shape[2] (see kernel_weights)
+
+    Returns:
+        Symmetric (n_radicals, n_radicals) float array
+    """
+    return histogram @ weights
@@ -0,0 +1,230 @@
+"""
+Positional inverted index over the parsed Dao De Jing text
+Maps characters, radicals and radical categories to sorted position arrays
+"""
+
+import numpy as np
+from typing import List, Tuple
+from weakref import WeakKeyDictionary
+
+from ttc_parser import Corpus, Character
+from radical_dictionary import get_radical_category, dictionary_version
+
+
+class PostingLists:
+    """
+    Sorted entry lists for a set of keys, stored as one CSR-style array.
+
+    Each key owns a contiguous run of entry indices, ordered by position, so
+    lookups are a dict access plus a slice and range queries are a binary search.
+    """
+
+    def __init__(self, keys: List[str], key_ids: np.ndarray, positions: np.ndarray):
+        """
+        Args:
+            keys: Key name for each key id
+            key_ids: Key id of each entry
+            positions: Global position of each entry (non-decreasing)
+        """
+        self.keys = keys
+        self._key_to_id = {key: idx for idx, key in enumerate(keys)}
+
+        # A stable sort keeps each key's entries in position order
+        self.entries = np.argsort(key_ids, kind='stable')
+        self.positions = positions[self.entries]
+
+        counts = np.bincount(key_ids, minlength=len(keys))
+        self.indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        self.indptr[1:] = np.cumsum(counts)
+
+    def _span(self, key: str) -> slice:
+        key_id = self._key_to_id.get(key)
+        if key_id is None:
+            return slice(0, 0)
+        return slice(self.indptr[key_id], self.indptr[key_id + 1])
+
+    def __contains__(self, key: str) -> bool:
+        span = self._span(key)
+        return span.stop > span.start
+
+    def count(self, key: str) -> int:
+        """Number of entries for a key."""
+        span = self._span(key)
+        return int(span.stop - span.start)
+
+    def get_entries(self, key: str) -> np.ndarray:
+        """Entry indices for a key, in position order."""
+        return self.entries[self._span(key)]
+
+    def get_positions(self, key: str) -> np.ndarray:
+        """Global positions for a key, sorted (repeats if one position has several entries)."""
+        return self.positions[self._span(key)]
+
+    def count_in_range(self, key: str, start: int, end: int) -> int:
+        """Number of entries for a key with start <= position <= end."""
+        positions = self.get_positions(key)
+        return int(np.searchsorted(positions, end, side='right') -
+                   np.searchsorted(positions, start, side='left'))
+
+    def first_entry_after(self, key: str, entry: int) -> int:
+        """First entry index for a key greater than `entry`, or -1 if there is none."""
+        entries = self.get_entries(key)
+        idx = np.searchsorted(entries, entry, side='right')
+        return int(entries[idx]) if idx < len(entries) else -1
+
+
+class CorpusIndex:
+    """
+    Inverted index over a corpus, built once and queried many times.
+
+    Characters map to corpus entries; radicals and radical categories map to
+    radical occurrences (see Corpus.radical_occurrences). Every posting list
+    is sorted by global position, so position, count and window queries are
+    answered with binary search instead of rescanning the text.
+    """
+
+    def __init__(self, characters: List[Character]):
+        """
+        Args:
+            characters: Corpus or list of Character objects
+        """
+        self.corpus = Corpus.from_characters(characters)
+        corpus = self.corpus
+
+        self.chars = PostingLists(corpus.char_vocab, corpus.char_ids, corpus.global_positions)
+
+        indptr, indices, _ = corpus.radical_table()
+        self.occurrence_index, self.radical_ids, self.unique_radicals = corpus.radical_occurrences()
+
+        # Radicals of each distinct character, in dictionary order
+        self.char_radicals = [
+            [self.unique_radicals[r] for r in indices[indptr[c]:indptr[c + 1]].tolist()]
+            for c in range(len(corpus.char_vocab))
+        ]
+
+        self.occurrence_positions = corpus.global_positions[self.occurrence_index]
+        self.radicals = PostingLists(self.unique_radicals, self.radical_ids,
+                                     self.occurrence_positions)
+
+        radical_categories = [get_radical_category(r) for r in self.unique_radicals]
+        self.category_names = sorted(set(radical_categories))
+        category_to_id = {category: idx for idx, category in enumerate(self.category_names)}
+        radical_to_category_id = np.array([category_to_id[c] for c in radical_categories],
+                                          dtype=np.int64)
+        self.occurrence_categories = radical_to_category_id[self.radical_ids]
+        self.categories = PostingLists(self.category_names, self.occurrence_categories,
+                                       self.occurrence_positions)
+
+    def _postings(self, kind: str) -> PostingLists:
+        if kind == 'char':
+            return self.chars
+        if kind == 'radical':
+            return self.radicals
+        if kind == 'category':
+            return self.categories
+        raise ValueError(f"Unknown index kind: {kind!r} (expected 'char', 'radical' or 'category')")
+
+    def positions(self, key: str, kind: str = 'char') -> np.ndarray:
+        """
+        Sorted global positions where a character, radical or category appears.
+
+        Args:
+            key: Character, radical or category name
+            kind: 'char', 'radical' or 'category'
+
+        Returns:
+            Sorted array of distinct global positions
+        """
+        positions = self._postings(kind).get_positions(key)
+        if kind == 'char':
+            return positions
+        return np.unique(positions)
+
+    def count(self, key: str, kind: str = 'char') -> int:
+        """
+        Number of occurrences of a character, radical or category.
+
+        Args:
+            key: Character, radical or category name
+            kind: 'char', 'radical' or 'category'
+
+        Returns:
+            Occurrence count (radicals appearing twice in a character count twice)
+        """
+        return self._postings(kind).count(key)
+
+    def count_in_window(self, key: str, center: int, window_size: int, kind: str = 'char') -> int:
+        """Occurrences of a key within ±window_size positions of `center` (inclusive)."""
+        return self._postings(kind).count_in_range(key, center - window_size, center + window_size)
+
+    def entry_positions(self, char: str) -> List[Tuple[int, int]]:
+        """(chapter, position) of every occurrence of a character."""
+        entries = self.chars.get_entries(char)
+        return list(zip(self.corpus.chapters[entries].tolist(),
+                        self.corpus.positions[entries].tolist()))
+
+    def window_bounds(self, center: int, window_size: int) -> Tuple[int, int]:
+        """Corpus entry range [start, end) covering ±window_size positions of `center`."""
+        global_positions = self.corpus.global_positions
+        start = np.searchsorted(global_positions, center - window_size, side='left')
+        end = np.searchsorted(global_positions, center + window_size, side='right')
+        return int(start), int(end)
+
+    def neighbourhood(self, char: str, window_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Corpus entries within ±window_size positions of every occurrence of a character.
+
+        Args:
+            char: Target character
+            window_size: Number of positions before and after
+
+        Returns:
+            Tuple of (target entry index, neighbour entry index) arrays, one row
+            per neighbour, ordered by target then neighbour. The target entry
+            itself is excluded.
+        """
+        targets = self.chars.get_entries(char)
+        centers = self.corpus.global_positions[targets]
+        global_positions = self.corpus.global_positions
+
+        starts = np.searchsorted(global_positions, centers - window_size, side='left')
+        ends = np.searchsorted(global_positions, centers + window_size, side='right')
+        lengths = ends - starts
+
+        target_rows = np.repeat(targets, lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        neighbours = np.repeat(starts, lengths) + offsets
+
+        keep = neighbours != target_rows
+        return target_rows[keep], neighbours[keep]
+
+
+# (dictionary version, index) built by get_index(), kept alive only as long
+# as their corpus
+_INDEX_CACHE = WeakKeyDictionary()
+
+
+def get_index(characters: List[Character]) -> CorpusIndex:
+    """
+    Return the CorpusIndex for a corpus, building it on first use.
+
+    Indexes are cached per Corpus object, so repeated queries against the same
+    parsed text share one index, and rebuilt when the radical dictionary is
+    changed through its register_* functions. Plain lists of Character
+    objects get a fresh index on every call.
+
+    Args:
+        characters: Corpus or list of Character objects
+
+    Returns:
+        CorpusIndex over the characters
+    """
+    if not isinstance(characters, Corpus):
+        return CorpusIndex(characters)
+
+    version = dictionary_version()
+    cached = _INDEX_CACHE.get(characters)
+    if cached is None or cached[0] != version:
+        cached = (version, CorpusIndex(characters))
+        _INDEX_CACHE[characters] = cached
+    return cached[1]
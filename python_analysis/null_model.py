@@ -0,0 +1,274 @@
+"""
+Permutation null models for radical co-occurrence enrichment
+Rebuilds the co-occurrence matrix over shuffled texts to get empirical z-scores and p-values
+"""
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Tuple, Optional
+
+from ttc_parser import parse_ttc_csv
+from radical_cooccurrence import RadicalCoOccurrenceMatrix
+from cooccurrence_engine import expand_radicals, window_pair_indices, count_pairs
+
+NULL_MODES = ('shuffle', 'circular')
+
+# Arrays shared by every permutation, installed once per worker process
+_STATE = {}
+
+
+def _null_state(matrix: RadicalCoOccurrenceMatrix, mode: str) -> Dict:
+    """
+    Integer arrays a worker needs to rebuild the matrix under a null model.
+
+    Args:
+        matrix: RadicalCoOccurrenceMatrix object
+        mode: 'shuffle' or 'circular'
+
+    Returns:
+        Dictionary of arrays and settings
+    """
+    corpus = matrix.corpus
+    if corpus is None:
+        raise ValueError("Null models need the source text, which matrices built "
+                         "with from_counts() do not keep")
+
+    state = {
+        'mode': mode,
+        'window_size': matrix.window_size,
+        'n_radicals': len(matrix.unique_radicals),
+        'observed': (matrix.counts.toarray() if sparse.issparse(matrix.counts)
+                     else matrix.counts),
+    }
+
+    if mode == 'shuffle':
+        indptr, indices, unique_radicals = corpus.radical_table()
+        if unique_radicals != matrix.unique_radicals:
+            raise ValueError("The radical dictionary has changed since the matrix was built")
+        state.update(
+            char_ids=corpus.char_ids.astype(np.int64),
+            chapters=corpus.chapters,
+            global_positions=corpus.global_positions,
+            indptr=indptr,
+            indices=indices,
+        )
+    else:
+        # Chapters are contiguous runs of global positions
+        chapter_values, first_entry, chapter_lengths = np.unique(
+            corpus.chapters, return_index=True, return_counts=True)
+        occurrence_chapters = np.searchsorted(chapter_values,
+                                              corpus.chapters[matrix.occurrence_index])
+        state.update(
+            radical_ids=matrix.radical_ids,
+            positions=matrix.occurrence_positions,
+            occurrence_chapters=occurrence_chapters,
+            chapter_starts=corpus.global_positions[first_entry],
+            chapter_lengths=chapter_lengths,
+        )
+
+    return state
+
+
+def _init_worker(state: Dict):
+    _STATE.clear()
+    _STATE.update(state)
+
+
+def _shuffle_counts(state: Dict, rng: np.random.Generator) -> np.ndarray:
+    """Matrix for the text with characters permuted within each chapter."""
+    # Chapters are sorted, so a random tie-breaker permutes inside each chapter only
+    order = np.lexsort((rng.random(len(state['char_ids'])), state['chapters']))
+    entry_index, radical_ids = expand_radicals(state['char_ids'][order],
+                                               state['indptr'], state['indices'])
+
+    positions = state['global_positions'][entry_index]
+    left, right = window_pair_indices(positions, state['window_size'])
+    return count_pairs(radical_ids, left, right, state['n_radicals'])
+
+
+def _circular_counts(state: Dict, rng: np.random.Generator) -> np.ndarray:
+    """Matrix with every radical's track rotated by its own offset within each chapter."""
+    lengths = state['chapter_lengths']
+    offsets = rng.integers(0, lengths, size=(state['n_radicals'], len(lengths)))
+
+    chapters = state['occurrence_chapters']
+    radical_ids = state['radical_ids']
+    starts = state['chapter_starts'][chapters]
+    shifted = starts + (state['positions'] - starts + offsets[radical_ids, chapters]) % lengths[chapters]
+
+    order = np.argsort(shifted, kind='stable')
+    left, right = window_pair_indices(shifted[order], state['window_size'])
+    return count_pairs(radical_ids[order], left, right, state['n_radicals'])
+
+
+def _simulate_chunk(task: Tuple[np.random.SeedSequence, int]) -> Tuple[np.ndarray, ...]:
+    """
+    Run a block of permutations and return their running sums.
+
+    Args:
+        task: (seed sequence for this block, number of permutations)
+
+    Returns:
+        Tuple of (sum, sum of squares, count >= observed, count <= observed)
+    """
+    seed_sequence, n_permutations = task
+    state = _STATE
+    rng = np.random.default_rng(seed_sequence)
+    simulate = _shuffle_counts if state['mode'] == 'shuffle' else _circular_counts
+
+    observed = state['observed']
+    total = np.zeros(observed.shape, dtype=np.float64)
+    total_sq = np.zeros(observed.shape, dtype=np.float64)
+    at_least = np.zeros(observed.shape, dtype=np.int64)
+    at_most = np.zeros(observed.shape, dtype=np.int64)
+
+    for _ in range(n_permutations):
+        counts = simulate(state, rng)
+        total += counts
+        total_sq += counts.astype(np.float64) ** 2
+        at_least += counts >= observed
+        at_most += counts <= observed
+
+    return total, total_sq, at_least, at_most
+
+
+def simulate_null(
+    matrix: RadicalCoOccurrenceMatrix,
+    mode: str = 'shuffle',
+    n_permutations: int = 1000,
+    seed: int = 0,
+    n_workers: Optional[int] = None,
+    chunk_size: int = 100
+) -> Dict[str, np.ndarray]:
+    """
+    Rebuild the co-occurrence matrix many times under a null model.
+
+    'shuffle' permutes characters within each chapter, which keeps chapter
+    composition but breaks local order. 'circular' rotates each radical's
+    occurrences by a random offset within each chapter, which also keeps
+    each radical's clumping and only breaks the alignment between radicals.
+
+    Permutations are split into fixed-size chunks, each seeded from
+    SeedSequence(seed).spawn(), so results depend on the seed but not on the
+    number of worker processes.
+
+    Args:
+        matrix: RadicalCoOccurrenceMatrix object
+        mode: 'shuffle' or 'circular'
+        n_permutations: Number of null matrices to build
+        seed: Random seed
+        n_workers: Worker processes (default: CPU count; 1 runs in-process)
+        chunk_size: Permutations per task
+
+    Returns:
+        Dictionary of (n_radicals, n_radicals) arrays: 'observed', 'mean',
+        'std', 'z_score', 'p_enriched' and 'p_depleted'
+    """
+    if mode not in NULL_MODES:
+        raise ValueError(f"Unknown null model: {mode!r} (expected one of {NULL_MODES})")
+    if n_permutations < 2:
+        raise ValueError("n_permutations must be at least 2")
+
+    state = _null_state(matrix, mode)
+
+    chunk_sizes = [chunk_size] * (n_permutations // chunk_size)
+    if n_permutations % chunk_size:
+        chunk_sizes.append(n_permutations % chunk_size)
+    tasks = list(zip(np.random.SeedSequence(seed).spawn(len(chunk_sizes)), chunk_sizes))
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(tasks))
+    if n_workers == 1:
+        _init_worker(state)
+        results = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(state,)) as executor:
+            results = list(executor.map(_simulate_chunk, tasks))
+
+    total, total_sq, at_least, at_most = (sum(parts) for parts in zip(*results))
+
+    observed = state['observed']
+    mean = total / n_permutations
+    variance = np.maximum(total_sq - n_permutations * mean ** 2, 0) / (n_permutations - 1)
+    std = np.sqrt(variance)
+    z_score = np.divide(observed - mean, std, out=np.zeros_like(mean), where=std > 0)
+
+    return {
+        'observed': observed,
+        'mean': mean,
+        'std': std,
+        'z_score': z_score,
+        'p_enriched': (1 + at_least) / (1 + n_permutations),
+        'p_depleted': (1 + at_most) / (1 + n_permutations),
+    }
+
+
+def null_model_significance(
+    matrix: RadicalCoOccurrenceMatrix,
+    mode: str = 'shuffle',
+    n_permutations: int = 1000,
+    seed: int = 0,
+    n_workers: Optional[int] = None,
+    min_observed: int = 0
+) -> pd.DataFrame:
+    """
+    Empirical z-scores and p-values for every radical pair.
+
+    Args:
+        matrix: RadicalCoOccurrenceMatrix object
+        mode: 'shuffle' or 'circular'
+        n_permutations: Number of null matrices to build
+        seed: Random seed
+        n_workers: Worker processes (default: CPU count)
+        min_observed: Minimum observed count to include a pair
+
+    Returns:
+        DataFrame with one row per radical pair, sorted by z-score
+    """
+    null = simulate_null(matrix, mode, n_permutations, seed, n_workers)
+
+    rows, cols = np.triu_indices(len(matrix.unique_radicals), k=1)
+    radicals = np.array(matrix.unique_radicals, dtype=object)
+
+    df = pd.DataFrame({
+        'radical1': radicals[rows],
+        'radical2': radicals[cols],
+        'observed': null['observed'][rows, cols].astype(int),
+        'null_mean': null['mean'][rows, cols],
+        'null_std': null['std'][rows, cols],
+        'z_score': null['z_score'][rows, cols],
+        'p_enriched': null['p_enriched'][rows, cols],
+        'p_depleted': null['p_depleted'][rows, cols],
+    })
+    df = df[df['observed'] >= min_observed]
+
+    return df.sort_values('z_score', ascending=False)
+
+
+if __name__ == "__main__":
+    csv_path = Path(__file__).parent.parent / "public" / "Just Characters-Table 1.csv"
+    print("Loading Dao De Jing data...")
+    characters = parse_ttc_csv(str(csv_path))
+
+    print("Building co-occurrence matrix...")
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+
+    for mode in NULL_MODES:
+        print("\n" + "="*70)
+        print(f"NULL MODEL: {mode.upper()} (1000 permutations)")
+        print("="*70)
+
+        start = time.perf_counter()
+        df = null_model_significance(matrix, mode=mode, n_permutations=1000, min_observed=5)
+        elapsed = time.perf_counter() - start
+
+        print(f"Finished in {elapsed:.1f}s on {os.cpu_count()} CPU(s)")
+        print(f"Pairs enriched at p < 0.05: {(df['p_enriched'] < 0.05).sum()}")
+        print(f"Pairs depleted at p < 0.05: {(df['p_depleted'] < 0.05).sum()}")
+        print("\nTop 10 enriched pairs:")
+        print(df.head(10).to_string())
@@ -0,0 +1,185 @@
+"""
+Structural pattern engine for topological sequences
+Compiles PATTERN_TEMPLATES formulas into gapped sequence matchers and scans the whole text at once
+"""
+
+import re
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Union
+
+from ttc_parser import parse_ttc_csv, Character, Corpus
+from translation_engine import TranslationEngine, PATTERN_TEMPLATES
+from sequence_matcher import SequenceMatcher
+
+# Formula terms that name characters rather than topological types
+TEMPLATE_TERMS = {
+    'absence': '無',
+    'action': '為',
+}
+
+_TERM = re.compile(r'^\w+\((\w+)\)$')
+_SUBSCRIPTS = str.maketrans('', '', '₀₁₂₃₄₅₆₇₈₉')
+
+
+def compile_formula(formula: str) -> List[Tuple[str, ...]]:
+    """
+    Parse a template formula into the term sequences it matches.
+
+    'Boundary(P) → Void(O) → Emergence(G)' reads the term in parentheses;
+    subscripts mark repeats of a type ('O → G → P → O₂' ends on a second O);
+    'A ⟷ B' matches both orders.
+
+    Args:
+        formula: Formula string from PATTERN_TEMPLATES
+
+    Returns:
+        List of alternative term sequences
+    """
+    def term(text: str) -> str:
+        text = text.strip()
+        match = _TERM.match(text)
+        return (match.group(1) if match else text).translate(_SUBSCRIPTS)
+
+    if '⟷' in formula:
+        parts = formula.split('⟷')
+        if len(parts) != 2 or '→' in formula:
+            raise ValueError(f"Unsupported formula: {formula!r} (⟷ joins exactly two terms)")
+        first, second = term(parts[0]), term(parts[1])
+        return [(first, second), (second, first)]
+
+    return [tuple(term(part) for part in formula.split('→'))]
+
+
+class PatternEngine:
+    """
+    Matches PATTERN_TEMPLATES against the topological-type sequence of a text.
+
+    Every template is compiled into one SequenceMatcher. Terms that are
+    topological types (O, G, P, frame, ...) match characters of that type in
+    the translation engine's database; TEMPLATE_TERMS and single characters
+    match those characters. Consecutive terms match different entries, up to
+    max_gap positions apart, and matches never cross chapters.
+    """
+
+    def __init__(self, templates: Optional[Dict[str, Dict]] = None,
+                 max_gap: Union[int, Dict[str, int]] = 5,
+                 engine: Optional[TranslationEngine] = None):
+        """
+        Args:
+            templates: Template name → template with a 'formula' (default: PATTERN_TEMPLATES)
+            max_gap: Largest position difference between consecutive terms,
+                for all templates or per template name
+            engine: TranslationEngine supplying topological types
+        """
+        self.engine = engine or TranslationEngine()
+        self.templates = PATTERN_TEMPLATES if templates is None else templates
+        self.max_gap = max_gap
+
+        self.topo_types = sorted({s.topological_type for s in self.engine.structures.values()})
+        self._topo_ids = {topo: idx for idx, topo in enumerate(self.topo_types)}
+
+        # Character terms get ids after the topological types, allocated on demand
+        self._char_ids: Dict[str, int] = {}
+
+        self.sequences: Dict[str, List[Tuple[str, ...]]] = {}
+        patterns = {}
+        gaps = {}
+        for name, template in self.templates.items():
+            self.sequences[name] = compile_formula(template['formula'])
+            gap = max_gap[name] if isinstance(max_gap, dict) else max_gap
+            for alternative, sequence in enumerate(self.sequences[name]):
+                key = f"{name}#{alternative}"
+                patterns[key] = [self._symbol(name, t) for t in sequence]
+                gaps[key] = gap
+
+        self._largest_gap = max(gaps.values(), default=0)
+        # An entry's type and character share a position, so consecutive
+        # terms must match strictly later entries
+        self.matcher = SequenceMatcher(patterns, max_gap=gaps, min_gap=1)
+
+    def _symbol(self, template: str, term: str) -> int:
+        if term in self._topo_ids:
+            return self._topo_ids[term]
+
+        char = TEMPLATE_TERMS.get(term, term)
+        if len(char) != 1:
+            raise ValueError(f"Unknown term {term!r} in template {template!r} "
+                             f"(expected a topological type in {self.topo_types}, "
+                             f"a character or one of {sorted(TEMPLATE_TERMS)})")
+        return self._char_ids.setdefault(char, len(self.topo_types) + len(self._char_ids))
+
+    def scan_corpus(self, characters: List[Character]) -> pd.DataFrame:
+        """
+        Find every template match in the text in one pass.
+
+        Args:
+            characters: Corpus or list of Character objects
+
+        Returns:
+            DataFrame with one row per match: template, chapter, start and end
+            position within the chapter, matched characters and their types
+        """
+        corpus = Corpus.from_characters(characters)
+        vocab = corpus.char_vocab
+
+        structures = self.engine.structures
+        vocab_topo = np.array([self._topo_ids.get(structures[c].topological_type, -1)
+                               if c in structures else -1 for c in vocab], dtype=np.int64)
+        vocab_char = np.array([self._char_ids.get(c, -1) for c in vocab], dtype=np.int64)
+
+        # Each entry is two stream items at the same position: its topological
+        # type and its character, so one scan serves both kinds of term
+        symbols = np.empty(2 * len(corpus), dtype=np.int64)
+        symbols[0::2] = vocab_topo[corpus.char_ids]
+        symbols[1::2] = vocab_char[corpus.char_ids]
+
+        # Spacing chapters further apart than any gap keeps matches inside one
+        chapter_rank = np.cumsum(np.diff(corpus.chapters, prepend=corpus.chapters[:1]) != 0)
+        positions = corpus.global_positions + chapter_rank * (self._largest_gap + 1)
+        matches = self.matcher.scan(symbols, np.repeat(positions, 2))
+
+        chars = corpus.chars
+        rows = []
+        for key, paths in matches.items():
+            name = key.rsplit('#', 1)[0]
+            for path in paths:
+                entries = np.asarray(path) // 2
+                rows.append({
+                    'template': name,
+                    'chapter': int(corpus.chapters[entries[0]]),
+                    'start_position': int(corpus.positions[entries[0]]),
+                    'end_position': int(corpus.positions[entries[-1]]),
+                    'characters': "".join(chars[entries]),
+                    'sequence': " → ".join(
+                        self.topo_types[t] if t >= 0 else '?'
+                        for t in vocab_topo[corpus.char_ids[entries]].tolist()),
+                })
+
+        df = pd.DataFrame(rows, columns=['template', 'chapter', 'start_position',
+                                         'end_position', 'characters', 'sequence'])
+        return df.sort_values(['chapter', 'start_position', 'template'],
+                              kind='stable').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    csv_path = Path(__file__).parent.parent / "public" / "Just Characters-Table 1.csv"
+    print("Loading Dao De Jing data...")
+    characters = parse_ttc_csv(str(csv_path))
+
+    patterns = PatternEngine(max_gap=5)
+    for name, sequences in patterns.sequences.items():
+        print(f"  {name}: {' | '.join(' → '.join(seq) for seq in sequences)}")
+
+    start = time.perf_counter()
+    matches = patterns.scan_corpus(characters)
+    elapsed = time.perf_counter() - start
+
+    print(f"\nScanned {len(characters)} characters against {len(patterns.templates)} templates "
+          f"in {elapsed * 1000:.1f} ms")
+    print("\nMatches per template:")
+    print(matches['template'].value_counts().to_string())
+    print("\nFirst matches:")
+    print(matches.head(10).to_string(index=False))
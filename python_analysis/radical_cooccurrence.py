@@ -5,16 +5,30 @@ Analyzes how radicals co-occur within proximity windows
 
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple, Set
+from scipy import sparse
+from typing import List, Dict, Tuple, Set, Optional, Iterable, Union
 from collections import defaultdict, Counter
+from collections.abc import Mapping
 from pathlib import Path
 
-from ttc_parser import parse_ttc_csv, Character, get_context_window
-from radical_dictionary import get_radicals, get_all_radicals, RADICAL_CATEGORIES
+from ttc_parser import parse_ttc_csv, Character, Corpus, get_context_window
+from radical_dictionary import get_radicals, get_all_radicals, dictionary_version, RADICAL_CATEGORIES
+from cooccurrence_engine import (expand_radicals, window_pair_indices, count_pairs,
+                                 count_pairs_sparse, count_entry_pairs, distance_histogram,
+                                 chapter_pair_counts, window_stack, kernel_weights,
+                                 weighted_cooccurrences)
+from corpus_index import CorpusIndex, get_index
+
+
+# Largest dense radical × radical × (distance, chapter or block) array the
+# matrix will allocate; these tensors are dense for either backend
+MAX_DENSE_CELLS = 100_000_000
 
 
 class RadicalOccurrence:
     """Represents a radical occurring at a specific position."""
+    __slots__ = ('radical', 'char', 'global_position', 'chapter', 'position')
+
     def __init__(self, radical: str, char: str, global_position: int, chapter: int, position: int):
         self.radical = radical
         self.char = char  # The character containing this radical
@@ -23,113 +37,634 @@ class RadicalOccurrence:
         self.position = position
 
 
+class PairDetails(Mapping):
+    """
+    Lazy view of the individual instances behind each radical pair count.
+
+    Behaves like the dictionary of pair details the matrix used to build
+    eagerly (sorted radical pair -> list of instance dicts), but only stores
+    the occurrence index pairs as compact arrays grouped by radical pair.
+    Instance dicts are rebuilt for a pair only when it is looked up.
+    """
+
+    def __init__(
+        self,
+        unique_radicals: List[str],
+        radical_ids: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        char_vocab: List[str],
+        char_ids: np.ndarray,
+        positions: np.ndarray,
+        chapters: np.ndarray
+    ):
+        """
+        Args:
+            unique_radicals: Sorted list of unique radicals (index = radical id)
+            radical_ids: Radical id of each occurrence
+            left: Left occurrence index of each co-occurring pair
+            right: Right occurrence index of each co-occurring pair
+            char_vocab: Distinct characters (index = character id)
+            char_ids: Character id of the character containing each occurrence
+            positions: Global position of each occurrence
+            chapters: Chapter of each occurrence
+        """
+        self.unique_radicals = unique_radicals
+        self._radical_to_id = {radical: idx for idx, radical in enumerate(unique_radicals)}
+        self._char_vocab = char_vocab
+        self._char_ids = char_ids
+        self._positions = positions
+        self._chapters = chapters
+
+        n = len(unique_radicals)
+        a = radical_ids[left]
+        b = radical_ids[right]
+        codes = np.minimum(a, b) * n + np.maximum(a, b)
+
+        # Group pairs by radical pair; a stable sort keeps text order inside each group
+        order = np.argsort(codes, kind='stable')
+        self._left = left[order].astype(np.int32)
+        self._right = right[order].astype(np.int32)
+        self._codes, self._starts = np.unique(codes[order], return_index=True)
+        self._ends = np.append(self._starts[1:], len(order))
+
+    def _group(self, key: Tuple[str, str]) -> Optional[slice]:
+        """Return the slice of pair arrays for a radical pair, or None."""
+        if not isinstance(key, tuple) or len(key) != 2:
+            return None
+
+        rad1, rad2 = sorted(key)
+        if rad1 not in self._radical_to_id or rad2 not in self._radical_to_id:
+            return None
+
+        code = self._radical_to_id[rad1] * len(self.unique_radicals) + self._radical_to_id[rad2]
+        idx = np.searchsorted(self._codes, code)
+        if idx == len(self._codes) or self._codes[idx] != code:
+            return None
+
+        return slice(self._starts[idx], self._ends[idx])
+
+    def examples(self, rad1: str, rad2: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Rebuild the instances of a radical pair.
+
+        Args:
+            rad1: First radical
+            rad2: Second radical
+            limit: Maximum number of instances to return (all if None)
+
+        Returns:
+            List of instance dicts in text order (empty if the pair never co-occurs)
+        """
+        group = self._group((rad1, rad2))
+        if group is None:
+            return []
+
+        if limit is not None:
+            group = slice(group.start, min(group.stop, group.start + limit))
+
+        details = []
+        for i, j in zip(self._left[group].tolist(), self._right[group].tolist()):
+            position1 = int(self._positions[i])
+            position2 = int(self._positions[j])
+            details.append({
+                'char1': self._char_vocab[self._char_ids[i]],
+                'char2': self._char_vocab[self._char_ids[j]],
+                'position1': position1,
+                'position2': position2,
+                'distance': position2 - position1,
+                'chapter': int(self._chapters[i]),
+            })
+
+        return details
+
+    def count(self, rad1: str, rad2: str) -> int:
+        """Number of instances recorded for a radical pair."""
+        group = self._group((rad1, rad2))
+        return 0 if group is None else group.stop - group.start
+
+    def __getitem__(self, key: Tuple[str, str]) -> List[Dict]:
+        if self._group(key) is None:
+            raise KeyError(key)
+        return self.examples(*key)
+
+    def __contains__(self, key) -> bool:
+        return self._group(key) is not None
+
+    def __iter__(self):
+        n = len(self.unique_radicals)
+        for code in self._codes.tolist():
+            yield (self.unique_radicals[code // n], self.unique_radicals[code % n])
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+
 class RadicalCoOccurrenceMatrix:
     """
     Calculate and store radical co-occurrence patterns.
+
+    Counts are held either as a dense ndarray or, with backend='sparse', as a
+    scipy.sparse CSR matrix that only stores co-occurring pairs. Query methods
+    work on either form; the labelled `matrix` DataFrame is built on first
+    access. The distance histogram and the chapter and block tensors are
+    always dense, and refuse to allocate more than MAX_DENSE_CELLS cells.
     """
 
-    def __init__(self, characters: List[Character], window_size: int = 5):
+    BACKENDS = ('dense', 'sparse')
+
+    def __init__(self, characters: List[Character], window_size: int = 5, backend: str = 'dense'):
         """
         Initialize the co-occurrence matrix.
 
         Args:
-            characters: List of Character objects from TTC
+            characters: Corpus (or list of Character objects) from TTC
             window_size: Characters within ±window_size are considered co-occurring
+            backend: 'dense' (ndarray) or 'sparse' (scipy.sparse CSR) count storage
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend!r} (expected one of {self.BACKENDS})")
+
         self.characters = characters
+        self.corpus = Corpus.from_characters(characters)
         self.window_size = window_size
-        self.radical_occurrences = self._extract_radical_occurrences()
-        self.unique_radicals = sorted(list(set([r.radical for r in self.radical_occurrences])))
+        self.backend = backend
+
+        # One entry per radical occurrence, as parallel arrays over the corpus
+        self._load_radicals()
+
+        # Counts version, bumped by update_radicals(); derived results are
+        # cached against it (see memoize)
+        self.version = 0
+        self._caches = {}
 
         # Build the co-occurrence matrix
-        self.matrix, self.pair_details = self._build_cooccurrence_matrix()
+        self.counts, self._pair_details = self._build_cooccurrence_matrix()
+
+    @classmethod
+    def from_counts(cls, counts, unique_radicals: List[str], window_size: int = 5,
+                    backend: str = 'dense') -> "RadicalCoOccurrenceMatrix":
+        """
+        Wrap a precomputed count matrix, such as a chapter slice, without the text.
+
+        The result supports every count-based query (matrix, normalization,
+        top pairs, neighbours, categories, significance, heat maps); methods
+        that need the individual occurrences raise ValueError.
+
+        Args:
+            counts: Symmetric radical × radical counts (ndarray or scipy.sparse)
+            unique_radicals: Radical label of each row/column
+            window_size: Window the counts were taken with
+            backend: 'dense' or 'sparse' count storage
+
+        Returns:
+            RadicalCoOccurrenceMatrix over the given counts
+        """
+        if backend not in cls.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend!r} (expected one of {cls.BACKENDS})")
+
+        matrix = cls.__new__(cls)
+        matrix.characters = None
+        matrix.corpus = None
+        matrix.window_size = window_size
+        matrix.backend = backend
+
+        matrix.unique_radicals = list(unique_radicals)
+        matrix.occurrence_index = matrix.radical_ids = matrix.occurrence_positions = None
+        matrix._radical_table = matrix._char_radicals = None
 
-    def _extract_radical_occurrences(self) -> List[RadicalOccurrence]:
-        """Extract all radical occurrences from the character list."""
-        occurrences = []
+        matrix.version = 0
+        matrix._caches = {}
 
-        for char_obj in self.characters:
-            radicals = get_radicals(char_obj.char)
+        if backend == 'sparse':
+            matrix.counts = sparse.csr_matrix(counts)
+        else:
+            matrix.counts = counts.toarray() if sparse.issparse(counts) else np.asarray(counts)
+        matrix._pair_details = None
 
-            for radical in radicals:
-                occurrence = RadicalOccurrence(
-                    radical=radical,
-                    char=char_obj.char,
-                    global_position=char_obj.global_position,
-                    chapter=char_obj.chapter,
-                    position=char_obj.position
-                )
-                occurrences.append(occurrence)
+        return matrix
 
-        return occurrences
+    def _require_text(self, operation: str):
+        if self.corpus is None:
+            raise ValueError(f"{operation} needs the source text, which matrices built "
+                             f"with from_counts() do not keep")
 
-    def _build_cooccurrence_matrix(self) -> Tuple[pd.DataFrame, Dict]:
+    def _check_dense(self, operation: str, *leading: int):
+        n = len(self.unique_radicals)
+        cells = int(np.prod(leading, dtype=np.int64)) * n * n
+        if cells > MAX_DENSE_CELLS:
+            raise ValueError(f"{operation} would allocate a dense {' x '.join(map(str, leading))} "
+                             f"x {n} x {n} array ({cells:,} cells, limit MAX_DENSE_CELLS = "
+                             f"{MAX_DENSE_CELLS:,}); use fewer units or a smaller radical inventory")
+
+    def _load_radicals(self):
+        """Read the radical table for the corpus and expand it into occurrence arrays."""
+        indptr, indices, self.unique_radicals = self.corpus.radical_table()
+        self._radical_table = (indptr, indices)
+
+        self.occurrence_index, self.radical_ids = expand_radicals(self.corpus.char_ids,
+                                                                  indptr, indices)
+        self.occurrence_positions = self.corpus.global_positions[self.occurrence_index]
+
+        # Snapshot of each character's radicals, diffed by update_radicals()
+        self._char_radicals = [list(get_radicals(char)) for char in self.corpus.char_vocab]
+
+    def memoize(self, name, build, categories: bool = False):
+        """
+        Cache a result derived from the counts.
+
+        The cached value is reused until the counts change (update_radicals)
+        and, with categories=True, until the radical dictionary changes
+        (dictionary_version, which also sees direct edits to RADICAL_MAP and
+        RADICAL_CATEGORIES).
+
+        Args:
+            name: Hashable cache key
+            build: Zero-argument function computing the value
+            categories: Whether the value also depends on the radical categories
+                or the dictionary's lookup indexes
+
+        Returns:
+            The cached or freshly built value
+        """
+        key = (self.version, dictionary_version() if categories else None)
+        entry = self._caches.get(name)
+        if entry is None or entry[0] != key:
+            entry = (key, build())
+            self._caches[name] = entry
+        return entry[1]
+
+    @property
+    def matrix(self) -> pd.DataFrame:
+        """Co-occurrence counts as a radical × radical DataFrame (densified for the sparse backend)."""
+        def build():
+            data = self.counts.toarray() if sparse.issparse(self.counts) else self.counts
+            return pd.DataFrame(data, index=self.unique_radicals, columns=self.unique_radicals)
+
+        return self.memoize('matrix', build)
+
+    @property
+    def pair_details(self) -> PairDetails:
+        """Per-pair instances (rebuilt lazily after update_radicals)."""
+        self._require_text('pair_details')
+        if self._pair_details is None:
+            left, right = window_pair_indices(self.occurrence_positions, self.window_size)
+            self._pair_details = self._make_pair_details(left, right)
+        return self._pair_details
+
+    @property
+    def sparse_matrix(self) -> sparse.csr_matrix:
+        """Co-occurrence counts as a CSR matrix, whichever backend holds them."""
+        if sparse.issparse(self.counts):
+            return self.counts
+        return sparse.csr_matrix(self.counts)
+
+    @property
+    def radical_occurrences(self) -> List[RadicalOccurrence]:
+        """All radical occurrences as objects (built on demand from the occurrence arrays)."""
+        self._require_text('radical_occurrences')
+        corpus = self.corpus
+        return [
+            RadicalOccurrence(
+                radical=self.unique_radicals[radical_id],
+                char=corpus.char_vocab[corpus.char_ids[idx]],
+                global_position=int(corpus.global_positions[idx]),
+                chapter=int(corpus.chapters[idx]),
+                position=int(corpus.positions[idx])
+            )
+            for idx, radical_id in zip(self.occurrence_index.tolist(), self.radical_ids.tolist())
+        ]
+
+    def _build_cooccurrence_matrix(self) -> Tuple[np.ndarray, PairDetails]:
         """
         Build the co-occurrence matrix.
 
+        Radicals are encoded as integer ids and positions as an int array, so
+        window pairs are found with vectorized passes (see cooccurrence_engine)
+        instead of a nested loop over occurrence objects.
+
         Returns:
-            Tuple of (DataFrame matrix, dictionary of pair details)
-        """
-        # Initialize counts
-        pair_counts = defaultdict(int)
-        pair_details = defaultdict(list)  # Store specific instances
-
-        # For each radical occurrence, look within the window
-        for i, occ1 in enumerate(self.radical_occurrences):
-            # Look ahead within window
-            for j in range(i + 1, len(self.radical_occurrences)):
-                occ2 = self.radical_occurrences[j]
-
-                # Calculate distance
-                distance = abs(occ2.global_position - occ1.global_position)
-
-                # Stop if beyond window
-                if distance > self.window_size:
-                    break
-
-                # Don't count same character with itself
-                if occ1.global_position == occ2.global_position:
-                    continue
-
-                # Record co-occurrence (use sorted tuple for symmetry)
-                radical_pair = tuple(sorted([occ1.radical, occ2.radical]))
-                pair_counts[radical_pair] += 1
-
-                # Store details
-                pair_details[radical_pair].append({
-                    'char1': occ1.char,
-                    'char2': occ2.char,
-                    'position1': occ1.global_position,
-                    'position2': occ2.global_position,
-                    'distance': distance,
-                    'chapter': occ1.chapter,
-                })
-
-        # Build DataFrame matrix
-        n = len(self.unique_radicals)
-        matrix_data = np.zeros((n, n), dtype=int)
-
-        for (rad1, rad2), count in pair_counts.items():
-            idx1 = self.unique_radicals.index(rad1)
-            idx2 = self.unique_radicals.index(rad2)
-            matrix_data[idx1, idx2] = count
-            matrix_data[idx2, idx1] = count  # Symmetric matrix
-
-        df = pd.DataFrame(
-            matrix_data,
-            index=self.unique_radicals,
-            columns=self.unique_radicals
+            Tuple of (count matrix for the backend, lazy PairDetails view)
+        """
+        left, right = window_pair_indices(self.occurrence_positions, self.window_size)
+        if self.backend == 'sparse':
+            counts = count_pairs_sparse(self.radical_ids, left, right, len(self.unique_radicals))
+        else:
+            counts = count_pairs(self.radical_ids, left, right, len(self.unique_radicals))
+
+        return counts, self._make_pair_details(left, right)
+
+    def _make_pair_details(self, left: np.ndarray, right: np.ndarray) -> PairDetails:
+        # Instances are kept as index arrays and only expanded on lookup
+        return PairDetails(
+            self.unique_radicals,
+            self.radical_ids,
+            left,
+            right,
+            self.corpus.char_vocab,
+            self.corpus.char_ids[self.occurrence_index],
+            self.occurrence_positions,
+            self.corpus.chapters[self.occurrence_index]
         )
 
-        return df, dict(pair_details)
+    def update_radicals(self) -> List[str]:
+        """
+        Bring the counts up to date after edits to RADICAL_MAP.
+
+        Characters whose radical list changed since the last build or update
+        are found by diffing against a snapshot. Only the window pairs that
+        touch their positions (looked up in the corpus position index) are
+        recounted: their old contribution is subtracted and the new one added,
+        so the result equals a full rebuild. Derived caches are invalidated
+        by bumping `version`.
+
+        Only the counts are updated incrementally. Every cached result
+        (normalized matrix, top pairs, category tables, significance,
+        distance histogram, chapter tensor) is discarded and rebuilt in
+        full on next use, since each depends on all of the counts.
+
+        Returns:
+            Characters whose radicals changed (empty if the counts are current)
+        """
+        self._require_text('update_radicals')
+        # Refresh the dictionary's indexes first if the maps were edited directly
+        dictionary_version()
+        vocab = self.corpus.char_vocab
+        changed = [c for c, (char, radicals) in enumerate(zip(vocab, self._char_radicals))
+                   if get_radicals(char) != radicals]
+        if not changed:
+            return []
+
+        # Entry pairs within the window of any changed character, each once
+        index = get_index(self.corpus)
+        global_positions = self.corpus.global_positions
+        targets, neighbours = zip(*(index.neighbourhood(vocab[c], self.window_size)
+                                    for c in changed))
+        targets, neighbours = np.concatenate(targets), np.concatenate(neighbours)
+        keep = global_positions[targets] != global_positions[neighbours]
+        n_entries = len(self.corpus)
+        codes = np.unique(np.minimum(targets, neighbours)[keep] * n_entries +
+                          np.maximum(targets, neighbours)[keep])
+        left, right = np.divmod(codes, n_entries)
+
+        old_radicals = self.unique_radicals
+        old_delta = count_entry_pairs(self.corpus.char_ids, left, right,
+                                      *self._radical_table, len(old_radicals))
+
+        self._load_radicals()
+        n = len(self.unique_radicals)
+        new_delta = count_entry_pairs(self.corpus.char_ids, left, right,
+                                      *self._radical_table, n)
+
+        # Re-label the remaining counts into the new radical order; radicals
+        # no longer in the text have no pairs left once old_delta is removed
+        radical_to_id = {radical: idx for idx, radical in enumerate(self.unique_radicals)}
+        old_to_new = np.array([radical_to_id.get(r, -1) for r in old_radicals], dtype=np.int64)
+        remaining = (self.counts - old_delta) if self.backend == 'dense' else \
+            (self.counts - sparse.csr_matrix(old_delta)).tocoo()
+        if self.backend == 'dense':
+            kept = np.flatnonzero(old_to_new >= 0)
+            counts = np.zeros((n, n), dtype=int)
+            counts[np.ix_(old_to_new[kept], old_to_new[kept])] = remaining[np.ix_(kept, kept)]
+            self.counts = counts + new_delta
+        else:
+            rows, cols = old_to_new[remaining.row], old_to_new[remaining.col]
+            kept = (rows >= 0) & (cols >= 0)
+            counts = sparse.csr_matrix((remaining.data[kept], (rows[kept], cols[kept])),
+                                       shape=(n, n)) + sparse.csr_matrix(new_delta)
+            counts.eliminate_zeros()
+            self.counts = counts
+
+        self._pair_details = None
+        self._caches.clear()
+        self.version += 1
+
+        return [vocab[c] for c in changed]
+
+    def distance_histogram(self, max_distance: Optional[int] = None,
+                           boundaries: Union[None, str, Iterable[int]] = None) -> np.ndarray:
+        """
+        Radical × radical × distance counts, computed in one pass and cached.
+
+        The histogram is dense for either backend, so keep max_distance small
+        for very large radical inventories (see MAX_DENSE_CELLS).
+
+        Args:
+            max_distance: Largest distance to record (defaults to window_size)
+            boundaries: Only count pairs inside the same segment: 'chapter', or
+                the global positions where segments (e.g. clauses) start
+
+        Returns:
+            Integer array of shape (radicals, radicals, max_distance) where
+            [:, :, d - 1] counts pairs exactly d positions apart
+        """
+        self._require_text('distance_histogram')
+        if max_distance is None:
+            max_distance = self.window_size
+
+        boundaries_key, segment_ids = self._segments(boundaries)
+        name = ('distance_histogram', boundaries_key)
+        entry = self._caches.get(name)
+        cached = entry[1] if entry is not None and entry[0][0] == self.version else None
+        if cached is None or cached.shape[2] < max_distance:
+            self._check_dense('distance_histogram', max_distance)
+            cached = distance_histogram(self.radical_ids, self.occurrence_positions,
+                                        len(self.unique_radicals), max_distance, segment_ids)
+            self._caches[name] = ((self.version, None), cached)
+
+        return cached[:, :, :max_distance]
+
+    def _segments(self, boundaries: Union[None, str, Iterable[int]]) -> Tuple:
+        """Hashable cache key and per-occurrence segment ids for a boundary spec."""
+        if boundaries is None:
+            return None, None
+        if isinstance(boundaries, str):
+            if boundaries != 'chapter':
+                raise ValueError(f"Unknown boundaries: {boundaries!r} (expected 'chapter' "
+                                 f"or a list of segment start positions)")
+            return 'chapter', self.corpus.chapters[self.occurrence_index]
+
+        starts = np.unique(np.asarray(list(boundaries), dtype=np.int64))
+        segment_ids = np.searchsorted(starts, self.occurrence_positions, side='right')
+        return tuple(starts.tolist()), segment_ids
+
+    def get_weighted_matrix(self, kernel: str = 'exponential', max_distance: Optional[int] = None,
+                            boundaries: Union[None, str, Iterable[int]] = None,
+                            **params) -> pd.DataFrame:
+        """
+        Distance-weighted co-occurrence matrix.
+
+        Each pair up to max_distance apart contributes the kernel's weight for
+        its distance instead of 1. Weights are applied to the cached distance
+        histogram, so comparing kernels or parameters never re-walks the text;
+        each result is cached per kernel, parameters and boundaries.
+
+        Args:
+            kernel: 'exponential' (scale), 'inverse' (power), 'gaussian' (sigma),
+                'uniform', or a name added with cooccurrence_engine.register_kernel
+            max_distance: Largest distance counted (defaults to window_size)
+            boundaries: Only count pairs inside the same segment: 'chapter', or
+                the global positions where segments (e.g. clauses) start
+            **params: Kernel parameters, e.g. scale=3.0
+
+        Returns:
+            DataFrame of float co-occurrence weights
+        """
+        if max_distance is None:
+            max_distance = self.window_size
+
+        boundaries_key, _ = self._segments(boundaries)
+        key = ('weighted', kernel, max_distance, tuple(sorted(params.items())), boundaries_key)
+
+        def build():
+            weights = kernel_weights(kernel, max_distance, **params)
+            histogram = self.distance_histogram(max_distance, boundaries)
+            return pd.DataFrame(weighted_cooccurrences(histogram, weights),
+                                index=self.unique_radicals, columns=self.unique_radicals)
+
+        return self.memoize(key, build).copy()
+
+    def get_window_matrices(self, window_sizes: Iterable[int]) -> Dict[int, pd.DataFrame]:
+        """
+        Co-occurrence matrices for several window sizes from a single pass.
+
+        Args:
+            window_sizes: Window sizes to compute, e.g. range(1, 21)
+
+        Returns:
+            Dictionary mapping window size to a DataFrame shaped like `matrix`
+        """
+        window_sizes = list(window_sizes)
+        histogram = self.distance_histogram(max(window_sizes + [1]))
+        stack = window_stack(histogram, window_sizes)
+
+        return {
+            w: pd.DataFrame(stack[k], index=self.unique_radicals, columns=self.unique_radicals)
+            for k, w in enumerate(window_sizes)
+        }
+
+    def _chapter_data(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Chapter labels, chapter tensor and its prefix sums, built once per counts version."""
+        self._require_text('chapter_tensor')
+
+        def build():
+            labels = np.unique(self.corpus.chapters)
+            # The tensor and its prefix sums
+            self._check_dense('chapter_tensor', 2 * len(labels) + 1)
+            chapter_ids = np.searchsorted(labels, self.corpus.chapters[self.occurrence_index])
+            n = len(self.unique_radicals)
+            tensor = chapter_pair_counts(self.radical_ids, self.occurrence_positions, chapter_ids,
+                                         len(labels), n, self.window_size)
+
+            # prefix[k] holds the counts of the first k chapters
+            prefix = np.zeros((len(labels) + 1, n, n), dtype=tensor.dtype)
+            np.cumsum(tensor, axis=0, out=prefix[1:])
+            return labels, tensor, prefix
+
+        return self.memoize('chapter_tensor', build)
+
+    def chapter_tensor(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Co-occurrence counts split by chapter.
+
+        Pairs are attributed to the chapter of their earlier occurrence, so the
+        slices sum to the whole-text counts. The tensor is dense for either
+        backend (see MAX_DENSE_CELLS).
+
+        Returns:
+            Tuple of (sorted chapter labels, (chapters, radicals, radicals) array)
+        """
+        labels, tensor, _ = self._chapter_data()
+        return labels, tensor
+
+    def block_tensor(self, block_size: int) -> np.ndarray:
+        """
+        Co-occurrence counts split into consecutive blocks of text.
+
+        Like chapter_tensor, but the units are runs of block_size positions,
+        for analyses (e.g. block bootstraps) that need equal-sized pieces.
+
+        Args:
+            block_size: Number of positions per block
+
+        Returns:
+            Integer array of shape (blocks, radicals, radicals), dense for
+            either backend (see MAX_DENSE_CELLS)
+        """
+        self._require_text('block_tensor')
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+
+        def build():
+            global_positions = self.corpus.global_positions
+            start = int(global_positions[0])
+            n_blocks = (int(global_positions[-1]) - start) // block_size + 1
+            self._check_dense('block_tensor', n_blocks)
+            block_ids = (self.occurrence_positions - start) // block_size
+            return chapter_pair_counts(self.radical_ids, self.occurrence_positions, block_ids,
+                                       n_blocks, len(self.unique_radicals), self.window_size)
+
+        return self.memoize(('block_tensor', block_size), build)
+
+    def chapter_counts(self, chapters: Iterable[int]) -> np.ndarray:
+        """
+        Co-occurrence counts restricted to some chapters, without rescanning the text.
+
+        A range(start, stop) is answered from prefix sums in O(radicals²);
+        any other collection of chapters sums its chapter slices.
+
+        Args:
+            chapters: Chapter labels, e.g. range(1, 38) or [1, 25, 48]
+
+        Returns:
+            Symmetric (radicals, radicals) integer array
+        """
+        labels, tensor, prefix = self._chapter_data()
+
+        if isinstance(chapters, range) and chapters.step == 1:
+            start = np.searchsorted(labels, chapters.start, side='left')
+            end = np.searchsorted(labels, chapters.stop, side='left')
+            return prefix[max(end, start)] - prefix[start]
+
+        chapters = np.unique(np.asarray(list(chapters), dtype=labels.dtype))
+        idx = np.searchsorted(labels, chapters)
+        unknown = (idx >= len(labels)) | (labels[np.minimum(idx, len(labels) - 1)] != chapters)
+        if unknown.any():
+            raise ValueError(f"Unknown chapters: {chapters[unknown].tolist()}")
+
+        return tensor[idx].sum(axis=0)
+
+    def for_chapters(self, chapters: Iterable[int]) -> "RadicalCoOccurrenceMatrix":
+        """
+        Co-occurrence matrix for a chapter range or subset (see chapter_counts).
+
+        Args:
+            chapters: Chapter labels, e.g. range(1, 38) or [1, 25, 48]
+
+        Returns:
+            RadicalCoOccurrenceMatrix built with from_counts(), over the same radicals
+        """
+        return RadicalCoOccurrenceMatrix.from_counts(self.chapter_counts(chapters),
+                                                     self.unique_radicals,
+                                                     self.window_size, self.backend)
 
     def get_normalized_matrix(self) -> pd.DataFrame:
         """
         Get normalized co-occurrence matrix (frequencies instead of raw counts).
 
         Returns:
-            DataFrame with normalized values (0-1)
+            DataFrame with normalized values (0-1); sparse-typed columns for the
+            sparse backend
         """
+        if sparse.issparse(self.counts):
+            # Stay sparse: only stored (co-occurring) entries are rescaled
+            max_val = self.counts.max() if self.counts.nnz else 0
+            data = self.counts / max_val if max_val else self.counts
+            # fillna makes absent cells read as 0 on pandas versions that default to NaN
+            return pd.DataFrame.sparse.from_spmatrix(
+                data, index=self.unique_radicals, columns=self.unique_radicals
+            ).fillna(0)
+
         # Normalize by the maximum value
         max_val = self.matrix.max().max()
         if max_val == 0:
@@ -137,6 +672,20 @@ class RadicalCoOccurrenceMatrix:
 
         return self.matrix / max_val
 
+    def _upper_triangle(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Row, column and count of every non-zero cell above the diagonal, in row-major order."""
+        if sparse.issparse(self.counts):
+            upper = sparse.triu(self.counts, k=1, format='csr')
+            upper.sort_indices()
+            upper = upper.tocoo()
+            keep = upper.data > 0
+            return upper.row[keep], upper.col[keep], upper.data[keep]
+
+        rows, cols = np.triu_indices(len(self.unique_radicals), k=1)
+        values = self.counts[rows, cols]
+        keep = values > 0
+        return rows[keep], cols[keep], values[keep]
+
     def get_top_pairs(self, n: int = 20) -> List[Tuple[str, str, int]]:
         """
         Get top N most frequently co-occurring radical pairs.
@@ -147,37 +696,73 @@ class RadicalCoOccurrenceMatrix:
         Returns:
             List of (radical1, radical2, count) tuples
         """
-        pairs = []
-
-        for i, rad1 in enumerate(self.unique_radicals):
-            for j in range(i + 1, len(self.unique_radicals)):
-                rad2 = self.unique_radicals[j]
-                count = self.matrix.loc[rad1, rad2]
-                if count > 0:
-                    pairs.append((rad1, rad2, int(count)))
-
-        pairs.sort(key=lambda x: x[2], reverse=True)
-        return pairs[:n]
-
-    def get_radical_neighbors(self, radical: str, n: int = 10) -> List[Tuple[str, int]]:
+        rows, cols, values = self._upper_triangle()
+        order = _top_n_indices(values, n)
+
+        return [(self.unique_radicals[i], self.unique_radicals[j], int(count))
+                for i, j, count in zip(rows[order].tolist(), cols[order].tolist(),
+                                       values[order].tolist())]
+
+    def get_radical_neighbors(
+        self,
+        radical: Union[str, Iterable[str]],
+        n: int = 10
+    ) -> Union[List[Tuple[str, int]], Dict[str, List[Tuple[str, int]]]]:
         """
         Get the top N radicals that most frequently co-occur with a given radical.
 
         Args:
-            radical: The radical to analyze
-            n: Number of neighbors to return
+            radical: The radical to analyze, or a list of radicals to answer in one call
+            n: Number of neighbors to return per radical
 
         Returns:
-            List of (co-occurring_radical, count) tuples
+            List of (co-occurring_radical, count) tuples, or for a list of
+            radicals a dictionary mapping each radical to its list
         """
-        if radical not in self.unique_radicals:
-            return []
-
-        row = self.matrix.loc[radical]
-        neighbors = [(rad, int(count)) for rad, count in row.items()
-                    if count > 0 and rad != radical]
-        neighbors.sort(key=lambda x: x[1], reverse=True)
-        return neighbors[:n]
+        if isinstance(radical, str):
+            return self._neighbors_batch([radical], n)[radical]
+        return self._neighbors_batch(list(radical), n)
+
+    def _neighbors_batch(self, radicals: List[str], n: int) -> Dict[str, List[Tuple[str, int]]]:
+        """Top-N neighbours for several radicals from one pass over their matrix rows."""
+        radical_to_id = {r: idx for idx, r in enumerate(self.unique_radicals)}
+        results = {r: [] for r in radicals}
+        known = [r for r in results if r in radical_to_id]
+        if not known or n <= 0:
+            return results
+
+        query_ids = np.array([radical_to_id[r] for r in known], dtype=np.int64)
+
+        if sparse.issparse(self.counts):
+            block = self.counts[query_ids].tocoo()
+            rows, cols, values = block.row, block.col, block.data
+        else:
+            # Fancy indexing copies, so the self-pairs can be blanked in place
+            block = self.counts[query_ids]
+            block[np.arange(len(query_ids)), query_ids] = 0
+
+            # Keep only cells that can reach each row's top n (ties included)
+            if n < block.shape[1]:
+                kth = -np.partition(-block, n - 1, axis=1)[:, n - 1]
+                candidates = block >= kth[:, None]
+            else:
+                candidates = np.ones(block.shape, dtype=bool)
+            rows, cols = np.nonzero(candidates)
+            values = block[rows, cols]
+
+        keep = (values > 0) & (cols != query_ids[rows])
+        rows, cols, values = rows[keep], cols[keep], values[keep]
+
+        # Group by query row, highest count first, ties in column order
+        order = np.lexsort((cols, -values, rows))
+        rows, cols, values = rows[order], cols[order], values[order]
+        group_starts = np.searchsorted(rows, rows, side='left')
+        keep = np.arange(len(rows)) - group_starts < n
+
+        for row, col, count in zip(rows[keep].tolist(), cols[keep].tolist(), values[keep].tolist()):
+            results[known[row]].append((self.unique_radicals[col], int(count)))
+
+        return results
 
     def export_to_csv(self, output_path: str):
         """Export the raw co-occurrence matrix to CSV."""
@@ -206,8 +791,7 @@ class RadicalCoOccurrenceMatrix:
                     cat2 = category
 
             # Get example character pairs
-            pair_key = tuple(sorted([rad1, rad2]))
-            examples = self.pair_details.get(pair_key, [])[:5]
+            examples = self.pair_details.examples(rad1, rad2, limit=5)
             example_chars = ", ".join([f"{e['char1']}-{e['char2']}" for e in examples])
 
             rows.append({
@@ -223,83 +807,152 @@ class RadicalCoOccurrenceMatrix:
         df.to_csv(output_path, index=False)
         print(f"Exported top {n} pairs to {output_path}")
 
-    def get_category_cooccurrence(self) -> pd.DataFrame:
+    def get_category_projection(self) -> Tuple[sparse.csr_matrix, List[str]]:
         """
-        Aggregate co-occurrences by radical category.
+        One-hot radical → category projection matrix P.
+
+        P is cached against the dictionary version and is rebuilt only when
+        the category map or the radical set changes.
 
         Returns:
-            DataFrame showing how radical categories co-occur
+            Tuple of (radicals × categories CSR matrix, category names with
+            'other' last)
         """
+        return self.memoize('category_projection', self._build_category_projection,
+                            categories=True)
+
+    def _build_category_projection(self) -> Tuple[sparse.csr_matrix, List[str]]:
         # Map radicals to categories
         radical_to_category = {}
         for category, info in RADICAL_CATEGORIES.items():
             for radical in info["radicals"]:
                 radical_to_category[radical] = category
 
-        # Aggregate by category
         categories = list(RADICAL_CATEGORIES.keys()) + ['other']
-        category_matrix = defaultdict(lambda: defaultdict(int))
+        category_to_id = {category: idx for idx, category in enumerate(categories)}
+        category_ids = [category_to_id[radical_to_category.get(r, 'other')]
+                        for r in self.unique_radicals]
 
-        for i, rad1 in enumerate(self.unique_radicals):
-            cat1 = radical_to_category.get(rad1, 'other')
-            for j, rad2 in enumerate(self.unique_radicals):
-                cat2 = radical_to_category.get(rad2, 'other')
-                count = self.matrix.iloc[i, j]
-                category_matrix[cat1][cat2] += count
+        n = len(self.unique_radicals)
+        projection = sparse.csr_matrix(
+            (np.ones(n, dtype=int), (np.arange(n), category_ids)),
+            shape=(n, len(categories))
+        )
 
-        # Convert to DataFrame
-        df = pd.DataFrame(category_matrix).fillna(0).astype(int)
-        df = df.reindex(index=categories, columns=categories, fill_value=0)
+        return projection, categories
 
-        return df
+    def get_category_cooccurrence(self) -> pd.DataFrame:
+        """
+        Aggregate co-occurrences by radical category.
 
+        Computed as Pᵀ·M·P with the one-hot projection P from
+        get_category_projection(), and cached until the counts or the category
+        map change.
 
-def analyze_specific_character(characters: List[Character], target_char: str, window_size: int = 5):
+        Returns:
+            DataFrame showing how radical categories co-occur
+        """
+        def build():
+            projection, categories = self.get_category_projection()
+            totals = projection.T @ self.counts @ projection
+            if sparse.issparse(totals):
+                totals = totals.toarray()
+            return pd.DataFrame(np.asarray(totals).astype(int), index=categories, columns=categories)
+
+        return self.memoize('category_cooccurrence', build, categories=True).copy()
+
+
+def _top_n_indices(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the n largest values, highest first, with ties in array order.
+
+    argpartition narrows the candidates to everything that can reach the top n
+    before the (much smaller) exact sort.
+    """
+    if n <= 0 or len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if n < len(values):
+        threshold = values[np.argpartition(-values, n - 1)[:n]].min()
+        candidates = np.flatnonzero(values >= threshold)
+    else:
+        candidates = np.arange(len(values))
+
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order][:n]
+
+
+def window_sensitivity_sweep(
+    characters: List[Character],
+    window_sizes: Iterable[int] = range(1, 21)
+) -> Dict[int, pd.DataFrame]:
+    """
+    Build co-occurrence matrices for a range of window sizes in one pass.
+
+    Equivalent to building RadicalCoOccurrenceMatrix(characters, window_size=w)
+    for every w, but the text is walked once for the largest window and each
+    smaller window is read off the distance histogram.
+
+    Args:
+        characters: Corpus or list of Character objects
+        window_sizes: Window sizes to compute
+
+    Returns:
+        Dictionary mapping window size to co-occurrence DataFrame
+    """
+    window_sizes = list(window_sizes)
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=max(window_sizes + [1]))
+    return matrix.get_window_matrices(window_sizes)
+
+
+def analyze_specific_character(
+    characters: List[Character],
+    target_char: str,
+    window_size: int = 5,
+    index: Optional[CorpusIndex] = None
+):
     """
     Analyze radicals that co-occur with a specific character.
 
     Args:
-        characters: List of Character objects
+        characters: Corpus or list of Character objects
         target_char: Character to analyze
         window_size: Window size for co-occurrence
+        index: Prebuilt CorpusIndex (defaults to the cached index for the corpus)
 
     Returns:
         Dictionary with analysis results
     """
+    if index is None:
+        index = get_index(characters)
+
     # Find all occurrences of the target character
-    target_positions = [c.global_position for c in characters if c.char == target_char]
+    frequency = index.count(target_char)
 
-    if not target_positions:
+    if not frequency:
         return {"error": f"Character {target_char} not found"}
 
     # Get radicals in the target character
     target_radicals = get_radicals(target_char)
 
+    # Neighbours of every occurrence, found by binary search on the index
+    _, neighbours = index.neighbourhood(target_char, window_size)
+    char_vocab = index.corpus.char_vocab
+
     # Find co-occurring radicals
     cooccurring_radicals = Counter()
     cooccurring_chars = defaultdict(list)
 
-    for pos in target_positions:
-        # Get context window
-        start = max(0, pos - window_size)
-        end = min(len(characters), pos + window_size + 1)
-
-        for i in range(start, end):
-            if i == pos:  # Skip the target character itself
-                continue
-
-            char_obj = characters[i]
-            radicals = get_radicals(char_obj.char)
-
-            for radical in radicals:
-                cooccurring_radicals[radical] += 1
-                cooccurring_chars[radical].append(char_obj.char)
+    for char_id in index.corpus.char_ids[neighbours].tolist():
+        for radical in index.char_radicals[char_id]:
+            cooccurring_radicals[radical] += 1
+            cooccurring_chars[radical].append(char_vocab[char_id])
 
     # Prepare results
     results = {
         "character": target_char,
         "character_radicals": target_radicals,
-        "frequency": len(target_positions),
+        "frequency": frequency,
         "top_cooccurring_radicals": cooccurring_radicals.most_common(10),
         "radical_examples": {
             rad: list(set(chars))[:5]
@@ -310,6 +963,97 @@ def analyze_specific_character(characters: List[Character], target_char: str, wi
     return results
 
 
+def character_radical_profiles(
+    characters: List[Character],
+    targets: Optional[Iterable[str]] = None,
+    window_size: int = 5,
+    index: Optional[CorpusIndex] = None
+) -> pd.DataFrame:
+    """
+    Neighbour-radical profiles of many characters from one sweep of the text.
+
+    Row c, column r counts the occurrences of radical r within ±window_size
+    positions of every occurrence of character c, which is the full
+    co-occurring radical count analyze_specific_character reports for one
+    character. All window pairs are found once; the character × character
+    neighbour counts are then multiplied by the character → radical table.
+
+    Args:
+        characters: Corpus or list of Character objects
+        targets: Characters to profile (default: every distinct character)
+        window_size: Window size for co-occurrence
+        index: Prebuilt CorpusIndex (defaults to the cached index for the corpus)
+
+    Returns:
+        DataFrame of counts with one row per target character and one column
+        per radical
+    """
+    if index is None:
+        index = get_index(characters)
+    corpus = index.corpus
+    char_vocab = corpus.char_vocab
+    n_chars = len(char_vocab)
+
+    if targets is None:
+        target_ids = np.arange(n_chars)
+    else:
+        char_to_id = {char: idx for idx, char in enumerate(char_vocab)}
+        targets = list(targets)
+        missing = [char for char in targets if char not in char_to_id]
+        if missing:
+            raise ValueError(f"Characters not found in text: {missing}")
+        target_ids = np.array([char_to_id[char] for char in targets], dtype=np.int64)
+
+    left, right = window_pair_indices(corpus.global_positions, window_size)
+    left_chars = corpus.char_ids[left]
+    right_chars = corpus.char_ids[right]
+
+    # Each window pair makes both characters neighbours of each other
+    neighbours = sparse.csr_matrix(
+        (np.ones(2 * len(left), dtype=np.int64),
+         (np.concatenate([left_chars, right_chars]), np.concatenate([right_chars, left_chars]))),
+        shape=(n_chars, n_chars)
+    )
+
+    indptr, indices, unique_radicals = corpus.radical_table()
+    char_radicals = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.int64), indices, indptr),
+        shape=(n_chars, len(unique_radicals))
+    )
+
+    profiles = (neighbours[target_ids] @ char_radicals).toarray()
+    return pd.DataFrame(profiles, index=[char_vocab[c] for c in target_ids.tolist()],
+                        columns=unique_radicals)
+
+
+def similar_characters(profiles: pd.DataFrame, target_char: str,
+                       n: int = 10) -> List[Tuple[str, float]]:
+    """
+    Characters whose neighbour-radical profiles are closest to a target's.
+
+    Args:
+        profiles: Output of character_radical_profiles
+        target_char: Character to compare against (must be a row of profiles)
+        n: Number of characters to return
+
+    Returns:
+        List of (character, cosine similarity) tuples, most similar first
+    """
+    if target_char not in profiles.index:
+        raise ValueError(f"Character {target_char} has no profile")
+
+    values = profiles.to_numpy(dtype=np.float64)
+    norms = np.linalg.norm(values, axis=1)
+    unit = np.divide(values, norms[:, None], out=np.zeros_like(values), where=norms[:, None] > 0)
+
+    target = profiles.index.get_loc(target_char)
+    similarity = unit @ unit[target]
+    similarity[target] = -np.inf
+
+    top = _top_n_indices(similarity, min(n, len(similarity) - 1))
+    return [(profiles.index[i], float(similarity[i])) for i in top.tolist()]
+
+
 if __name__ == "__main__":
     # Load the TTC data
     csv_path = Path(__file__).parent.parent / "public" / "Just Characters-Table 1.csv"
@@ -353,6 +1097,15 @@ if __name__ == "__main__":
     for radical, count in wei_analysis['top_cooccurring_radicals']:
         print(f"    {radical}: {count}")
 
+    # Profiles of every character in one sweep, for similarity search
+    print("\n" + "="*60)
+    profiles = character_radical_profiles(characters, window_size=5)
+    print(f"Neighbour-radical profiles: {profiles.shape[0]} characters x {profiles.shape[1]} radicals")
+    for target in ["無", "為"]:
+        similar = ", ".join(f"{char} ({score:.3f})"
+                            for char, score in similar_characters(profiles, target, n=5))
+        print(f"  Most similar to {target}: {similar}")
+
     # Export matrices
     output_dir = Path(__file__).parent / "output"
     output_dir.mkdir(exist_ok=True)
@@ -3,7 +3,9 @@ Comprehensive radical decomposition dictionary for Dao De Jing characters
 Focus on topological/transformational radicals rather than just semantic classification
 """
 
-from typing import List, Dict, Set
+import copy
+from types import MappingProxyType
+from typing import List, Dict, Set, Tuple, Mapping
 
 # Priority radical categories based on topological operations
 RADICAL_CATEGORIES = {
@@ -379,6 +381,131 @@ def get_radicals(char: str) -> List[str]:
     return RADICAL_MAP.get(char, [])
 
 
+# Reverse indexes over RADICAL_CATEGORIES and RADICAL_MAP, rebuilt by
+# rebuild_indexes() whenever the maps change through the registration API,
+# or by dictionary_version() when it finds the maps were edited directly
+_RADICAL_TO_CATEGORY: Mapping[str, str] = MappingProxyType({})
+_RADICAL_TO_CHARACTERS: Mapping[str, Tuple[str, ...]] = MappingProxyType({})
+_CATEGORY_TO_CHARACTERS: Mapping[str, Tuple[str, ...]] = MappingProxyType({})
+_ALL_RADICALS: Set[str] = set()
+_VERSION = 0
+# Copies of the (key, value) items the indexes were built from, in order
+_MAP_SNAPSHOT: List[Tuple[str, List[str]]] = []
+_CATEGORY_SNAPSHOT: List[Tuple[str, Dict]] = []
+
+
+def rebuild_indexes():
+    """
+    Rebuild the reverse lookup indexes from RADICAL_CATEGORIES and RADICAL_MAP.
+
+    Called automatically by the register_* functions, and by
+    dictionary_version() when the maps were edited directly. Code that edits
+    the maps directly and then uses the lookup functions without going
+    through a cache must call one of the two first.
+    """
+    global _RADICAL_TO_CATEGORY, _RADICAL_TO_CHARACTERS, _CATEGORY_TO_CHARACTERS
+    global _ALL_RADICALS, _VERSION, _MAP_SNAPSHOT, _CATEGORY_SNAPSHOT
+
+    # A radical listed under several categories belongs to the first one
+    radical_to_category = {}
+    for category, info in RADICAL_CATEGORIES.items():
+        for radical in info["radicals"]:
+            radical_to_category.setdefault(radical, category)
+
+    # Characters per radical in RADICAL_MAP order, each listed once
+    radical_to_characters = {}
+    all_radicals = set()
+    for char, rads in RADICAL_MAP.items():
+        all_radicals.update(rads)
+        for radical in dict.fromkeys(rads):
+            radical_to_characters.setdefault(radical, []).append(char)
+
+    category_to_characters = {}
+    for category, info in RADICAL_CATEGORIES.items():
+        chars = {}
+        for radical in info["radicals"]:
+            chars.update(dict.fromkeys(radical_to_characters.get(radical, ())))
+        category_to_characters[category] = tuple(chars)
+
+    _RADICAL_TO_CATEGORY = MappingProxyType(radical_to_category)
+    _RADICAL_TO_CHARACTERS = MappingProxyType(
+        {radical: tuple(chars) for radical, chars in radical_to_characters.items()})
+    _CATEGORY_TO_CHARACTERS = MappingProxyType(category_to_characters)
+    _ALL_RADICALS = all_radicals
+    _MAP_SNAPSHOT = [(char, list(rads)) for char, rads in RADICAL_MAP.items()]
+    _CATEGORY_SNAPSHOT = copy.deepcopy(list(RADICAL_CATEGORIES.items()))
+    _VERSION += 1
+
+
+def dictionary_version(check: bool = True) -> int:
+    """
+    Counter that increases every time the radical dictionary changes.
+
+    Direct edits to RADICAL_MAP or RADICAL_CATEGORIES are detected by comparing
+    the maps against the contents the indexes were last built from; the
+    indexes are rebuilt on the spot, so lookups made after this call see the
+    edit. Caches derived from the dictionary are keyed on this value.
+
+    Args:
+        check: Look for direct edits first, which costs a pass over both maps.
+            With False the counter is returned as is (O(1)): it reflects
+            register_* calls and any edit a checking call has already seen.
+
+    Returns:
+        Dictionary version
+    """
+    # Comparing item lists in C is cheaper than building a fresh fingerprint
+    if check and (list(RADICAL_MAP.items()) != _MAP_SNAPSHOT
+                  or list(RADICAL_CATEGORIES.items()) != _CATEGORY_SNAPSHOT):
+        rebuild_indexes()
+    return _VERSION
+
+
+def register_character(char: str, radicals: List[str]):
+    """
+    Add or replace the radical decomposition of a character.
+
+    Args:
+        char: Chinese character
+        radicals: Radicals in the character
+    """
+    RADICAL_MAP[char] = list(radicals)
+    rebuild_indexes()
+
+
+def register_category(category: str, radicals: List[str], description: str = "",
+                      color: str = "#6b7280"):
+    """
+    Add or replace a radical category.
+
+    Args:
+        category: Category name
+        radicals: Radicals belonging to the category
+        description: Short description of the category
+        color: Hex color used in visualizations
+    """
+    RADICAL_CATEGORIES[category] = {
+        "radicals": list(radicals),
+        "description": description,
+        "color": color
+    }
+    rebuild_indexes()
+
+
+def register_category_radical(category: str, radical: str):
+    """
+    Add a radical to an existing category.
+
+    Args:
+        category: Category name (must already exist)
+        radical: Radical to add
+    """
+    radicals = RADICAL_CATEGORIES[category]["radicals"]
+    if radical not in radicals:
+        radicals.append(radical)
+    rebuild_indexes()
+
+
 def get_radical_category(radical: str) -> str:
     """
     Get the category (motion, fluid, constraint, etc.) for a radical.
@@ -389,18 +516,12 @@ def get_radical_category(radical: str) -> str:
     Returns:
         Category name or "other" if not in priority categories
     """
-    for category, info in RADICAL_CATEGORIES.items():
-        if radical in info["radicals"]:
-            return category
-    return "other"
+    return _RADICAL_TO_CATEGORY.get(radical, "other")
 
 
 def get_all_radicals() -> Set[str]:
     """Get set of all unique radicals in the dictionary."""
-    radicals = set()
-    for char_radicals in RADICAL_MAP.values():
-        radicals.update(char_radicals)
-    return radicals
+    return set(_ALL_RADICALS)
 
 
 def get_characters_with_radical(radical: str) -> List[str]:
@@ -413,7 +534,20 @@ def get_characters_with_radical(radical: str) -> List[str]:
     Returns:
         List of characters containing that radical
     """
-    return [char for char, rads in RADICAL_MAP.items() if radical in rads]
+    return list(_RADICAL_TO_CHARACTERS.get(radical, ()))
+
+
+def get_characters_in_category(category: str) -> List[str]:
+    """
+    Get all characters containing any radical of a category.
+
+    Args:
+        category: Category name
+
+    Returns:
+        List of characters in RADICAL_MAP order
+    """
+    return list(_CATEGORY_TO_CHARACTERS.get(category, ()))
 
 
 def export_dictionary_stats() -> Dict:
@@ -428,19 +562,19 @@ def export_dictionary_stats() -> Dict:
     }
 
     # Count by category
-    for category, info in RADICAL_CATEGORIES.items():
-        chars_in_category = []
-        for radical in info["radicals"]:
-            chars_in_category.extend(get_characters_with_radical(radical))
-        stats["radicals_by_category"][category] = len(set(chars_in_category))
+    for category in RADICAL_CATEGORIES:
+        stats["radicals_by_category"][category] = len(_CATEGORY_TO_CHARACTERS.get(category, ()))
 
     # Count characters per radical
     for radical in all_radicals:
-        stats["characters_per_radical"][radical] = len(get_characters_with_radical(radical))
+        stats["characters_per_radical"][radical] = len(_RADICAL_TO_CHARACTERS.get(radical, ()))
 
     return stats
 
 
+rebuild_indexes()
+
+
 if __name__ == "__main__":
     # Print statistics
     stats = export_dictionary_stats()
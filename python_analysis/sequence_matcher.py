@@ -0,0 +1,154 @@
+"""
+Multi-pattern sequence matcher over symbol streams
+Compiles many gapped sequences into one trie automaton and finds all matches in a single scan
+"""
+
+import numpy as np
+from collections import deque
+from typing import List, Dict, Tuple, Sequence, Hashable, Union
+
+
+class _State:
+    """A partial match waiting at a trie node for its next symbol."""
+
+    __slots__ = ('node', 'last_position', 'path')
+
+    def __init__(self, node: int, last_position: int, path: Tuple[int, ...]):
+        self.node = node
+        self.last_position = last_position
+        self.path = path
+
+
+class SequenceMatcher:
+    """
+    Automaton that matches many gapped symbol sequences in one pass.
+
+    Patterns are compiled into a trie whose edges carry a symbol and the
+    largest allowed gap (in positions) since the previous match, so patterns
+    sharing a prefix share states. Scanning a stream keeps the partial
+    matches indexed by the symbol they wait for; each stream item only
+    touches the states that can advance on it.
+
+    Matching is greedy: from each occurrence of a pattern's first symbol,
+    every following step takes the first later item with the right symbol
+    within the gap. Each start therefore yields at most one match per pattern.
+
+    Several items may share a position (e.g. one item per property of the
+    same token); with min_gap=1, consecutive elements must come from
+    strictly later positions.
+    """
+
+    def __init__(self, patterns: Dict[str, Sequence[Hashable]],
+                 max_gap: Union[int, Dict[str, int]] = 10,
+                 min_gap: int = 0):
+        """
+        Args:
+            patterns: Pattern name → sequence of symbols
+            max_gap: Largest position difference between consecutive
+                elements, for all patterns or per pattern name
+            min_gap: Smallest position difference between consecutive elements
+        """
+        self.patterns = {name: tuple(symbols) for name, symbols in patterns.items()}
+        self.min_gap = min_gap
+        if any(len(symbols) == 0 for symbols in self.patterns.values()):
+            raise ValueError("Patterns must contain at least one symbol")
+
+        # Node 0 is the root; edges[node][symbol] -> [(gap, child), ...]
+        self._edges: List[Dict[Hashable, List[Tuple[int, int]]]] = [{}]
+        self._accepts: List[List[str]] = [[]]
+        self._horizon: List[int] = [0]
+
+        for name, symbols in self.patterns.items():
+            gap = max_gap[name] if isinstance(max_gap, dict) else max_gap
+            node = 0
+            for step, symbol in enumerate(symbols):
+                # The first symbol has no predecessor, so its gap is irrelevant
+                edge_gap = gap if step else 0
+                node = self._child(node, symbol, edge_gap)
+            self._accepts[node].append(name)
+
+        self.alphabet = {symbol for symbols in self.patterns.values() for symbol in symbols}
+
+    def _child(self, node: int, symbol: Hashable, gap: int) -> int:
+        edges = self._edges[node].setdefault(symbol, [])
+        for edge_gap, child in edges:
+            if edge_gap == gap:
+                return child
+
+        child = len(self._edges)
+        self._edges.append({})
+        self._accepts.append([])
+        self._horizon.append(0)
+        edges.append((gap, child))
+        self._horizon[node] = max(self._horizon[node], gap)
+        return child
+
+    def scan(self, symbols: Sequence[Hashable], positions: Sequence[int]) -> Dict[str, List[List[int]]]:
+        """
+        Find every match of every pattern in a stream.
+
+        Args:
+            symbols: Symbol of each stream item, in stream order
+            positions: Position of each item (non-decreasing)
+
+        Returns:
+            Pattern name → list of matches, each the list of stream indices
+            matched by the pattern's elements, ordered by starting index
+        """
+        matches = {name: [] for name in self.patterns}
+
+        if isinstance(symbols, np.ndarray):
+            # Items whose symbol appears in no pattern can never advance a state
+            items = np.flatnonzero(np.isin(symbols, list(self.alphabet))).tolist()
+            symbols = symbols.tolist()
+        else:
+            items = range(len(symbols))
+        positions = np.asarray(positions).tolist()
+
+        # States waiting for each symbol, in creation (and so position) order
+        waiting: Dict[Hashable, deque] = {}
+        root_edges = self._edges[0]
+        horizon = self._horizon
+        min_gap = self.min_gap
+
+        for i in items:
+            symbol = symbols[i]
+            position = positions[i]
+            advanced = []
+            too_close = []
+
+            # Every edge for this symbol is either taken now or out of reach for
+            # good (positions never decrease), so the waiting list is consumed,
+            # except for states still inside min_gap, which keep waiting
+            for state in waiting.pop(symbol, ()):
+                distance = position - state.last_position
+                if distance < min_gap:
+                    too_close.append(state)
+                    continue
+                if distance > horizon[state.node]:
+                    continue
+                for gap, child in self._edges[state.node][symbol]:
+                    if distance <= gap:
+                        advanced.append(_State(child, position, state.path + (i,)))
+            if too_close:
+                waiting[symbol] = deque(too_close)
+
+            for _, child in root_edges.get(symbol, ()):
+                advanced.append(_State(child, position, (i,)))
+
+            for state in advanced:
+                for name in self._accepts[state.node]:
+                    matches[name].append(list(state.path))
+                for next_symbol in self._edges[state.node]:
+                    queue = waiting.get(next_symbol)
+                    if queue is None:
+                        queue = waiting[next_symbol] = deque()
+                    # Drop states that can no longer advance before queueing more
+                    while queue and position - queue[0].last_position > horizon[queue[0].node]:
+                        queue.popleft()
+                    queue.append(state)
+
+        for found in matches.values():
+            found.sort(key=lambda path: path[0])
+
+        return matches
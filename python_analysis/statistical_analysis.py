@@ -5,18 +5,24 @@ Includes clustering, significance testing, and pattern detection
 
 import numpy as np
 import pandas as pd
-from scipy import stats
+from scipy import stats, sparse
 from scipy.cluster import hierarchy
 from scipy.spatial.distance import pdist
 import matplotlib.pyplot as plt
 import seaborn as sns
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from collections import defaultdict, Counter
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional, Iterable
 
 from ttc_parser import parse_ttc_csv
 from radical_cooccurrence import RadicalCoOccurrenceMatrix
 from radical_dictionary import get_radical_category, RADICAL_CATEGORIES
+from corpus_index import CorpusIndex, get_index
+from null_model import simulate_null
+from sequence_matcher import SequenceMatcher
 
 # Configure matplotlib to use Chinese fonts
 import matplotlib
@@ -24,6 +30,39 @@ matplotlib.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'PingFang SC', 'ST
 matplotlib.rcParams['axes.unicode_minus'] = False  # Fix minus sign display
 
 
+def cooccurrence_marginals(matrix: RadicalCoOccurrenceMatrix) -> Tuple[np.ndarray, float]:
+    """
+    Row sums and total pair count of a co-occurrence matrix.
+
+    Args:
+        matrix: RadicalCoOccurrenceMatrix object
+
+    Returns:
+        Tuple of (co-occurrence count per radical, total co-occurring pairs)
+    """
+    row_sums = np.asarray(matrix.counts.sum(axis=1)).ravel()
+    total_cooccurrences = row_sums.sum() / 2  # Divide by 2 because matrix is symmetric
+    return row_sums, total_cooccurrences
+
+
+def expected_cooccurrence_matrix(matrix: RadicalCoOccurrenceMatrix) -> np.ndarray:
+    """
+    Expected co-occurrence of every radical pair under random distribution.
+
+    Uses the formula: E(X,Y) = (count(X) * count(Y)) / total_pairs
+
+    Args:
+        matrix: RadicalCoOccurrenceMatrix object
+
+    Returns:
+        (n_radicals, n_radicals) float array of expected counts
+    """
+    row_sums, total_cooccurrences = cooccurrence_marginals(matrix)
+    if total_cooccurrences == 0:
+        return np.zeros((len(row_sums), len(row_sums)))
+    return np.outer(row_sums, row_sums) / (2 * total_cooccurrences)
+
+
 def calculate_expected_cooccurrence(
     matrix: RadicalCoOccurrenceMatrix,
     radical1: str,
@@ -42,15 +81,14 @@ def calculate_expected_cooccurrence(
     Returns:
         Expected co-occurrence count under random distribution
     """
-    # Count total occurrences of each radical in the matrix
-    total_cooccurrences = matrix.matrix.sum().sum() / 2  # Divide by 2 because matrix is symmetric
+    row_sums, total_cooccurrences = cooccurrence_marginals(matrix)
 
     if total_cooccurrences == 0:
         return 0.0
 
     # Count occurrences for each radical (sum of its row/column)
-    count1 = matrix.matrix.loc[radical1].sum()
-    count2 = matrix.matrix.loc[radical2].sum()
+    count1 = row_sums[matrix.unique_radicals.index(radical1)]
+    count2 = row_sums[matrix.unique_radicals.index(radical2)]
 
     # Expected value under independence
     expected = (count1 * count2) / (2 * total_cooccurrences)
@@ -58,60 +96,192 @@ def calculate_expected_cooccurrence(
     return expected
 
 
+def benjamini_hochberg(p_values: np.ndarray) -> np.ndarray:
+    """
+    Benjamini-Hochberg false discovery rate adjustment.
+
+    Args:
+        p_values: Array of p-values
+
+    Returns:
+        Array of adjusted p-values (q-values) in the same order
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    m = len(p_values)
+    if m == 0:
+        return p_values
+
+    order = np.argsort(p_values)
+    ranked = p_values[order] * m / np.arange(1, m + 1)
+
+    # Enforce monotonicity from the largest p-value down
+    ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+
+    q_values = np.empty(m)
+    q_values[order] = np.minimum(ranked, 1.0)
+    return q_values
+
+
+def hypergeometric_p_values(matrix: RadicalCoOccurrenceMatrix, rows: np.ndarray,
+                            cols: np.ndarray, tail: str = 'upper') -> np.ndarray:
+    """
+    One-sided exact p-values for enrichment (or depletion) of radical pairs.
+
+    Each pair's count is compared against a hypergeometric draw: the
+    count(X) pair slots of one radical are filled from the 2 * total_pairs
+    slots of the whole matrix, count(Y) of which belong to the other radical.
+    Its mean is the expected co-occurrence used by the chi-square test.
+
+    Args:
+        matrix: RadicalCoOccurrenceMatrix object
+        rows: Row index of each pair
+        cols: Column index of each pair
+        tail: 'upper' tests enrichment, 'lower' tests depletion
+
+    Returns:
+        P(X >= observed) for each pair, or P(X <= observed) with tail='lower'
+    """
+    row_sums, total_cooccurrences = cooccurrence_marginals(matrix)
+    observed = _pair_values(matrix.counts, rows, cols)
+    population = int(round(2 * total_cooccurrences))
+    if tail == 'lower':
+        return stats.hypergeom.cdf(observed, population, row_sums[cols], row_sums[rows])
+    return stats.hypergeom.sf(observed - 1, population, row_sums[cols], row_sums[rows])
+
+
+def _pair_values(counts, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Entries of a dense or sparse count matrix at (rows, cols)."""
+    return np.asarray(counts[rows, cols]).ravel()
+
+
+def _upper_pairs(counts, min_observed: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Row, column and count of the upper-triangle pairs, in row-major order.
+
+    For the sparse backend only stored entries are read when zero counts
+    cannot pass min_observed, so nothing of size radicals² is allocated.
+    """
+    if sparse.issparse(counts) and min_observed > 0:
+        upper = sparse.triu(counts, k=1, format='coo')
+        order = np.lexsort((upper.col, upper.row))
+        return (upper.row[order].astype(np.int64), upper.col[order].astype(np.int64),
+                np.asarray(upper.data[order]))
+
+    rows, cols = np.triu_indices(counts.shape[0], k=1)
+    return rows, cols, _pair_values(counts, rows, cols)
+
+
+SIGNIFICANCE_METHODS = ('chi2', 'hypergeometric', 'permutation')
+
+
 def calculate_significance(
     matrix: RadicalCoOccurrenceMatrix,
-    min_observed: int = 5
+    min_observed: int = 5,
+    method: str = 'chi2',
+    alpha: float = 0.05,
+    n_permutations: int = 1000,
+    seed: int = 0,
+    chapters: Optional[Iterable[int]] = None
 ) -> pd.DataFrame:
     """
-    Calculate statistical significance for all radical pairs using chi-square test.
+    Calculate statistical significance for all radical pairs.
+
+    The default 'chi2' method flags pairs whose chi-square statistic exceeds
+    3.84 (p < 0.05, one degree of freedom). 'hypergeometric' and
+    'permutation' compute one-sided enrichment p-values, adjust them with
+    Benjamini-Hochberg, and flag pairs with q < alpha; they add 'p_value'
+    and 'q_value' columns. The permutation p-values come from the
+    within-chapter shuffle of null_model.simulate_null.
 
     Args:
         matrix: RadicalCoOccurrenceMatrix object
         min_observed: Minimum observed count to consider
+        method: 'chi2', 'hypergeometric' or 'permutation'
+        alpha: False discovery rate for the exact and permutation methods
+        n_permutations: Number of shuffles for the permutation method
+        seed: Random seed for the permutation method
+        chapters: Restrict the counts to a chapter range or subset, e.g.
+            range(1, 38) (see RadicalCoOccurrenceMatrix.chapter_counts)
 
     Returns:
-        DataFrame with observed, expected, and significance metrics
-    """
-    results = []
-
-    for i, rad1 in enumerate(matrix.unique_radicals):
-        for j in range(i + 1, len(matrix.unique_radicals)):
-            rad2 = matrix.unique_radicals[j]
-
-            observed = matrix.matrix.loc[rad1, rad2]
-
-            if observed < min_observed:
-                continue
-
-            expected = calculate_expected_cooccurrence(matrix, rad1, rad2)
-
-            # Calculate chi-square statistic
-            if expected > 0:
-                chi_sq = ((observed - expected) ** 2) / expected
-                enrichment = observed / expected
-            else:
-                chi_sq = 0
-                enrichment = 0
-
-            # Categorize
-            cat1 = get_radical_category(rad1)
-            cat2 = get_radical_category(rad2)
-            same_category = (cat1 == cat2 and cat1 != 'other')
-
-            results.append({
-                'radical1': rad1,
-                'radical2': rad2,
-                'category1': cat1,
-                'category2': cat2,
-                'same_category': same_category,
-                'observed': int(observed),
-                'expected': expected,
-                'enrichment': enrichment,
-                'chi_square': chi_sq,
-                'significant': chi_sq > 3.84  # p < 0.05 threshold
-            })
+        DataFrame with observed, expected, and significance metrics (cached on
+        the matrix until its counts or the radical categories change)
+    """
+    if method not in SIGNIFICANCE_METHODS:
+        raise ValueError(f"Unknown method: {method!r} (expected one of {SIGNIFICANCE_METHODS})")
+
+    if chapters is not None and not isinstance(chapters, range):
+        chapters = tuple(chapters)
+
+    def build() -> pd.DataFrame:
+        # The chapter subset is only counted on a cache miss
+        source = matrix if chapters is None else matrix.for_chapters(chapters)
+        return _significance_table(source, min_observed, method, alpha, n_permutations, seed)
+
+    key = ('significance', min_observed, method, alpha, n_permutations, seed, chapters)
+    return matrix.memoize(key, build, categories=True).copy()
+
+
+def _significance_table(
+    matrix: RadicalCoOccurrenceMatrix,
+    min_observed: int,
+    method: str,
+    alpha: float,
+    n_permutations: int,
+    seed: int
+) -> pd.DataFrame:
+
+    radicals = matrix.unique_radicals
+    rows, cols, observed = _upper_pairs(matrix.counts, min_observed)
+
+    keep = observed >= min_observed
+    rows, cols, observed = rows[keep], cols[keep], observed[keep]
+
+    # Expected counts for the kept pairs only, as in expected_cooccurrence_matrix
+    row_sums, total_cooccurrences = cooccurrence_marginals(matrix)
+    if total_cooccurrences == 0:
+        expected = np.zeros(len(rows))
+    else:
+        expected = row_sums[rows] * row_sums[cols] / (2 * total_cooccurrences)
+    positive = expected > 0
+    safe_expected = np.where(positive, expected, 1)
+
+    # Calculate chi-square statistic
+    chi_sq = np.where(positive, ((observed - expected) ** 2) / safe_expected, 0)
+    enrichment = np.where(positive, observed / safe_expected, 0)
+
+    # Categorize
+    radical_categories = np.array([get_radical_category(r) for r in radicals], dtype=object)
+    cat1 = radical_categories[rows]
+    cat2 = radical_categories[cols]
+
+    df = pd.DataFrame({
+        'radical1': np.array(radicals, dtype=object)[rows],
+        'radical2': np.array(radicals, dtype=object)[cols],
+        'category1': cat1,
+        'category2': cat2,
+        'same_category': (cat1 == cat2) & (cat1 != 'other'),
+        'observed': observed.astype(int),
+        'expected': expected,
+        'enrichment': enrichment,
+        'chi_square': chi_sq,
+        'significant': chi_sq > 3.84  # p < 0.05 threshold
+    })
+
+    if method != 'chi2':
+        if method == 'hypergeometric':
+            p_values = hypergeometric_p_values(matrix, rows, cols)
+        else:
+            if matrix.corpus is None:
+                raise ValueError("The permutation test needs the source text; use "
+                                 "method='hypergeometric' for matrices built from "
+                                 "counts or restricted to chapters")
+            null = simulate_null(matrix, 'shuffle', n_permutations, seed)
+            p_values = null['p_enriched'][rows, cols]
+        df['p_value'] = p_values
+        df['q_value'] = benjamini_hochberg(p_values)
+        df['significant'] = df['q_value'] < alpha
 
-    df = pd.DataFrame(results)
     df = df.sort_values('chi_square', ascending=False)
 
     return df
@@ -159,86 +329,362 @@ def analyze_category_clustering(matrix: RadicalCoOccurrenceMatrix) -> Dict:
     return results
 
 
+# Per-unit within/total counts shared by bootstrap workers
+_BOOTSTRAP_STATE = {}
+
+
+def _init_bootstrap_worker(within: np.ndarray, total: np.ndarray):
+    _BOOTSTRAP_STATE['within'] = within
+    _BOOTSTRAP_STATE['total'] = total
+
+
+def _bootstrap_chunk(task: Tuple[np.random.SeedSequence, int]) -> np.ndarray:
+    """
+    Within-category proportions for a block of bootstrap resamples.
+
+    Args:
+        task: (seed sequence for this block, number of resamples)
+
+    Returns:
+        (resamples, categories) array of proportions (NaN where a category
+        has no co-occurrences in the resample)
+    """
+    seed_sequence, n_resamples = task
+    within = _BOOTSTRAP_STATE['within']
+    total = _BOOTSTRAP_STATE['total']
+    n_units = len(within)
+
+    # A resample is a multiset of units, so its counts are a weighted sum
+    rng = np.random.default_rng(seed_sequence)
+    weights = rng.multinomial(n_units, np.full(n_units, 1 / n_units), size=n_resamples)
+
+    resampled_within = weights @ within
+    resampled_total = weights @ total
+    return np.divide(resampled_within, resampled_total,
+                     out=np.full(resampled_within.shape, np.nan), where=resampled_total > 0)
+
+
+def bootstrap_category_clustering(
+    matrix: RadicalCoOccurrenceMatrix,
+    n_resamples: int = 10000,
+    confidence: float = 0.95,
+    block_size: Optional[int] = None,
+    seed: int = 0,
+    n_workers: Optional[int] = None,
+    chunk_size: int = 1000
+) -> pd.DataFrame:
+    """
+    Bootstrap confidence intervals for within-category proportions.
+
+    Resamples chapters (or, with block_size, consecutive blocks of text)
+    with replacement. Per-unit category counts are projected once from the
+    chapter or block tensor, so each resample is a weighted sum rather than
+    a rebuild. Resamples run in seeded chunks across worker processes;
+    results depend on the seed but not on the number of workers.
+
+    Args:
+        matrix: RadicalCoOccurrenceMatrix object
+        n_resamples: Number of bootstrap resamples
+        confidence: Confidence level of the percentile intervals
+        block_size: Resample blocks of this many positions instead of chapters
+        seed: Random seed
+        n_workers: Worker processes (default: CPU count; 1 runs in-process)
+        chunk_size: Resamples per task
+
+    Returns:
+        DataFrame with one row per category: point estimate (as in
+        analyze_category_clustering), bootstrap standard error and interval
+    """
+    if n_resamples < 1:
+        raise ValueError("n_resamples must be at least 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    if block_size is None:
+        _, tensor = matrix.chapter_tensor()
+    else:
+        tensor = matrix.block_tensor(block_size)
+
+    projection, categories = matrix.get_category_projection()
+    projection = projection.toarray()
+
+    # Unit × category × category counts, reduced to what the proportion needs
+    category_tensor = np.einsum('ri,krs,sj->kij', projection, tensor, projection)
+    within = np.diagonal(category_tensor, axis1=1, axis2=2).astype(np.int64)
+    total = category_tensor.sum(axis=2).astype(np.int64)
+
+    chunk_sizes = [chunk_size] * (n_resamples // chunk_size)
+    if n_resamples % chunk_size:
+        chunk_sizes.append(n_resamples % chunk_size)
+    tasks = list(zip(np.random.SeedSequence(seed).spawn(len(chunk_sizes)), chunk_sizes))
+
+    # Never more workers than resamples (or chunks of them)
+    n_workers = min(n_workers or os.cpu_count() or 1, n_resamples, len(tasks))
+    if n_workers == 1:
+        _init_bootstrap_worker(within, total)
+        results = [_bootstrap_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_bootstrap_worker,
+                                 initargs=(within, total)) as executor:
+            results = list(executor.map(_bootstrap_chunk, tasks))
+    proportions = np.concatenate(results)
+
+    full_within = within.sum(axis=0)
+    full_total = total.sum(axis=0)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.nanpercentile(proportions, [tail, 100 - tail], axis=0)
+
+    df = pd.DataFrame({
+        'category': categories,
+        'within_category': full_within,
+        'total': full_total,
+        'within_proportion': np.divide(full_within, full_total, out=np.zeros(len(categories)),
+                                       where=full_total > 0),
+        'std_error': np.nanstd(proportions, axis=0, ddof=1),
+        'ci_low': low,
+        'ci_high': high
+    })
+
+    return df[df['category'] != 'other'].reset_index(drop=True)
+
+
+def find_sequence_patterns(
+    characters: List,
+    patterns: Dict[str, List[str]],
+    window_size: int = 10,
+    kind: str = 'category',
+    index: CorpusIndex = None
+) -> Dict[str, List[Dict]]:
+    """
+    Find many radical or category sequences in one scan of the text.
+
+    All patterns are compiled into a single SequenceMatcher and the radical
+    occurrence stream is read once. From each occurrence of a pattern's first
+    element, every later element is the first following occurrence within
+    window_size positions of the previous one.
+
+    Args:
+        characters: Corpus or list of Character objects
+        patterns: Pattern name → list of radical categories (or radicals) in order
+        window_size: Maximum distance between consecutive elements
+        kind: 'category' or 'radical'
+        index: Prebuilt CorpusIndex (defaults to the cached index for the corpus)
+
+    Returns:
+        Pattern name → list of found sequences with details
+    """
+    if index is None:
+        index = get_index(characters)
+
+    if kind == 'category':
+        names, symbols = index.category_names, index.occurrence_categories
+    elif kind == 'radical':
+        names, symbols = index.unique_radicals, index.radical_ids
+    else:
+        raise ValueError(f"Unknown sequence kind: {kind!r} (expected 'category' or 'radical')")
+
+    # Unknown names get an id no occurrence has, so their patterns never match
+    name_to_id = {name: idx for idx, name in enumerate(names)}
+    matcher = SequenceMatcher(
+        {pattern: [name_to_id.get(name, -1) for name in sequence]
+         for pattern, sequence in patterns.items()},
+        max_gap=window_size
+    )
+    matches = matcher.scan(symbols, index.occurrence_positions)
+
+    corpus = index.corpus
+    found = {}
+    for pattern, paths in matches.items():
+        found[pattern] = []
+        for seq_match in paths:
+            entries = index.occurrence_index[seq_match]
+            found[pattern].append({
+                'sequence': [index.unique_radicals[r] for r in index.radical_ids[seq_match]],
+                'characters': [corpus.char_vocab[c] for c in corpus.char_ids[entries]],
+                'positions': corpus.global_positions[entries].tolist(),
+                'chapter': int(corpus.chapters[entries[0]])
+            })
+
+    return found
+
+
 def find_radical_sequences(
     characters: List,
     sequence: List[str],
-    window_size: int = 10
+    window_size: int = 10,
+    index: CorpusIndex = None
 ) -> List[Dict]:
     """
     Find sequences of radicals in the text (e.g., water -> constraint -> emergence).
 
     Args:
-        characters: List of Character objects
+        characters: Corpus or list of Character objects
         sequence: List of radical categories in order
         window_size: Maximum distance between radicals in sequence
+        index: Prebuilt CorpusIndex (defaults to the cached index for the corpus)
 
     Returns:
         List of found sequences with details
     """
-    from ttc_parser import Character
-    from radical_dictionary import get_radicals
-
-    found_sequences = []
-
-    # Extract all radical occurrences with their categories
-    radical_occurrences = []
-    for char_obj in characters:
-        radicals = get_radicals(char_obj.char)
-        for radical in radicals:
-            category = get_radical_category(radical)
-            radical_occurrences.append({
-                'radical': radical,
-                'category': category,
-                'char': char_obj.char,
-                'position': char_obj.global_position,
-                'chapter': char_obj.chapter
-            })
+    return find_sequence_patterns(characters, {'sequence': sequence}, window_size,
+                                  index=index)['sequence']
 
-    # Search for sequences
-    for i, occ1 in enumerate(radical_occurrences):
-        if occ1['category'] != sequence[0]:
-            continue
 
-        # Try to find the rest of the sequence
-        seq_match = [occ1]
-        last_pos = occ1['position']
-
-        for target_category in sequence[1:]:
-            found = False
-            # Look ahead for next category
-            for j in range(i + 1, len(radical_occurrences)):
-                occ2 = radical_occurrences[j]
-
-                # Stop if too far
-                if occ2['position'] - last_pos > window_size:
-                    break
-
-                if occ2['category'] == target_category:
-                    seq_match.append(occ2)
-                    last_pos = occ2['position']
-                    found = True
-                    break
-
-            if not found:
-                break
-
-        # If we matched the full sequence, record it
-        if len(seq_match) == len(sequence):
-            found_sequences.append({
-                'sequence': [s['radical'] for s in seq_match],
-                'characters': [s['char'] for s in seq_match],
-                'positions': [s['position'] for s in seq_match],
-                'chapter': seq_match[0]['chapter']
-            })
+class RadicalClustering:
+    """
+    Hierarchical clustering of radicals by co-occurrence profile.
+
+    The condensed distance matrix is computed once; linkages, optimal leaf
+    orderings and cophenetic correlations are cached per linkage method, so
+    sweeping methods and cut thresholds costs a single distance computation.
+    Nothing is drawn until plot_dendrogram() is called.
+    """
 
-    return found_sequences
+    def __init__(self, matrix: RadicalCoOccurrenceMatrix, metric: str = 'correlation'):
+        """
+        Args:
+            matrix: RadicalCoOccurrenceMatrix object
+            metric: Distance metric passed to scipy's pdist
+        """
+        # Use normalized matrix for clustering
+        data = matrix.get_normalized_matrix()
+        self.labels = data.index.tolist()
+        self.metric = metric
+        if any(isinstance(dtype, pd.SparseDtype) for dtype in data.dtypes):
+            data = data.sparse.to_dense()
+        self._data = np.asarray(data.values, dtype=float)
+        self._distances = None
+        self._linkages = {}
+        self._optimal_linkages = {}
+        self._cophenetic = {}
+
+    @property
+    def distances(self) -> np.ndarray:
+        """Condensed pairwise distance matrix (1 - correlation by default)."""
+        if self._distances is None:
+            distances = pdist(self._data, metric=self.metric)
+            # Radicals with no co-occurrences (e.g. in a chapter slice) have an
+            # undefined correlation; treat them as uncorrelated with everything
+            self._distances = np.nan_to_num(distances, nan=1.0)
+        return self._distances
+
+    def linkage(self, method: str = 'average', optimal_ordering: bool = False) -> np.ndarray:
+        """
+        Linkage matrix for a method.
+
+        Args:
+            method: Linkage method ('single', 'complete', 'average', 'ward', ...)
+            optimal_ordering: Reorder leaves so adjacent leaves are as similar as possible
+
+        Returns:
+            scipy linkage matrix
+        """
+        if method not in self._linkages:
+            self._linkages[method] = hierarchy.linkage(self.distances, method=method)
+        if not optimal_ordering:
+            return self._linkages[method]
+
+        if method not in self._optimal_linkages:
+            self._optimal_linkages[method] = hierarchy.optimal_leaf_ordering(
+                self._linkages[method], self.distances)
+        return self._optimal_linkages[method]
+
+    def leaf_order(self, method: str = 'average', optimal_ordering: bool = False) -> List[str]:
+        """Radicals in dendrogram leaf order."""
+        leaves = hierarchy.leaves_list(self.linkage(method, optimal_ordering))
+        return [self.labels[i] for i in leaves]
+
+    def clusters(self, t: float, method: str = 'average', criterion: str = 'distance') -> pd.Series:
+        """
+        Flat clusters from cutting the tree.
+
+        Args:
+            t: Cut threshold (a distance, or a cluster count with criterion='maxclust')
+            method: Linkage method
+            criterion: Any fcluster criterion, e.g. 'distance' or 'maxclust'
+
+        Returns:
+            Series mapping radical to cluster id
+        """
+        assignments = hierarchy.fcluster(self.linkage(method), t, criterion=criterion)
+        return pd.Series(assignments, index=self.labels, name='cluster')
+
+    def cophenetic_correlation(self, method: str = 'average') -> float:
+        """How faithfully the tree's merge heights preserve the original distances."""
+        if method not in self._cophenetic:
+            self._cophenetic[method] = float(hierarchy.cophenet(self.linkage(method),
+                                                                self.distances)[0])
+        return self._cophenetic[method]
+
+    def sweep(self, methods: List[str], thresholds: List[float],
+              criterion: str = 'distance') -> pd.DataFrame:
+        """
+        Number of flat clusters for every linkage method and cut threshold.
+
+        Args:
+            methods: Linkage methods to compare
+            thresholds: Cut thresholds
+            criterion: fcluster criterion
+
+        Returns:
+            DataFrame with one row per (method, threshold) and the method's
+            cophenetic correlation
+        """
+        rows = []
+        for method in methods:
+            cophenetic = self.cophenetic_correlation(method)
+            for t in thresholds:
+                rows.append({
+                    'method': method,
+                    'threshold': t,
+                    'n_clusters': int(self.clusters(t, method, criterion).max()),
+                    'cophenetic_correlation': cophenetic
+                })
+        return pd.DataFrame(rows)
+
+    def plot_dendrogram(self, output_path: str, method: str = 'average',
+                        optimal_ordering: bool = False, dpi: int = 300):
+        """
+        Render the dendrogram for a method.
+
+        Args:
+            output_path: Path to save the figure
+            method: Linkage method
+            optimal_ordering: Use the optimal leaf ordering
+            dpi: Output resolution
+        """
+        # Create dendrogram
+        fig, ax = plt.subplots(figsize=(15, 10))
+
+        dendro = hierarchy.dendrogram(
+            self.linkage(method, optimal_ordering),
+            labels=self.labels,
+            ax=ax,
+            leaf_font_size=10,
+            leaf_rotation=90
+        )
+
+        ax.set_title('Hierarchical Clustering of Radicals by Co-occurrence',
+                    fontsize=14, fontweight='bold', pad=15)
+        ax.set_xlabel('Radical', fontsize=11)
+        ax.set_ylabel('Distance (1 - Correlation)', fontsize=11)
+
+        plt.tight_layout()
+        plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
+        print(f"Saved clustering dendrogram to {output_path}")
+        plt.close()
+
+
+def get_clustering(matrix: RadicalCoOccurrenceMatrix, metric: str = 'correlation') -> RadicalClustering:
+    """RadicalClustering for a matrix, cached until its counts change."""
+    return matrix.memoize(('clustering', metric), lambda: RadicalClustering(matrix, metric))
 
 
 def create_hierarchical_clustering(
     matrix: RadicalCoOccurrenceMatrix,
     output_path: str,
     method: str = 'average'
-):
+) -> RadicalClustering:
     """
     Create hierarchical clustering dendogram of radicals based on co-occurrence.
 
@@ -246,36 +692,86 @@ def create_hierarchical_clustering(
         matrix: RadicalCoOccurrenceMatrix object
         output_path: Path to save the figure
         method: Linkage method ('single', 'complete', 'average', 'ward')
-    """
-    # Use normalized matrix for clustering
-    data = matrix.get_normalized_matrix()
 
-    # Calculate distance matrix (1 - correlation)
-    distances = pdist(data.values, metric='correlation')
+    Returns:
+        The (cached) RadicalClustering used for the plot
+    """
+    clustering = get_clustering(matrix)
+    clustering.plot_dendrogram(output_path, method)
+    return clustering
 
-    # Perform hierarchical clustering
-    linkage = hierarchy.linkage(distances, method=method)
 
-    # Create dendrogram
-    fig, ax = plt.subplots(figsize=(15, 10))
+def find_avoidance_pairs(
+    matrix: RadicalCoOccurrenceMatrix,
+    min_expected: float = 5.0,
+    alpha: float = 0.05,
+    chapters: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
+    """
+    Rank every radical pair by how strongly it is depleted relative to chance.
 
-    dendro = hierarchy.dendrogram(
-        linkage,
-        labels=data.index.tolist(),
-        ax=ax,
-        leaf_font_size=10,
-        leaf_rotation=90
-    )
+    Works on the full observed and expected arrays, so pairs that never
+    co-occur are included (unlike analyze_avoidance_pairs, which only sees
+    pairs that passed calculate_significance's min_observed filter). Depletion
+    is scored with the lower-tail hypergeometric p-value, the same null model
+    as calculate_significance(method='hypergeometric'). Benjamini-Hochberg
+    runs over every pair tested (expected >= min_expected) before the
+    depleted ones are selected, so the selection does not shrink the number
+    of tests corrected for.
 
-    ax.set_title('Hierarchical Clustering of Radicals by Co-occurrence',
-                fontsize=14, fontweight='bold', pad=15)
-    ax.set_xlabel('Radical', fontsize=11)
-    ax.set_ylabel('Distance (1 - Correlation)', fontsize=11)
+    Args:
+        matrix: RadicalCoOccurrenceMatrix object
+        min_expected: Skip pairs too rare for depletion to be detectable
+        alpha: False discovery rate for the 'significant' flag
+        chapters: Restrict the counts to a chapter range or subset
 
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    print(f"Saved clustering dendrogram to {output_path}")
-    plt.close()
+    Returns:
+        DataFrame of depleted pairs (observed < expected), most depleted first
+    """
+    if chapters is not None:
+        matrix = matrix.for_chapters(chapters)
+
+    radicals = np.array(matrix.unique_radicals, dtype=object)
+    rows, cols = np.triu_indices(len(radicals), k=1)
+
+    expected = expected_cooccurrence_matrix(matrix)[rows, cols]
+    observed = _pair_values(matrix.counts, rows, cols)
+
+    tested = expected >= min_expected
+    rows, cols, observed, expected = rows[tested], cols[tested], observed[tested], expected[tested]
+
+    # Hypergeometric variance for the depletion z-score
+    row_sums, total_cooccurrences = cooccurrence_marginals(matrix)
+    population = 2 * total_cooccurrences
+    variance = expected * (1 - row_sums[cols] / population) * \
+        (population - row_sums[rows]) / max(population - 1, 1)
+    z_score = np.divide(observed - expected, np.sqrt(variance),
+                        out=np.zeros(len(expected)), where=variance > 0)
+
+    p_values = hypergeometric_p_values(matrix, rows, cols, tail='lower')
+    q_values = benjamini_hochberg(p_values)
+
+    depleted = observed < expected
+    rows, cols, observed, expected = rows[depleted], cols[depleted], observed[depleted], expected[depleted]
+    z_score, p_values, q_values = z_score[depleted], p_values[depleted], q_values[depleted]
+
+    radical_categories = np.array([get_radical_category(r) for r in radicals], dtype=object)
+    df = pd.DataFrame({
+        'radical1': radicals[rows],
+        'radical2': radicals[cols],
+        'category1': radical_categories[rows],
+        'category2': radical_categories[cols],
+        'observed': observed.astype(int),
+        'expected': expected,
+        'enrichment': observed / expected,
+        'avoidance_ratio': expected / (observed + 1),
+        'z_score': z_score,
+        'p_value': p_values,
+        'q_value': q_values,
+    })
+    df['significant'] = df['q_value'] < alpha
+
+    return df.sort_values(['p_value', 'z_score'], kind='stable').reset_index(drop=True)
 
 
 def analyze_avoidance_pairs(
@@ -341,11 +837,19 @@ if __name__ == "__main__":
     clustering = analyze_category_clustering(matrix)
 
     print("\nDo radicals cluster with same-category radicals?")
-    for category, stats in clustering.items():
+    for category, category_stats in clustering.items():
         print(f"\n{category.upper()}:")
-        print(f"  Within-category: {stats['within_category']}")
-        print(f"  Cross-category: {stats['cross_category']}")
-        print(f"  Proportion within: {stats['within_proportion']:.2%}")
+        print(f"  Within-category: {category_stats['within_category']}")
+        print(f"  Cross-category: {category_stats['cross_category']}")
+        print(f"  Proportion within: {category_stats['within_proportion']:.2%}")
+
+    start = time.perf_counter()
+    bootstrap = bootstrap_category_clustering(matrix, n_resamples=10000)
+    elapsed = time.perf_counter() - start
+    print(f"\nChapter bootstrap, 95% intervals (10000 resamples, {elapsed:.1f}s):")
+    for row in bootstrap.itertuples():
+        print(f"  {row.category:<16} {row.within_proportion:6.2%}  "
+              f"[{row.ci_low:6.2%}, {row.ci_high:6.2%}]")
 
     # === AVOIDANCE PAIRS ===
     print("\n" + "="*70)
@@ -359,6 +863,14 @@ if __name__ == "__main__":
 
     avoidance_df.to_csv(str(output_dir / "avoidance_pairs.csv"), index=False)
 
+    full_avoidance = find_avoidance_pairs(matrix)
+    full_avoidance.to_csv(str(output_dir / "avoidance_pairs_full.csv"), index=False)
+    print("\nFull-matrix depletion (all pairs with expected >= 5, including unobserved):")
+    print(f"  {len(full_avoidance)} depleted pairs, "
+          f"{full_avoidance['significant'].sum()} significant at FDR 0.05")
+    print(full_avoidance[['radical1', 'radical2', 'observed', 'expected',
+                          'z_score', 'p_value', 'q_value']].head(10).to_string())
+
     # === HIERARCHICAL CLUSTERING ===
     print("\nGenerating hierarchical clustering...")
     create_hierarchical_clustering(
@@ -0,0 +1,37 @@
+"""
+Shared fixtures for the analysis tests
+Puts python_analysis on the import path and parses the TTC CSV once per session
+"""
+
+import copy
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import radical_dictionary  # noqa: E402
+from ttc_parser import parse_ttc_csv  # noqa: E402
+
+CSV_PATH = Path(__file__).resolve().parent.parent.parent / "public" / "Just Characters-Table 1.csv"
+
+
+@pytest.fixture(scope="session")
+def characters():
+    return parse_ttc_csv(str(CSV_PATH), use_cache=False)
+
+
+@pytest.fixture
+def restore_dictionary():
+    """Undo any edits a test makes to RADICAL_MAP and RADICAL_CATEGORIES."""
+    radical_map = copy.deepcopy(radical_dictionary.RADICAL_MAP)
+    categories = copy.deepcopy(radical_dictionary.RADICAL_CATEGORIES)
+    yield
+    radical_dictionary.RADICAL_MAP.clear()
+    radical_dictionary.RADICAL_MAP.update(radical_map)
+    radical_dictionary.RADICAL_CATEGORIES.clear()
+    radical_dictionary.RADICAL_CATEGORIES.update(categories)
+    radical_dictionary.rebuild_indexes()
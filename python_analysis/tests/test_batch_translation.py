@@ -0,0 +1,91 @@
+"""
+Tests for chapter-parallel batch translation and per-chapter coverage
+"""
+
+import json
+
+import pytest
+
+import translation_engine
+from batch_translation import chapter_segments, chapter_coverage, translate_corpus
+from translation_engine import TranslationEngine
+
+
+@pytest.fixture
+def fallback_cache(tmp_path, monkeypatch):
+    """Keep synthesized entries out of the real cache directory."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(translation_engine, 'FALLBACK_CACHE_DIR', cache_dir)
+    return cache_dir
+
+
+def read_records(paths):
+    records = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+@pytest.mark.parametrize("chunk_size", [None, 7])
+def test_segments_cover_every_chapter_in_order(characters, chunk_size):
+    chapters = chapter_segments(characters, chunk_size)
+    assert [chapter for chapter, _ in chapters] == list(range(1, 82))
+
+    entries = list(characters)
+    segments = [segment for _, parts in chapters for segment in parts]
+    assert "".join(text for _, text in segments) == "".join(c.char for c in entries)
+    if chunk_size:
+        assert max(len(text) for _, text in segments) == chunk_size
+
+    for chapter, parts in chapters:
+        chapter_entries = [c for c in entries if c.chapter == chapter]
+        assert parts[0][0] == chapter_entries[0].position
+        assert "".join(text for _, text in parts) == \
+            "".join(c.char for c in chapter_entries)
+
+
+def test_coverage_counts_match_scan(characters, fallback_cache):
+    engine = TranslationEngine(cache_dir=fallback_cache)
+    coverage = chapter_coverage(characters, engine)
+
+    table = engine.lookup_table(fallback=True)
+    for row in coverage.itertuples():
+        chars = [c.char for c in characters if c.chapter == row.chapter]
+        assert row.characters == len(chars)
+        assert row.curated == sum(c in engine.structures for c in chars)
+        assert row.synthesized == sum(c in table and c not in engine.structures for c in chars)
+        assert row.curated + row.synthesized + row.missing == row.characters
+        assert row.coverage_ratio == pytest.approx((row.curated + row.synthesized) / len(chars))
+    assert coverage['characters'].sum() == len(characters)
+
+
+def test_translate_corpus_writes_every_chapter(characters, tmp_path, fallback_cache):
+    layers = ["structural_mechanics", "character_breakdown"]
+    timing = translate_corpus(characters, tmp_path / "out", layers=layers, chunk_size=40,
+                              n_workers=1, fallback=True)
+    assert timing['chapter'].tolist() == list(range(1, 82))
+    assert timing['characters'].sum() == len(characters)
+    assert (timing['coverage_ratio'] >= timing['curated_ratio']).all()
+
+    paths = sorted((tmp_path / "out").glob("chapter_*.jsonl"))
+    assert [str(path) for path in paths] == timing['path'].tolist()
+    assert paths[0].name == "chapter_001.jsonl"
+
+    records = read_records(paths)
+    assert len(records) == timing['segments'].sum()
+    engine = TranslationEngine(fallback=True)
+    for record in records[:50] + records[-50:]:
+        expected = engine.translate_multilayer(record['text'], layers=layers)
+        assert record['layers'] == {layer.level: layer.content for layer in expected}
+
+    parallel = translate_corpus(characters, tmp_path / "parallel", layers=layers,
+                                chunk_size=40, n_workers=2, fallback=True)
+    assert parallel['segments'].equals(timing['segments'])
+    assert read_records(sorted((tmp_path / "parallel").glob("chapter_*.jsonl"))) == records
+
+
+def test_unknown_layers_fail_before_any_work(characters, tmp_path):
+    with pytest.raises(ValueError):
+        translate_corpus(characters, tmp_path, layers=["no_such_layer"], n_workers=1)
+    assert not list(tmp_path.glob("chapter_*.jsonl"))
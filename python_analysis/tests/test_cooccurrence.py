@@ -0,0 +1,367 @@
+"""
+Tests for the co-occurrence matrix: vectorized counts, backends and incremental updates
+"""
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+import radical_dictionary
+from radical_cooccurrence import RadicalCoOccurrenceMatrix
+from benchmark_cooccurrence import loop_cooccurrence_counts
+
+
+def dense_counts(matrix: RadicalCoOccurrenceMatrix) -> np.ndarray:
+    return matrix.counts.toarray() if sparse.issparse(matrix.counts) else matrix.counts
+
+
+@pytest.mark.parametrize("window_size", [1, 5])
+def test_vectorized_counts_match_loop(characters, window_size):
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=window_size)
+    expected = loop_cooccurrence_counts(matrix.radical_occurrences, matrix.unique_radicals,
+                                        window_size)
+    np.testing.assert_array_equal(matrix.counts, expected)
+
+
+def test_dense_and_sparse_backends_agree(characters):
+    dense = RadicalCoOccurrenceMatrix(characters, window_size=5, backend='dense')
+    sparse_matrix = RadicalCoOccurrenceMatrix(characters, window_size=5, backend='sparse')
+
+    assert sparse.issparse(sparse_matrix.counts)
+    assert dense.unique_radicals == sparse_matrix.unique_radicals
+    np.testing.assert_array_equal(dense_counts(sparse_matrix), dense.counts)
+    assert dense.get_top_pairs(20) == sparse_matrix.get_top_pairs(20)
+
+
+@pytest.mark.parametrize("backend", ['dense', 'sparse'])
+def test_update_radicals_matches_fresh_build(characters, restore_dictionary, backend):
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5, backend=backend)
+    unmapped = next(c for c in characters.char_vocab if c not in radical_dictionary.RADICAL_MAP)
+
+    # Direct edits: change a decomposition and add a character with a new radical
+    radical_dictionary.RADICAL_MAP['道'] = ['辶', '首']
+    radical_dictionary.RADICAL_MAP[unmapped] = ['口', '龠']
+
+    assert sorted(matrix.update_radicals()) == sorted(['道', unmapped])
+
+    fresh = RadicalCoOccurrenceMatrix(characters, window_size=5, backend=backend)
+    assert matrix.unique_radicals == fresh.unique_radicals
+    np.testing.assert_array_equal(dense_counts(matrix), dense_counts(fresh))
+    assert matrix.update_radicals() == []
+
+
+def test_update_radicals_uses_the_cached_corpus_index(characters, restore_dictionary,
+                                                      monkeypatch):
+    import radical_cooccurrence
+    from corpus_index import get_index
+    from ttc_parser import Corpus
+
+    seen = []
+
+    def recording_get_index(corpus):
+        seen.append(corpus)
+        return get_index(corpus)
+
+    monkeypatch.setattr(radical_cooccurrence, 'get_index', recording_get_index)
+    matrix = RadicalCoOccurrenceMatrix(list(characters), window_size=5)
+    radical_dictionary.RADICAL_MAP['道'] = ['辶', '首']
+    assert matrix.update_radicals() == ['道']
+    assert seen and all(isinstance(corpus, Corpus) for corpus in seen)
+    assert all(corpus is matrix.corpus for corpus in seen)
+
+
+def test_corpus_index_sees_direct_map_edits(characters, restore_dictionary):
+    from corpus_index import get_index
+
+    assert get_index(characters).count('龠', kind='radical') == 0
+    radical_dictionary.RADICAL_MAP['道'] = ['辶', '龠']
+
+    index = get_index(characters)
+    assert index.count('龠', kind='radical') == index.count('道')
+    assert index is get_index(characters)
+
+
+def test_sparse_normalized_heatmap_with_threshold(characters, tmp_path):
+    from visualizations import create_heatmap
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5, backend='sparse')
+    output = tmp_path / "heatmap.png"
+    create_heatmap(matrix, str(output), normalize=True, min_count=1, figsize=(6, 5))
+    assert output.exists()
+
+
+def test_dense_tensors_are_guarded(characters, monkeypatch):
+    import radical_cooccurrence
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5, backend='sparse')
+    monkeypatch.setattr(radical_cooccurrence, 'MAX_DENSE_CELLS', 1000)
+
+    with pytest.raises(ValueError, match="MAX_DENSE_CELLS"):
+        matrix.distance_histogram()
+    with pytest.raises(ValueError, match="MAX_DENSE_CELLS"):
+        matrix.chapter_tensor()
+    with pytest.raises(ValueError, match="MAX_DENSE_CELLS"):
+        matrix.block_tensor(100)
+
+
+def test_window_matrices_match_separate_builds(characters):
+    from radical_cooccurrence import window_sensitivity_sweep
+
+    sweep = window_sensitivity_sweep(characters, [1, 3, 5, 8])
+    for window_size, frame in sweep.items():
+        separate = RadicalCoOccurrenceMatrix(characters, window_size=window_size)
+        assert list(frame.index) == separate.unique_radicals
+        np.testing.assert_array_equal(frame.to_numpy(), dense_counts(separate))
+
+
+def test_distance_histogram_sums_to_window_counts(characters):
+    from cooccurrence_engine import window_stack
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    histogram = matrix.distance_histogram()
+    assert histogram.shape[2] == 5
+    np.testing.assert_array_equal(histogram.sum(axis=2), matrix.counts)
+    np.testing.assert_array_equal(histogram, histogram.transpose(1, 0, 2))
+
+    stack = window_stack(histogram, [0, 2, 5])
+    assert not stack[0].any()
+    np.testing.assert_array_equal(stack[1], histogram[:, :, :2].sum(axis=2))
+    with pytest.raises(ValueError):
+        window_stack(histogram, [6])
+
+
+def reference_top_pairs(matrix, n):
+    counts = dense_counts(matrix)
+    radicals = matrix.unique_radicals
+    pairs = [(radicals[i], radicals[j], int(counts[i, j]))
+             for i in range(len(radicals)) for j in range(i + 1, len(radicals)) if counts[i, j] > 0]
+    pairs.sort(key=lambda pair: pair[2], reverse=True)
+    return pairs[:n]
+
+
+def reference_neighbors(matrix, radical, n):
+    counts = dense_counts(matrix)
+    radicals = matrix.unique_radicals
+    if radical not in radicals:
+        return []
+    row = counts[radicals.index(radical)]
+    neighbors = [(other, int(count)) for other, count in zip(radicals, row)
+                 if count > 0 and other != radical]
+    neighbors.sort(key=lambda pair: pair[1], reverse=True)
+    return neighbors[:n]
+
+
+@pytest.mark.parametrize("backend", ['dense', 'sparse'])
+def test_top_pairs_and_neighbors_match_loop(characters, backend):
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5, backend=backend)
+    for n in [1, 20, 10_000]:
+        assert matrix.get_top_pairs(n) == reference_top_pairs(matrix, n)
+
+    queries = matrix.unique_radicals[:15] + ['not a radical']
+    batch = matrix.get_radical_neighbors(queries, n=7)
+    assert list(batch) == queries
+    for radical in queries:
+        assert batch[radical] == reference_neighbors(matrix, radical, 7)
+        assert matrix.get_radical_neighbors(radical, n=7) == batch[radical]
+    assert matrix.get_radical_neighbors(queries[0], n=0) == []
+
+
+def reference_category_cooccurrence(matrix):
+    radical_to_category = {radical: category
+                           for category, info in radical_dictionary.RADICAL_CATEGORIES.items()
+                           for radical in info["radicals"]}
+    categories = list(radical_dictionary.RADICAL_CATEGORIES) + ['other']
+    labels = [radical_to_category.get(r, 'other') for r in matrix.unique_radicals]
+    counts = dense_counts(matrix)
+
+    totals = np.zeros((len(categories), len(categories)), dtype=int)
+    for i, cat1 in enumerate(labels):
+        for j, cat2 in enumerate(labels):
+            totals[categories.index(cat1), categories.index(cat2)] += counts[i, j]
+    return categories, totals
+
+
+@pytest.mark.parametrize("backend", ['dense', 'sparse'])
+def test_category_cooccurrence_matches_loop(characters, restore_dictionary, backend):
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5, backend=backend)
+    categories, totals = reference_category_cooccurrence(matrix)
+    frame = matrix.get_category_cooccurrence()
+    assert list(frame.index) == list(frame.columns) == categories
+    np.testing.assert_array_equal(frame.to_numpy(), totals)
+
+    # The projection is cached until the category map changes
+    assert matrix.get_category_projection() is matrix.get_category_projection()
+    other = next(r for r in matrix.unique_radicals
+                 if radical_dictionary.get_radical_category(r) == 'other')
+    radical_dictionary.register_category_radical(categories[0], other)
+    categories, updated = reference_category_cooccurrence(matrix)
+    assert not np.array_equal(updated, totals)
+    np.testing.assert_array_equal(matrix.get_category_cooccurrence().to_numpy(), updated)
+
+
+def reference_chapter_counts(matrix, chapters):
+    """The original loop, keeping pairs whose earlier occurrence is in chapters."""
+    occurrences = matrix.radical_occurrences
+    radical_index = {radical: idx for idx, radical in enumerate(matrix.unique_radicals)}
+    counts = np.zeros((len(radical_index),) * 2, dtype=int)
+    for i, occ1 in enumerate(occurrences):
+        if occ1.chapter not in chapters:
+            continue
+        for occ2 in occurrences[i + 1:]:
+            if occ2.global_position - occ1.global_position > matrix.window_size:
+                break
+            if occ2.global_position == occ1.global_position:
+                continue
+            idx1, idx2 = radical_index[occ1.radical], radical_index[occ2.radical]
+            counts[idx1, idx2] = counts[idx2, idx1] = counts[idx1, idx2] + 1
+    return counts
+
+
+@pytest.mark.parametrize("backend", ['dense', 'sparse'])
+def test_chapter_counts_match_loop(characters, backend):
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5, backend=backend)
+    labels, tensor = matrix.chapter_tensor()
+    assert labels.tolist() == list(range(1, 82))
+    np.testing.assert_array_equal(tensor.sum(axis=0), dense_counts(matrix))
+
+    for chapters in [range(1, 38), range(38, 82), [1, 25, 48]]:
+        expected = reference_chapter_counts(matrix, set(chapters))
+        np.testing.assert_array_equal(matrix.chapter_counts(chapters), expected)
+
+        subset = matrix.for_chapters(chapters)
+        assert subset.unique_radicals == matrix.unique_radicals
+        assert subset.backend == backend
+        np.testing.assert_array_equal(dense_counts(subset), expected)
+
+
+def test_chapter_ranges_use_prefix_sums(characters):
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    _, tensor = matrix.chapter_tensor()
+
+    np.testing.assert_array_equal(matrix.chapter_counts(range(0, 200)), matrix.counts)
+    np.testing.assert_array_equal(matrix.chapter_counts(range(20, 10)), 0)
+    for start, stop in [(1, 2), (10, 30), (81, 82)]:
+        np.testing.assert_array_equal(matrix.chapter_counts(range(start, stop)),
+                                      matrix.chapter_counts(list(range(start, stop))))
+        np.testing.assert_array_equal(matrix.chapter_counts(range(start, stop)),
+                                      tensor[start - 1:stop - 1].sum(axis=0))
+
+    with pytest.raises(ValueError, match="Unknown chapters"):
+        matrix.chapter_counts([1, 82])
+
+
+def reference_weighted(matrix, weight, max_distance, segment=lambda occ: None):
+    """The original loop, weighting each pair by distance within a segment."""
+    occurrences = matrix.radical_occurrences
+    radical_index = {radical: idx for idx, radical in enumerate(matrix.unique_radicals)}
+    weights = np.zeros((len(radical_index),) * 2)
+    for i, occ1 in enumerate(occurrences):
+        for occ2 in occurrences[i + 1:]:
+            distance = occ2.global_position - occ1.global_position
+            if distance > max_distance:
+                break
+            if distance == 0 or segment(occ1) != segment(occ2):
+                continue
+            idx1, idx2 = radical_index[occ1.radical], radical_index[occ2.radical]
+            weights[idx1, idx2] += weight(distance)
+            if idx1 != idx2:
+                weights[idx2, idx1] += weight(distance)
+    return weights
+
+
+def test_weighted_matrices_match_loop(characters):
+    from bisect import bisect_right
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    np.testing.assert_array_equal(matrix.get_weighted_matrix('uniform').to_numpy(),
+                                  matrix.counts)
+
+    expected = reference_weighted(matrix, lambda d: np.exp(-d / 3.0), 4)
+    np.testing.assert_allclose(matrix.get_weighted_matrix(max_distance=4, scale=3.0), expected)
+
+    expected = reference_weighted(matrix, lambda d: 1.0 / d, 6, lambda occ: occ.chapter)
+    np.testing.assert_allclose(
+        matrix.get_weighted_matrix('inverse', 6, boundaries='chapter'), expected)
+
+    starts = [0, 400, 401, 2000]
+    expected = reference_weighted(matrix, lambda d: np.exp(-d ** 2 / 2.0), 3,
+                                  lambda occ: bisect_right(starts, occ.global_position))
+    np.testing.assert_allclose(
+        matrix.get_weighted_matrix('gaussian', 3, boundaries=starts[::-1], sigma=1.0), expected)
+
+
+def test_registered_kernels_and_bad_arguments(characters, monkeypatch):
+    import cooccurrence_engine
+    from cooccurrence_engine import register_kernel, kernel_weights
+
+    monkeypatch.setattr(cooccurrence_engine, 'DECAY_KERNELS',
+                        dict(cooccurrence_engine.DECAY_KERNELS))
+    register_kernel('step', lambda distance, cutoff=2: (distance <= cutoff).astype(float))
+    assert kernel_weights('step', 4).tolist() == [1.0, 1.0, 0.0, 0.0]
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    weighted = matrix.get_weighted_matrix('step', cutoff=3)
+    np.testing.assert_array_equal(weighted, matrix.distance_histogram(3).sum(axis=2))
+
+    # Results are cached, but callers get their own copy
+    weighted.iloc[0, 0] = -1
+    assert matrix.get_weighted_matrix('step', cutoff=3).iloc[0, 0] >= 0
+
+    with pytest.raises(ValueError, match="Unknown kernel"):
+        kernel_weights('cosine', 3)
+    with pytest.raises(ValueError, match="Unknown boundaries"):
+        matrix.get_weighted_matrix(boundaries='clause')
+
+
+def reference_profile(characters, target, window_size):
+    """Radicals of every character within the window of each occurrence of target."""
+    from collections import Counter
+
+    entries = list(characters)
+    profile = Counter()
+    for c in entries:
+        if c.char != target:
+            continue
+        for other in entries:
+            if other is not c and \
+                    0 < abs(other.global_position - c.global_position) <= window_size:
+                profile.update(radical_dictionary.get_radicals(other.char))
+    return profile
+
+
+def test_character_profiles_match_window_scan(characters):
+    from radical_cooccurrence import character_radical_profiles, analyze_specific_character
+
+    targets = ['道', '水', '之']
+    profiles = character_radical_profiles(characters, targets, window_size=3)
+    assert profiles.index.tolist() == targets
+    for char in targets:
+        row = profiles.loc[char]
+        assert dict(row[row > 0]) == reference_profile(characters, char, 3)
+        top = analyze_specific_character(characters, char, 3)['top_cooccurring_radicals']
+        assert all(row[radical] == count for radical, count in top)
+
+    every = character_radical_profiles(characters, window_size=3)
+    assert every.loc[targets].equals(profiles)
+    with pytest.raises(ValueError, match="not found"):
+        character_radical_profiles(characters, ['𠀀'])
+
+
+def test_similar_characters_rank_by_cosine(characters):
+    from radical_cooccurrence import character_radical_profiles, similar_characters
+
+    profiles = character_radical_profiles(characters, window_size=3)
+    values = profiles.to_numpy(dtype=float)
+    target = values[profiles.index.get_loc('道')]
+    cosine = {}
+    for char, row in zip(profiles.index, values):
+        norm = np.linalg.norm(row) * np.linalg.norm(target)
+        if char != '道':
+            cosine[char] = row @ target / norm if norm else 0.0
+
+    similar = similar_characters(profiles, '道', n=5)
+    assert [s for _, s in similar] == pytest.approx(sorted(cosine.values(), reverse=True)[:5])
+    assert all(cosine[char] == pytest.approx(s) for char, s in similar)
+    assert len(similar_characters(profiles.iloc[:3], profiles.index[0], n=10)) == 2
+    with pytest.raises(ValueError, match="no profile"):
+        similar_characters(profiles, '𠀀')
@@ -0,0 +1,68 @@
+"""
+Tests for the positional inverted index against brute-force scans of the text
+"""
+
+import numpy as np
+import pytest
+
+from corpus_index import CorpusIndex, get_index
+from radical_dictionary import get_radicals, get_radical_category
+from ttc_parser import get_character_positions
+
+
+@pytest.fixture(scope="module")
+def index(characters):
+    return get_index(characters)
+
+
+@pytest.mark.parametrize("char", ['道', '無', '之', '𠀀'])
+def test_character_postings_match_scan(index, characters, char):
+    entries = np.flatnonzero(characters.chars == char)
+
+    np.testing.assert_array_equal(index.positions(char), characters.global_positions[entries])
+    assert index.count(char) == len(entries)
+    assert index.entry_positions(char) == [(c.chapter, c.position) for c in characters
+                                           if c.char == char]
+    assert get_character_positions(characters, char) == \
+        get_character_positions(list(characters), char)
+
+
+def test_radical_and_category_counts_match_scan(index, characters):
+    radical_counts = {}
+    category_positions = {}
+    for c in characters:
+        for radical in get_radicals(c.char):
+            radical_counts[radical] = radical_counts.get(radical, 0) + 1
+            category_positions.setdefault(get_radical_category(radical), set()).add(
+                c.global_position)
+
+    for radical, count in radical_counts.items():
+        assert index.count(radical, kind='radical') == count
+    for category, positions in category_positions.items():
+        assert index.positions(category, kind='category').tolist() == sorted(positions)
+
+
+@pytest.mark.parametrize("window_size", [0, 3, 10])
+def test_window_queries_match_scan(index, characters, window_size):
+    global_positions = characters.global_positions
+    for center in [0, 57, 2500, int(global_positions[-1])]:
+        in_window = np.abs(global_positions - center) <= window_size
+        assert index.count_in_window('之', center, window_size) == \
+            int((in_window & (characters.chars == '之')).sum())
+
+        start, end = index.window_bounds(center, window_size)
+        np.testing.assert_array_equal(np.arange(start, end), np.flatnonzero(in_window))
+
+
+def test_neighbourhood_excludes_the_target(index, characters):
+    targets, neighbours = index.neighbourhood('道', 2)
+    assert len(targets) == len(neighbours) > 0
+    assert (targets != neighbours).all()
+    distance = np.abs(characters.global_positions[targets] -
+                      characters.global_positions[neighbours])
+    assert distance.max() <= 2
+
+
+def test_plain_lists_get_a_fresh_index(characters):
+    assert isinstance(get_index(list(characters)), CorpusIndex)
+    assert get_index(characters) is get_index(characters)
@@ -0,0 +1,54 @@
+"""
+Tests for the TTC CSV parser and its on-disk corpus cache
+"""
+
+import numpy as np
+
+from ttc_parser import parse_ttc_csv, Corpus, file_hash, corpus_cache_path, _CORPUS_ARRAYS
+from conftest import CSV_PATH
+
+
+def assert_same_corpus(actual: Corpus, expected: Corpus):
+    assert actual.char_vocab == expected.char_vocab
+    assert actual.pinyin_vocab == expected.pinyin_vocab
+    for name in _CORPUS_ARRAYS:
+        np.testing.assert_array_equal(getattr(actual, name), getattr(expected, name))
+
+
+def test_cached_corpus_round_trips(tmp_path, characters):
+    first = parse_ttc_csv(str(CSV_PATH), cache_dir=tmp_path)
+    cache_path = corpus_cache_path(str(CSV_PATH), file_hash(str(CSV_PATH)), tmp_path)
+    assert cache_path.exists()
+
+    cached = parse_ttc_csv(str(CSV_PATH), cache_dir=tmp_path)
+    assert_same_corpus(first, characters)
+    assert_same_corpus(cached, characters)
+
+
+def test_stale_cache_is_ignored(tmp_path):
+    cache_path = tmp_path / "corpus.npz"
+    parse_ttc_csv(str(CSV_PATH), use_cache=False).save(cache_path, source_hash="old")
+    assert Corpus.load(cache_path, source_hash="new") is None
+
+
+def test_chapters_are_column_pairs(characters):
+    chars = characters.chars
+    assert np.unique(characters.chapters).tolist() == list(range(1, 82))
+    assert "".join(chars[characters.chapters == 1]).startswith("道可道非常道名可名非常名")
+    assert "".join(chars[characters.chapters == 81]).startswith("信言不美美言不信")
+
+    # Positions count up from 1 within each chapter, in text order
+    first = characters.chapters == 2
+    np.testing.assert_array_equal(characters.positions[first], np.arange(1, first.sum() + 1))
+    assert np.all(np.diff(characters.chapters) >= 0)
+
+
+def test_truncated_cache_is_rebuilt(tmp_path, characters):
+    parse_ttc_csv(str(CSV_PATH), cache_dir=tmp_path)
+    cache_path = corpus_cache_path(str(CSV_PATH), file_hash(str(CSV_PATH)), tmp_path)
+    data = cache_path.read_bytes()
+    cache_path.write_bytes(data[:len(data) // 2])
+
+    assert Corpus.load(cache_path, file_hash(str(CSV_PATH))) is None
+    assert_same_corpus(parse_ttc_csv(str(CSV_PATH), cache_dir=tmp_path), characters)
+    assert Corpus.load(cache_path, file_hash(str(CSV_PATH))) is not None
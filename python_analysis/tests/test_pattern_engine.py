@@ -0,0 +1,31 @@
+"""
+Tests for the structural pattern engine
+"""
+
+from ttc_parser import Character
+from pattern_engine import PatternEngine
+
+
+def make_text(text: str):
+    characters = []
+    for i, char in enumerate(text):
+        character = Character(char, '', 1, i + 1)
+        character.global_position = i
+        characters.append(character)
+    return characters
+
+
+def test_type_and_character_terms_need_different_entries():
+    # 無 is itself of type O, so a lone 無 must not match "O → 無"
+    patterns = PatternEngine({'absence': {'formula': 'O → 無'}})
+    assert patterns.scan_corpus(make_text('無')).empty
+
+    matches = patterns.scan_corpus(make_text('無無'))
+    assert matches['characters'].tolist() == ['無無']
+
+
+def test_corpus_matches_never_reuse_an_entry(characters):
+    matches = PatternEngine().scan_corpus(characters)
+    assert len(matches) > 0
+    assert (matches['end_position'] > matches['start_position']).all()
+
@@ -0,0 +1,100 @@
+"""
+Tests for the radical dictionary's reverse lookup indexes and registration API
+"""
+
+import pytest
+
+from radical_dictionary import (RADICAL_MAP, RADICAL_CATEGORIES, get_radical_category,
+                                get_all_radicals, get_characters_with_radical,
+                                get_characters_in_category, register_character,
+                                register_category, register_category_radical,
+                                dictionary_version)
+
+
+def scan_radical_category(radical):
+    for category, info in RADICAL_CATEGORIES.items():
+        if radical in info["radicals"]:
+            return category
+    return "other"
+
+
+def scan_characters_with_radical(radical):
+    return [char for char, rads in RADICAL_MAP.items() if radical in rads]
+
+
+def scan_characters_in_category(category):
+    radicals = RADICAL_CATEGORIES[category]["radicals"]
+    return [char for char, rads in RADICAL_MAP.items()
+            if any(radical in radicals for radical in rads)]
+
+
+def assert_indexes_match_scan():
+    radicals = {radical for rads in RADICAL_MAP.values() for radical in rads}
+    assert get_all_radicals() == radicals
+
+    for radical in radicals | {'𠀀'}:
+        assert get_radical_category(radical) == scan_radical_category(radical)
+        assert get_characters_with_radical(radical) == scan_characters_with_radical(radical)
+    for category in RADICAL_CATEGORIES:
+        assert sorted(get_characters_in_category(category)) == \
+            sorted(scan_characters_in_category(category))
+
+
+def test_indexes_match_scan():
+    assert_indexes_match_scan()
+    assert get_characters_in_category('no such category') == []
+
+
+def test_lookups_return_copies():
+    radical = next(iter(get_all_radicals()))
+    get_characters_with_radical(radical).append('𠀀')
+    get_all_radicals().add('𠀀')
+    assert '𠀀' not in get_characters_with_radical(radical)
+    assert '𠀀' not in get_all_radicals()
+
+
+def test_register_functions_rebuild_indexes(restore_dictionary):
+    version = dictionary_version()
+
+    register_character('𠀀', ['水', '𠂇'])
+    assert '𠀀' in get_characters_with_radical('水')
+    assert get_characters_with_radical('𠂇') == ['𠀀']
+    assert '𠂇' in get_all_radicals()
+
+    register_category('test', ['𠂇'], description="Test category")
+    assert get_radical_category('𠂇') == 'test'
+    assert get_characters_in_category('test') == ['𠀀']
+
+    register_category_radical('test', '水')
+    assert get_radical_category('水') == scan_radical_category('水')
+    assert set(get_characters_in_category('test')) == set(scan_characters_in_category('test'))
+
+    assert dictionary_version() == version + 3
+    assert_indexes_match_scan()
+
+
+def test_direct_edits_are_picked_up_by_dictionary_version(restore_dictionary):
+    version = dictionary_version()
+    assert dictionary_version() == version
+
+    RADICAL_MAP['𠀀'] = ['𠂇']
+    assert dictionary_version(check=False) == version
+    assert dictionary_version() == version + 1
+    assert get_characters_with_radical('𠂇') == ['𠀀']
+
+    RADICAL_CATEGORIES['motion']['radicals'].append('𠂇')
+    assert dictionary_version() == version + 2
+    assert get_radical_category('𠂇') == 'motion'
+    assert_indexes_match_scan()
+
+
+def test_first_category_wins(restore_dictionary):
+    radical = RADICAL_CATEGORIES['motion']['radicals'][0]
+    register_category('late', [radical])
+    assert get_radical_category(radical) == 'motion'
+
+
+def test_unknown_category_cannot_take_radicals():
+    with pytest.raises(KeyError):
+        register_category_radical('no such category', '水')
+    assert get_radical_category('水') == scan_radical_category('水')
@@ -0,0 +1,88 @@
+"""
+Tests for the multi-pattern sequence matcher against a per-start greedy scan
+"""
+
+import numpy as np
+import pytest
+
+from corpus_index import get_index
+from sequence_matcher import SequenceMatcher
+from statistical_analysis import find_sequence_patterns, find_radical_sequences
+
+
+def reference_scan(patterns, symbols, positions, max_gap, min_gap=0):
+    """Greedy matching from every start, one pattern at a time."""
+    matches = {}
+    for name, pattern in patterns.items():
+        gap = max_gap[name] if isinstance(max_gap, dict) else max_gap
+        matches[name] = []
+        for start in range(len(symbols)):
+            if symbols[start] != pattern[0]:
+                continue
+            path = [start]
+            for symbol in pattern[1:]:
+                step = next((k for k in range(path[-1] + 1, len(symbols))
+                             if symbols[k] == symbol
+                             and positions[k] - positions[path[-1]] >= min_gap), None)
+                if step is None or positions[step] - positions[path[-1]] > gap:
+                    break
+                path.append(step)
+            else:
+                matches[name].append(path)
+    return matches
+
+
+PATTERNS = {'ab': 'ab', 'abc': 'abc', 'aba': 'aba', 'ca': 'ca', 'b': 'b', 'cc': 'cc'}
+
+
+@pytest.mark.parametrize("min_gap", [0, 1])
+@pytest.mark.parametrize("max_gap", [2, 5, {'ab': 1, 'abc': 4, 'aba': 3, 'ca': 2, 'b': 0, 'cc': 6}])
+def test_scan_matches_greedy_reference(max_gap, min_gap):
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        symbols = rng.choice(list('abcd'), size=60).tolist()
+        positions = np.cumsum(rng.integers(0, 3, size=60)).tolist()
+        patterns = {name: list(pattern) for name, pattern in PATTERNS.items()}
+
+        found = SequenceMatcher(patterns, max_gap=max_gap, min_gap=min_gap).scan(
+            symbols, positions)
+        assert found == reference_scan(patterns, symbols, positions, max_gap, min_gap)
+
+        # Arrays skip items outside the alphabet but must find the same matches
+        assert SequenceMatcher(patterns, max_gap=max_gap, min_gap=min_gap).scan(
+            np.array(symbols), positions) == found
+
+
+def test_min_gap_keeps_waiting_states():
+    matcher = SequenceMatcher({'ab': ['a', 'b']}, max_gap=3, min_gap=1)
+    found = matcher.scan(['a', 'b', 'x', 'b'], [0, 0, 1, 2])
+    assert found['ab'] == [[0, 3]]
+
+
+def test_empty_pattern_is_rejected():
+    with pytest.raises(ValueError, match="at least one symbol"):
+        SequenceMatcher({'empty': []})
+
+
+def test_corpus_sequences_match_reference(characters):
+    index = get_index(characters)
+    patterns = {'act': ['agent', 'action'], 'cycle': ['structure', 'boundary', 'structure'],
+                'unknown': ['fluid', 'no such category']}
+    found = find_sequence_patterns(characters, patterns, window_size=4)
+
+    names = index.category_names
+    symbols = [names[c] for c in index.occurrence_categories]
+    positions = index.occurrence_positions.tolist()
+    expected = reference_scan(patterns, symbols, positions, max_gap=4)
+
+    assert found['unknown'] == []
+    for name, paths in expected.items():
+        assert [m['positions'] for m in found[name]] == [
+            [positions[i] for i in path] for path in paths]
+    assert len(found['act']) > 0 and len(found['cycle']) > 0
+    assert found['act'] == find_radical_sequences(characters, ['agent', 'action'], window_size=4)
+
+
+def test_unknown_sequence_kind_is_rejected(characters):
+    with pytest.raises(ValueError, match="kind"):
+        find_sequence_patterns(characters, {'x': ['水']}, kind='glyph')
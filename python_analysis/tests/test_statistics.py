@@ -0,0 +1,208 @@
+"""
+Tests for statistical_analysis: significance testing, avoidance pairs, clustering and the bootstrap
+"""
+
+import numpy as np
+import pytest
+
+import radical_dictionary
+from radical_cooccurrence import RadicalCoOccurrenceMatrix
+from null_model import simulate_null
+from statistical_analysis import calculate_significance
+
+
+def test_permutation_method_uses_null_model(characters):
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    df = calculate_significance(matrix, method='permutation', n_permutations=20, seed=3)
+
+    radicals = matrix.unique_radicals
+    rows = [radicals.index(r) for r in df['radical1']]
+    cols = [radicals.index(r) for r in df['radical2']]
+    null = simulate_null(matrix, 'shuffle', n_permutations=20, seed=3, n_workers=1)
+    np.testing.assert_array_equal(df['p_value'].to_numpy(), null['p_enriched'][rows, cols])
+
+
+def test_permutation_method_needs_source_text(characters):
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    with pytest.raises(ValueError, match="hypergeometric"):
+        calculate_significance(matrix, method='permutation', n_permutations=20,
+                               chapters=range(1, 38))
+
+
+def test_chapter_subset_is_built_only_on_cache_miss(characters, monkeypatch):
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    first = calculate_significance(matrix, method='hypergeometric', chapters=range(1, 38))
+
+    def fail(chapters):
+        raise AssertionError("for_chapters called on a cache hit")
+
+    monkeypatch.setattr(matrix, 'for_chapters', fail)
+    second = calculate_significance(matrix, method='hypergeometric', chapters=range(1, 38))
+    assert first.equals(second)
+
+
+def test_significance_sees_direct_category_edits(characters, restore_dictionary):
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    before = calculate_significance(matrix)
+    radical = next(r for r, c in zip(before['radical1'], before['category1']) if c != 'other')
+    old = before.loc[before['radical1'] == radical, 'category1'].iloc[0]
+    new = next(c for c in radical_dictionary.RADICAL_CATEGORIES if c != old)
+
+    # Edit the map directly, without register_* or rebuild_indexes()
+    radical_dictionary.RADICAL_CATEGORIES[old]["radicals"].remove(radical)
+    radical_dictionary.RADICAL_CATEGORIES[new]["radicals"].append(radical)
+
+    after = calculate_significance(matrix)
+    assert set(after.loc[after['radical1'] == radical, 'category1']) == {new}
+    assert (after['radical1'] == radical).sum() == (before['radical1'] == radical).sum()
+
+
+@pytest.mark.parametrize("method", ['chi2', 'hypergeometric'])
+def test_sparse_significance_matches_dense(characters, monkeypatch, method):
+    dense = calculate_significance(RadicalCoOccurrenceMatrix(characters, backend='dense'),
+                                   method=method)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("dense pair grid built for the sparse backend")
+
+    monkeypatch.setattr(np, 'triu_indices', fail)
+    sparse_table = calculate_significance(
+        RadicalCoOccurrenceMatrix(characters, backend='sparse'), method=method)
+    assert sparse_table.equals(dense)
+
+
+def test_avoidance_fdr_covers_every_tested_pair(characters):
+    from statistical_analysis import (find_avoidance_pairs, benjamini_hochberg,
+                                      expected_cooccurrence_matrix, hypergeometric_p_values)
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    df = find_avoidance_pairs(matrix, min_expected=5.0)
+    assert (df['observed'] < df['expected']).all()
+
+    rows, cols = np.triu_indices(len(matrix.unique_radicals), k=1)
+    tested = expected_cooccurrence_matrix(matrix)[rows, cols] >= 5.0
+    rows, cols = rows[tested], cols[tested]
+    q_values = benjamini_hochberg(hypergeometric_p_values(matrix, rows, cols, tail='lower'))
+
+    radicals = matrix.unique_radicals
+    expected = dict(zip(zip(np.array(radicals)[rows], np.array(radicals)[cols]), q_values))
+    actual = dict(zip(zip(df['radical1'], df['radical2']), df['q_value']))
+    assert len(actual) < len(expected)
+    assert all(actual[pair] == expected[pair] for pair in actual)
+
+
+def test_bootstrap_needs_at_least_one_resample(characters):
+    from statistical_analysis import bootstrap_category_clustering
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    with pytest.raises(ValueError, match="n_resamples"):
+        bootstrap_category_clustering(matrix, n_resamples=0)
+
+
+def test_clustering_matches_scipy_and_is_cached(characters, monkeypatch, tmp_path):
+    from scipy.cluster import hierarchy
+    from scipy.spatial import distance
+    import statistical_analysis
+    from statistical_analysis import get_clustering
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    clustering = get_clustering(matrix)
+    assert get_clustering(matrix) is clustering
+
+    normalized = matrix.get_normalized_matrix().to_numpy()
+    expected = np.nan_to_num(distance.pdist(normalized, metric='correlation'), nan=1.0)
+    np.testing.assert_array_equal(clustering.distances, expected)
+    sparse_clustering = get_clustering(RadicalCoOccurrenceMatrix(characters, backend='sparse'))
+    np.testing.assert_allclose(sparse_clustering.distances, expected)
+
+    linkage = hierarchy.linkage(expected, method='average')
+    np.testing.assert_array_equal(clustering.linkage('average'), linkage)
+    optimal = hierarchy.optimal_leaf_ordering(linkage, expected)
+    assert clustering.leaf_order('average', optimal_ordering=True) == \
+        [clustering.labels[i] for i in hierarchy.leaves_list(optimal)]
+    assert clustering.clusters(0.9).tolist() == \
+        hierarchy.fcluster(linkage, 0.9, criterion='distance').tolist()
+    assert clustering.cophenetic_correlation() == hierarchy.cophenet(linkage, expected)[0]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("distances or linkage recomputed")
+
+    monkeypatch.setattr(statistical_analysis, 'pdist', fail)
+    monkeypatch.setattr(statistical_analysis.hierarchy, 'linkage', fail)
+    sweep = clustering.sweep(['average'], [0.5, 0.9], criterion='distance')
+    assert sweep['n_clusters'].tolist() == [
+        int(clustering.clusters(t).max()) for t in [0.5, 0.9]]
+    assert clustering.clusters(4, criterion='maxclust').max() <= 4
+
+    output = tmp_path / "dendrogram.png"
+    clustering.plot_dendrogram(str(output), optimal_ordering=True, dpi=50)
+    assert output.exists()
+
+
+def test_avoidance_pairs_match_pairwise_loop(characters):
+    from scipy import stats
+    from statistical_analysis import find_avoidance_pairs
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    df = find_avoidance_pairs(matrix, min_expected=2.0)
+
+    counts = matrix.counts
+    radicals = matrix.unique_radicals
+    row_sums = counts.sum(axis=1)
+    total = row_sums.sum() / 2
+    expected = {}
+    for i in range(len(radicals)):
+        for j in range(i + 1, len(radicals)):
+            e = row_sums[i] * row_sums[j] / (2 * total)
+            if e >= 2.0 and counts[i, j] < e:
+                p = stats.hypergeom.cdf(counts[i, j], int(2 * total), row_sums[j], row_sums[i])
+                expected[radicals[i], radicals[j]] = (counts[i, j], e, p)
+
+    actual = {(r1, r2): (o, e, p) for r1, r2, o, e, p in
+              zip(df['radical1'], df['radical2'], df['observed'], df['expected'], df['p_value'])}
+    assert actual.keys() == expected.keys()
+    assert (df['observed'] == 0).any()
+    for pair, (observed, e, p) in expected.items():
+        assert actual[pair][0] == observed
+        assert actual[pair][1] == pytest.approx(e)
+        assert actual[pair][2] == pytest.approx(p)
+    assert df['p_value'].is_monotonic_increasing
+
+    subset = find_avoidance_pairs(matrix, chapters=range(1, 38))
+    assert subset.equals(find_avoidance_pairs(matrix.for_chapters(range(1, 38))))
+
+
+def test_bootstrap_intervals_and_worker_independence(characters):
+    from statistical_analysis import bootstrap_category_clustering, analyze_category_clustering
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    df = bootstrap_category_clustering(matrix, n_resamples=300, seed=5, n_workers=1,
+                                       chunk_size=64)
+
+    point = analyze_category_clustering(matrix)
+    assert df['category'].tolist() == list(point)
+    for row in df.itertuples():
+        assert row.within_category == point[row.category]['within_category']
+        assert row.total == point[row.category]['total']
+        assert row.within_proportion == pytest.approx(point[row.category]['within_proportion'])
+    assert (df['ci_low'] <= df['ci_high']).all()
+    assert (df['std_error'] > 0).all()
+    inside = (df['ci_low'] <= df['within_proportion']) & (df['within_proportion'] <= df['ci_high'])
+    assert inside.mean() > 0.8
+
+    parallel = bootstrap_category_clustering(matrix, n_resamples=300, seed=5, n_workers=2,
+                                             chunk_size=64)
+    assert parallel.equals(df)
+    assert not bootstrap_category_clustering(matrix, n_resamples=300, seed=6, n_workers=1,
+                                             chunk_size=64).equals(df)
+
+
+def test_bootstrap_of_a_single_block_has_no_spread(characters):
+    from statistical_analysis import bootstrap_category_clustering
+
+    matrix = RadicalCoOccurrenceMatrix(characters, window_size=5)
+    df = bootstrap_category_clustering(matrix, n_resamples=20, block_size=10 ** 6, n_workers=1)
+    populated = df[df['total'] > 0]
+    np.testing.assert_allclose(populated['ci_low'], populated['within_proportion'])
+    np.testing.assert_allclose(populated['ci_high'], populated['within_proportion'])
+    np.testing.assert_allclose(populated['std_error'], 0, atol=1e-12)
@@ -0,0 +1,120 @@
+"""
+Tests for the translation engine's layer output
+"""
+
+import pytest
+
+from translation_engine import TranslationEngine, CHARACTER_OPERATIONS
+
+
+def reference_layers(text: str):
+    """The original four per-character loops over the raw database dicts."""
+    db = CHARACTER_OPERATIONS
+
+    breakdown = " ".join(
+        f"{c}[{'+'.join([r['radical'] for r in db[c]['radicals']])}]" if c in db else c
+        for c in text)
+    operations = "\n".join(
+        f"{c}: [{' + '.join([r['operation'] for r in db[c]['radicals']])}]" if c in db else c
+        for c in text)
+    formulas = "\n".join(f"{c} = {db[c]['formula']}" if c in db else c for c in text)
+
+    topo_sequence = [db[c]['topo_type'] if c in db else '?' for c in text]
+    detected = []
+    if 'O' in topo_sequence and 'G' in topo_sequence and 'P' in topo_sequence:
+        detected.append("O→G→P cycle detected")
+    if '無' in text and '為' in text:
+        detected.append("Transformation pair (無/為) detected")
+    patterns = f"Topological sequence: {' → '.join(topo_sequence)}\n"
+    if detected:
+        patterns += "Patterns detected:\n" + "\n".join(f"  - {p}" for p in detected)
+
+    return [breakdown, operations, formulas, patterns]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return TranslationEngine()
+
+
+@pytest.mark.parametrize("text", ["道可道", "無名天地之始", "為無為則無不治", "", "xyz"])
+def test_layers_match_reference(engine, text):
+    layers = engine.translate_multilayer(text)
+    assert [layer.level for layer in layers] == ["character_breakdown", "radical_operations",
+                                                 "structural_mechanics", "pattern_recognition"]
+    assert [layer.content for layer in layers] == reference_layers(text)
+
+
+def test_full_text_layers_match_reference(engine, characters):
+    text = "".join(characters.chars)
+    assert [layer.content for layer in engine.translate_multilayer(text)] == reference_layers(text)
+
+
+def test_layer_selection_and_streaming(engine, characters):
+    text = "".join(characters.chars)[:1000]
+    full = engine.translate_multilayer(text)
+
+    selected = engine.translate_multilayer(text, layers=["pattern_recognition",
+                                                         "character_breakdown"])
+    assert [layer.content for layer in selected] == [full[3].content, full[0].content]
+
+    chunks = list(engine.iter_translations(text, chunk_size=300))
+    assert "".join(chunk for chunk, _ in chunks) == text
+    assert chunks[0][1][0].content == engine.translate_multilayer(text[:300])[0].content
+
+
+def test_fallback_table_follows_direct_map_edits(tmp_path, characters, restore_dictionary):
+    import radical_dictionary
+
+    engine = TranslationEngine(fallback=True, cache_dir=tmp_path)
+    char = next(c for c in characters.char_vocab
+                if c not in engine.structures and c in radical_dictionary.RADICAL_MAP)
+    before = engine.analyze_character(char)
+
+    # Edit the map directly, without register_character() or rebuild_indexes();
+    # the next translation notices it
+    radical_dictionary.RADICAL_MAP[char] = ['水', '木']
+    engine.translate_multilayer(char)
+    after = engine.analyze_character(char)
+    assert after is not before
+    assert [op.radical for op in after.radicals] == ['水', '木']
+
+    # Registered edits are seen by the next lookup without any translation
+    radical_dictionary.register_character(char, ['火'])
+    assert [op.radical for op in engine.analyze_character(char).radicals] == ['火']
+
+
+def test_dictionary_is_checked_once_per_call(tmp_path, monkeypatch, characters):
+    import translation_engine
+
+    checks = []
+    real_version = translation_engine.dictionary_version
+
+    def counting_version(check=True):
+        checks.append(check)
+        return real_version(check)
+
+    monkeypatch.setattr(translation_engine, 'dictionary_version', counting_version)
+    engine = TranslationEngine(fallback=True, cache_dir=tmp_path)
+    text = "".join(characters.chars[:600])
+
+    list(engine.iter_translations(text, chunk_size=50))
+    assert checks.count(True) == 1
+
+    checks.clear()
+    for char in text:
+        engine.analyze_character(char)
+    assert True not in checks
+
+
+def test_structures_pickle_and_deepcopy(engine):
+    import copy
+    import pickle
+
+    structure = engine.analyze_character('道')
+    for clone in (pickle.loads(pickle.dumps(structure)), copy.deepcopy(structure),
+                  copy.copy(structure)):
+        assert clone == structure
+        assert clone.radicals[0] == structure.radicals[0]
+        with pytest.raises(AttributeError):
+            clone.char = '德'
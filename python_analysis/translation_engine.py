@@ -3,31 +3,63 @@ Translation Engine: Multi-layer structural decoder for Dao De Jing
 Reveals the operational mechanics encoded in radical composition
 """
 
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Mapping, Iterable, Iterator, Union
 from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+import hashlib
 import json
+import os
 
-from radical_dictionary import get_radicals, get_radical_category, RADICAL_CATEGORIES
+from radical_dictionary import (get_radicals, get_radical_category, dictionary_version,
+                                RADICAL_CATEGORIES, RADICAL_MAP)
 
+# Bump whenever synthesize_entry changes so cached fallback entries are rebuilt
+FALLBACK_VERSION = 1
 
-@dataclass
-class RadicalOperation:
+# Synthesized fallback entries are cached here, keyed on the radical dictionary's content hash
+FALLBACK_CACHE_DIR = Path(__file__).parent / ".cache" / "structures"
+
+
+class _FrozenSlots:
+    """
+    Pickle and copy support for frozen dataclasses with __slots__.
+
+    The default slot state is restored with setattr, which frozen dataclasses
+    reject, so the state is a plain tuple written back with object.__setattr__.
+    """
+    __slots__ = ()
+
+    def __getstate__(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+
+@dataclass(frozen=True)
+class RadicalOperation(_FrozenSlots):
     """Represents what a radical DOES in context"""
+    __slots__ = ('radical', 'category', 'operation', 'position')
+
     radical: str
     category: str
     operation: str  # What transformation/action it marks
     position: str   # Where it sits in the character (left, right, top, bottom, surround)
 
 
-@dataclass
-class CharacterStructure:
-    """Complete structural analysis of a character"""
+@dataclass(frozen=True)
+class CharacterStructure(_FrozenSlots):
+    """Complete structural analysis of a character (immutable, shared between calls)"""
+    __slots__ = ('char', 'radicals', 'composition', 'structural_formula', 'slot_grammar',
+                 'topological_type')
+
     char: str
-    radicals: List[RadicalOperation]
+    radicals: Tuple[RadicalOperation, ...]
     composition: str  # How radicals combine: "left+right", "top+bottom", "surround+inside"
     structural_formula: str  # What it builds: "Process(continuous, primary)"
-    slot_grammar: List[str]  # Grammatical roles: ["operation", "context"]
+    slot_grammar: Tuple[str, ...]  # Grammatical roles: ["operation", "context"]
     topological_type: str  # P, O, G, frame, perception, etc.
 
 
@@ -984,143 +1016,217 @@ PATTERN_TEMPLATES = {
 }
 
 
-class TranslationEngine:
-    """Multi-layer translation engine for Dao De Jing"""
+def compile_character_db(character_db: Dict[str, Dict]) -> Mapping[str, CharacterStructure]:
+    """
+    Convert a character operation database into immutable structures.
 
-    def __init__(self):
-        self.character_db = CHARACTER_OPERATIONS
-        self.pattern_templates = PATTERN_TEMPLATES
+    Args:
+        character_db: Character → entry dictionary in the CHARACTER_OPERATIONS format
 
-    def analyze_character(self, char: str) -> Optional[CharacterStructure]:
-        """Get complete structural analysis of a character"""
-        if char not in self.character_db:
-            return None
-
-        data = self.character_db[char]
-
-        radical_ops = [
-            RadicalOperation(
-                radical=r['radical'],
-                category=r['category'],
-                operation=r['operation'],
-                position=r['position']
-            )
-            for r in data['radicals']
-        ]
-
-        return CharacterStructure(
+    Returns:
+        Read-only mapping of character → CharacterStructure
+    """
+    compiled = {}
+    for char, data in character_db.items():
+        compiled[char] = CharacterStructure(
             char=char,
-            radicals=radical_ops,
+            radicals=tuple(
+                RadicalOperation(
+                    radical=r['radical'],
+                    category=r['category'],
+                    operation=r['operation'],
+                    position=r['position']
+                )
+                for r in data['radicals']
+            ),
             composition=data['composition'],
             structural_formula=data['formula'],
-            slot_grammar=data['slot_grammar'],
+            slot_grammar=tuple(data['slot_grammar']),
             topological_type=data['topo_type']
         )
 
-    def translate_multilayer(self, text: str, context: Dict = None) -> List[TranslationLayer]:
-        """
-        Generate multi-layer translation of a text passage
+    return MappingProxyType(compiled)
 
-        Args:
-            text: Chinese text to translate
-            context: Chapter number, position, etc.
 
-        Returns:
-            List of translation layers (surface, operational, structural, pattern)
-        """
-        layers = []
-
-        # Layer 1: Character breakdown
-        char_breakdown = self._layer_character_breakdown(text)
-        layers.append(TranslationLayer(
-            level="character_breakdown",
-            content=char_breakdown,
-            annotations={}
-        ))
-
-        # Layer 2: Radical operations
-        radical_ops = self._layer_radical_operations(text)
-        layers.append(TranslationLayer(
-            level="radical_operations",
-            content=radical_ops,
-            annotations={}
-        ))
-
-        # Layer 3: Structural mechanics
-        structural = self._layer_structural_mechanics(text)
-        layers.append(TranslationLayer(
-            level="structural_mechanics",
-            content=structural,
-            annotations={}
-        ))
-
-        # Layer 4: Pattern recognition
-        patterns = self._layer_pattern_recognition(text)
-        layers.append(TranslationLayer(
-            level="pattern_recognition",
-            content=patterns,
-            annotations={}
-        ))
-
-        return layers
+def synthesize_entry(char: str) -> Optional[Dict]:
+    """
+    Partial database entry for a character from radical_dictionary alone.
 
-    def _layer_character_breakdown(self, text: str) -> str:
-        """Layer 1: Show each character with its radicals"""
-        breakdown = []
+    Radicals and categories come from RADICAL_MAP and RADICAL_CATEGORIES;
+    operations are the category descriptions, and the curated fields
+    (positions, grammar slots, topological type) are left unknown.
 
-        for char in text:
-            if char in self.character_db:
-                data = self.character_db[char]
-                rad_str = "+".join([r['radical'] for r in data['radicals']])
-                breakdown.append(f"{char}[{rad_str}]")
-            else:
-                breakdown.append(char)
+    Args:
+        char: Character to decompose
 
-        return " ".join(breakdown)
+    Returns:
+        Entry in the CHARACTER_OPERATIONS format, or None if the character
+        is not in RADICAL_MAP
+    """
+    radicals = get_radicals(char)
+    if not radicals:
+        return None
 
-    def _layer_radical_operations(self, text: str) -> str:
-        """Layer 2: Show what each radical is DOING"""
-        operations = []
+    categories = [get_radical_category(r) for r in radicals]
+    return {
+        'radicals': [
+            {'radical': radical, 'category': category,
+             'operation': RADICAL_CATEGORIES.get(category, {}).get('description', category),
+             'position': 'unknown'}
+            for radical, category in zip(radicals, categories)
+        ],
+        'composition': "+".join(categories),
+        'formula': "Partial(" + ", ".join(f"{category}={radical}"
+                                         for radical, category in zip(radicals, categories)) + ")",
+        'slot_grammar': [],
+        'topo_type': '?',
+    }
 
-        for char in text:
-            if char in self.character_db:
-                data = self.character_db[char]
-                ops = " + ".join([r['operation'] for r in data['radicals']])
-                operations.append(f"{char}: [{ops}]")
-            else:
-                operations.append(char)
 
-        return "\n".join(operations)
+def synthesize_structure(char: str) -> Optional[CharacterStructure]:
+    """
+    Partial structure for a character from radical_dictionary alone.
 
-    def _layer_structural_mechanics(self, text: str) -> str:
-        """Layer 3: Show the structural formula"""
-        formulas = []
+    Args:
+        char: Character to decompose
 
-        for char in text:
-            if char in self.character_db:
-                data = self.character_db[char]
-                formulas.append(f"{char} = {data['formula']}")
-            else:
-                formulas.append(char)
+    Returns:
+        CharacterStructure, or None if the character is not in RADICAL_MAP
+    """
+    entry = synthesize_entry(char)
+    if entry is None:
+        return None
+    return compile_character_db({char: entry})[char]
 
-        return "\n".join(formulas)
 
-    def _layer_pattern_recognition(self, text: str) -> str:
-        """Layer 4: Identify structural patterns in the sequence"""
-        # Get topological types for each character
-        topo_sequence = []
+def dictionary_hash() -> str:
+    """SHA-256 hex digest of RADICAL_MAP and RADICAL_CATEGORIES."""
+    content = json.dumps([RADICAL_MAP, RADICAL_CATEGORIES], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def fallback_cache_path(source_hash: str, cache_dir: Optional[Path] = None) -> Path:
+    """Cache file for the given dictionary hash under the current fallback version."""
+    cache_dir = Path(cache_dir) if cache_dir is not None else FALLBACK_CACHE_DIR
+    return cache_dir / f"fallback-{source_hash[:16]}-v{FALLBACK_VERSION}.json"
+
+
+def load_fallback_db(use_cache: bool = True, cache_dir: Optional[Path] = None) -> Dict[str, Dict]:
+    """
+    Synthesized entries for every character in RADICAL_MAP.
+
+    The entries are cached on disk as JSON, keyed on the dictionary's content
+    hash and FALLBACK_VERSION, so later runs read them instead of rebuilding.
+
+    Args:
+        use_cache: Read and write the on-disk cache
+        cache_dir: Cache directory (defaults to FALLBACK_CACHE_DIR)
+
+    Returns:
+        Character → entry dictionary in the CHARACTER_OPERATIONS format
+    """
+    cache_path = fallback_cache_path(dictionary_hash(), cache_dir) if use_cache else None
+
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    entries = {}
+    for char in RADICAL_MAP:
+        entry = synthesize_entry(char)
+        if entry is not None:
+            entries[char] = entry
+
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so a crash never leaves a truncated cache
+            tmp_path = cache_path.with_name(cache_path.name + f".{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # A read-only checkout still synthesizes, it just can't cache
+
+    return entries
+
+
+class LayerBuilder:
+    """
+    Builds one translation layer while the engine walks the text.
+
+    token() turns each character (and its structure, or None if the
+    character is unknown) into a token; finish() joins the tokens into the
+    layer's content. Tokens must depend only on the character, since the
+    engine memoizes them.
+    """
+
+    level = ""
+    separator = "\n"
+
+    def token(self, char: str, structure: Optional[CharacterStructure]) -> str:
+        """Token for one character (the bare character by default)."""
+        return char
+
+    def finish(self, tokens: Tuple[str, ...], text: str) -> str:
+        """Layer content from the tokens of every character in text."""
+        return self.separator.join(tokens)
 
-        for char in text:
-            if char in self.character_db:
-                topo_sequence.append(self.character_db[char]['topo_type'])
-            else:
-                topo_sequence.append('?')
 
-        pattern_str = " → ".join(topo_sequence)
+class CharacterBreakdownLayer(LayerBuilder):
+    """Layer 1: Show each character with its radicals"""
+
+    level = "character_breakdown"
+    separator = " "
+
+    def token(self, char: str, structure: Optional[CharacterStructure]) -> str:
+        if structure is None:
+            return char
+        rad_str = "+".join([r.radical for r in structure.radicals])
+        return f"{char}[{rad_str}]"
+
+
+class RadicalOperationsLayer(LayerBuilder):
+    """Layer 2: Show what each radical is DOING"""
+
+    level = "radical_operations"
+
+    def token(self, char: str, structure: Optional[CharacterStructure]) -> str:
+        if structure is None:
+            return char
+        ops = " + ".join([r.operation for r in structure.radicals])
+        return f"{char}: [{ops}]"
+
+
+class StructuralMechanicsLayer(LayerBuilder):
+    """Layer 3: Show the structural formula"""
+
+    level = "structural_mechanics"
+
+    def token(self, char: str, structure: Optional[CharacterStructure]) -> str:
+        if structure is None:
+            return char
+        return f"{char} = {structure.structural_formula}"
+
+
+class PatternRecognitionLayer(LayerBuilder):
+    """Layer 4: Identify structural patterns in the sequence"""
+
+    level = "pattern_recognition"
+
+    def token(self, char: str, structure: Optional[CharacterStructure]) -> str:
+        return structure.topological_type if structure is not None else '?'
+
+    def finish(self, tokens: Tuple[str, ...], text: str) -> str:
+        pattern_str = " → ".join(tokens)
 
         # Check for known patterns
+        topo_types = set(tokens)
         detected_patterns = []
-        if 'O' in topo_sequence and 'G' in topo_sequence and 'P' in topo_sequence:
+        if 'O' in topo_types and 'G' in topo_types and 'P' in topo_types:
             detected_patterns.append("O→G→P cycle detected")
 
         if '無' in text and '為' in text:
@@ -1133,6 +1239,241 @@ class TranslationEngine:
         return result
 
 
+# Layer builders every new engine starts with, in output order
+LAYER_BUILDERS: Dict[str, type] = {
+    CharacterBreakdownLayer.level: CharacterBreakdownLayer,
+    RadicalOperationsLayer.level: RadicalOperationsLayer,
+    StructuralMechanicsLayer.level: StructuralMechanicsLayer,
+    PatternRecognitionLayer.level: PatternRecognitionLayer,
+}
+
+
+def register_layer(builder: type):
+    """
+    Add (or replace) a translation layer for engines created from now on.
+
+    Args:
+        builder: LayerBuilder subclass; its level names the layer
+    """
+    LAYER_BUILDERS[builder.level] = builder
+
+
+class TranslationEngine:
+    """Multi-layer translation engine for Dao De Jing"""
+
+    def __init__(self, character_db: Optional[Dict[str, Dict]] = None,
+                 fallback: bool = False, cache_dir: Optional[Path] = None):
+        """
+        Args:
+            character_db: Character operation database (default: CHARACTER_OPERATIONS)
+            fallback: Translate characters outside the database with partial
+                structures synthesized from radical_dictionary
+            cache_dir: Cache directory for synthesized entries (defaults to
+                FALLBACK_CACHE_DIR)
+        """
+        self.character_db = CHARACTER_OPERATIONS if character_db is None else character_db
+        self.pattern_templates = PATTERN_TEMPLATES
+        self.fallback = fallback
+        self.cache_dir = cache_dir
+
+        # Every layer reads from this compiled form, never from the raw dicts
+        self.structures = compile_character_db(self.character_db)
+
+        # Curated and synthesized structures in one table, built on first use
+        # and rebuilt when the radical dictionary's contents change
+        self._fallback_table: Mapping[str, CharacterStructure] = self.structures
+        self._fallback_version = None
+
+        self.layer_builders: Dict[str, LayerBuilder] = {
+            level: builder() for level, builder in LAYER_BUILDERS.items()
+        }
+        self._token_rows: Dict[Tuple[str, ...], Dict[str, Tuple[str, ...]]] = {}
+
+    def analyze_character(self, char: str, fallback: Optional[bool] = None) -> Optional[CharacterStructure]:
+        """
+        Get complete structural analysis of a character
+
+        Args:
+            char: Character to analyze
+            fallback: For characters outside the database, return a partial
+                structure synthesized from radical_dictionary instead of None
+                (default: the engine's fallback setting)
+
+        Returns:
+            Shared, immutable CharacterStructure, or None if the character is unknown
+        """
+        if fallback is None:
+            fallback = self.fallback
+        if not fallback:
+            return self.structures.get(char)
+
+        # A plain dict lookup: register_* edits bump the counter and are seen
+        # here; direct edits to the maps are picked up by the next
+        # lookup_table() call (every translation makes one)
+        if self._fallback_version != dictionary_version(check=False):
+            return self.lookup_table(fallback=True).get(char)
+        return self._fallback_table.get(char)
+
+    def lookup_table(self, fallback: Optional[bool] = None) -> Mapping[str, CharacterStructure]:
+        """
+        Character → structure table used by analyze_character and the layers.
+
+        The table is rebuilt whenever dictionary_version() changes, which
+        includes direct edits to RADICAL_MAP and RADICAL_CATEGORIES; its
+        synthesized entries come from the disk cache for the dictionary's
+        content hash (see load_fallback_db). Checking for direct edits costs
+        a pass over the dictionary, so callers fetch the table once per
+        text or batch rather than once per character.
+
+        Args:
+            fallback: Include synthesized structures (default: the engine's
+                fallback setting)
+
+        Returns:
+            Read-only mapping; curated entries take precedence
+        """
+        if fallback is None:
+            fallback = self.fallback
+        if not fallback:
+            return self.structures
+
+        version = dictionary_version()
+        if self._fallback_version != version:
+            synthesized = load_fallback_db(cache_dir=self.cache_dir)
+            table = dict(compile_character_db(synthesized))
+            table.update(self.structures)
+            self._fallback_table = MappingProxyType(table)
+            self._fallback_version = version
+            self._token_rows.clear()
+        return self._fallback_table
+
+    def coverage(self, text: str) -> Dict[str, int]:
+        """
+        How many characters of a text are curated, synthesized or unknown.
+
+        Args:
+            text: Chinese text
+
+        Returns:
+            Dictionary with 'curated', 'synthesized' and 'missing' counts
+        """
+        table = self.lookup_table(fallback=True)
+        curated = sum(char in self.structures for char in text)
+        known = sum(char in table for char in text)
+        return {'curated': curated, 'synthesized': known - curated, 'missing': len(text) - known}
+
+    def translate_multilayer(self, text: str, context: Dict = None,
+                             layers: Optional[List[str]] = None) -> List[TranslationLayer]:
+        """
+        Generate multi-layer translation of a text passage
+
+        The text is walked once; each character's structure is looked up a
+        single time and handed to every requested layer builder.
+
+        Args:
+            text: Chinese text to translate
+            context: Chapter number, position, etc.
+            layers: Layer levels to build, in output order (default: all
+                layers in self.layer_builders)
+
+        Returns:
+            List of translation layers (surface, operational, structural, pattern)
+        """
+        return self._translate(text, self._select_layers(layers), self.lookup_table())
+
+    def _translate(self, text: str, builders: List['LayerBuilder'],
+                   structures: Mapping[str, CharacterStructure]) -> List[TranslationLayer]:
+        """translate_multilayer with the layers and lookup table already resolved."""
+        # Token rows (one token per layer) are memoized per layer selection,
+        # so a character seen before costs a single dict lookup
+        key = tuple(builder.level for builder in builders)
+        row_cache = self._token_rows.get(key)
+        if row_cache is None:
+            row_cache = self._token_rows[key] = {}
+
+        rows = []
+        for char in text:
+            row = row_cache.get(char)
+            if row is None:
+                structure = structures.get(char)
+                row = row_cache[char] = tuple(builder.token(char, structure)
+                                              for builder in builders)
+            rows.append(row)
+
+        tokens = list(zip(*rows)) if rows else [()] * len(builders)
+
+        return [
+            TranslationLayer(level=builder.level, content=builder.finish(layer_tokens, text),
+                             annotations={})
+            for builder, layer_tokens in zip(builders, tokens)
+        ]
+
+    def iter_translations(self, text: Union[str, Iterable[str]], chunk_size: int = 500,
+                          layers: Optional[List[str]] = None
+                          ) -> Iterator[Tuple[str, List[TranslationLayer]]]:
+        """
+        Translate a long text chunk by chunk, yielding each chunk's layers as it is done.
+
+        Args:
+            text: Text to split into chunk_size characters, or an iterable of
+                chunks (e.g. chapters or clauses) to translate as given
+            chunk_size: Characters per chunk when text is a string
+            layers: Layer levels to build (default: all)
+
+        Yields:
+            Tuples of (chunk text, list of translation layers)
+        """
+        if isinstance(text, str):
+            chunks = (text[i:i + chunk_size] for i in range(0, len(text), chunk_size))
+        else:
+            chunks = text
+
+        # The dictionary is checked once for the whole run, not per chunk
+        builders = self._select_layers(layers)
+        structures = self.lookup_table()
+        for chunk in chunks:
+            yield chunk, self._translate(chunk, builders, structures)
+
+    def add_layer(self, builder: 'LayerBuilder'):
+        """
+        Add (or replace) a layer builder on this engine only.
+
+        Args:
+            builder: LayerBuilder instance; its level names the layer
+        """
+        self.layer_builders[builder.level] = builder
+        self._token_rows.clear()
+
+    def _select_layers(self, layers: Optional[List[str]]) -> List['LayerBuilder']:
+        if layers is None:
+            return list(self.layer_builders.values())
+
+        unknown = [level for level in layers if level not in self.layer_builders]
+        if unknown:
+            raise ValueError(f"Unknown layers: {unknown} "
+                             f"(expected any of {list(self.layer_builders)})")
+        return [self.layer_builders[level] for level in layers]
+
+    def _layer_content(self, level: str, text: str) -> str:
+        return self.translate_multilayer(text, layers=[level])[0].content
+
+    def _layer_character_breakdown(self, text: str) -> str:
+        """Layer 1: Show each character with its radicals"""
+        return self._layer_content("character_breakdown", text)
+
+    def _layer_radical_operations(self, text: str) -> str:
+        """Layer 2: Show what each radical is DOING"""
+        return self._layer_content("radical_operations", text)
+
+    def _layer_structural_mechanics(self, text: str) -> str:
+        """Layer 3: Show the structural formula"""
+        return self._layer_content("structural_mechanics", text)
+
+    def _layer_pattern_recognition(self, text: str) -> str:
+        """Layer 4: Identify structural patterns in the sequence"""
+        return self._layer_content("pattern_recognition", text)
+
+
 if __name__ == "__main__":
     engine = TranslationEngine()
 
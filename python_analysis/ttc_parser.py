@@ -3,12 +3,29 @@ Parser for Dao De Jing CSV file - extracts characters with position information
 """
 
 import csv
-from typing import List, Dict, Tuple
+import hashlib
+import os
+import zipfile
+import numpy as np
+from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 
+from radical_dictionary import get_radicals
+from cooccurrence_engine import expand_radicals
+
+# Bump whenever parsing rules change so cached corpora are rebuilt
+PARSER_VERSION = 2
+
+# Parsed corpora are cached here, keyed on the source CSV's content hash
+CACHE_DIR = Path(__file__).parent / ".cache" / "corpus"
+
+_CORPUS_ARRAYS = ('char_ids', 'pinyin_ids', 'chapters', 'positions', 'global_positions')
+
 
 class Character:
     """Represents a character with its position in the text."""
+    __slots__ = ('char', 'pinyin', 'chapter', 'position', 'global_position')
+
     def __init__(self, char: str, pinyin: str, chapter: int, position: int):
         self.char = char
         self.pinyin = pinyin
@@ -20,61 +37,300 @@ class Character:
         return f"Character({self.char}, ch{self.chapter}:{self.position})"
 
 
-def parse_ttc_csv(csv_path: str) -> List[Character]:
+class Corpus:
+    """
+    Columnar representation of the parsed text.
+
+    Stores one entry per character in parallel integer arrays (character id,
+    pinyin id, chapter, position, global position) with the distinct characters
+    and pinyin readings held once in vocabulary lists. Indexing or iterating
+    yields Character views, so code written against a list of Character
+    objects keeps working.
+    """
+
+    def __init__(
+        self,
+        char_vocab: List[str],
+        pinyin_vocab: List[str],
+        char_ids: np.ndarray,
+        pinyin_ids: np.ndarray,
+        chapters: np.ndarray,
+        positions: np.ndarray,
+        global_positions: np.ndarray
+    ):
+        """
+        Args:
+            char_vocab: Distinct characters (index = character id)
+            pinyin_vocab: Distinct pinyin readings (index = pinyin id)
+            char_ids: Character id of each entry
+            pinyin_ids: Pinyin id of each entry
+            chapters: Chapter of each entry
+            positions: Position within chapter of each entry
+            global_positions: Global position of each entry
+        """
+        self.char_vocab = char_vocab
+        self.pinyin_vocab = pinyin_vocab
+        self.char_ids = np.asarray(char_ids, dtype=np.int32)
+        self.pinyin_ids = np.asarray(pinyin_ids, dtype=np.int32)
+        self.chapters = np.asarray(chapters, dtype=np.int32)
+        self.positions = np.asarray(positions, dtype=np.int32)
+        self.global_positions = np.asarray(global_positions, dtype=np.int64)
+
+    @classmethod
+    def from_characters(cls, characters: List[Character]) -> "Corpus":
+        """Build a Corpus from a list of Character objects (returned as-is if already one)."""
+        if isinstance(characters, Corpus):
+            return characters
+
+        char_to_id = {}
+        pinyin_to_id = {}
+        columns = ([], [], [], [], [])
+
+        for c in characters:
+            columns[0].append(char_to_id.setdefault(c.char, len(char_to_id)))
+            columns[1].append(pinyin_to_id.setdefault(c.pinyin, len(pinyin_to_id)))
+            columns[2].append(c.chapter)
+            columns[3].append(c.position)
+            columns[4].append(c.global_position)
+
+        return cls(list(char_to_id), list(pinyin_to_id), *columns)
+
+    def __len__(self) -> int:
+        return len(self.char_ids)
+
+    def _view(self, idx: int) -> Character:
+        character = Character(
+            self.char_vocab[self.char_ids[idx]],
+            self.pinyin_vocab[self.pinyin_ids[idx]],
+            int(self.chapters[idx]),
+            int(self.positions[idx])
+        )
+        character.global_position = int(self.global_positions[idx])
+        return character
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._view(i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("Corpus index out of range")
+        return self._view(idx)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self._view(idx)
+
+    def __repr__(self):
+        return f"Corpus({len(self)} characters, {len(self.char_vocab)} unique)"
+
+    def save(self, path: str, source_hash: str = ""):
+        """
+        Write the corpus to an uncompressed .npz file.
+
+        Args:
+            path: Destination file
+            source_hash: Content hash of the CSV the corpus was parsed from
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so a crash never leaves a truncated cache
+        tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                parser_version=np.array(PARSER_VERSION),
+                source_hash=np.array(source_hash),
+                char_vocab=np.array(self.char_vocab, dtype=str),
+                pinyin_vocab=np.array(self.pinyin_vocab, dtype=str),
+                **{name: getattr(self, name) for name in _CORPUS_ARRAYS}
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, source_hash: Optional[str] = None) -> Optional["Corpus"]:
+        """
+        Read a corpus written by save().
+
+        Args:
+            path: Cache file
+            source_hash: If given, the content hash the cache must have been built from
+
+        Returns:
+            Corpus, or None if the file is missing, unreadable or stale
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data['parser_version']) != PARSER_VERSION:
+                    return None
+                if source_hash is not None and str(data['source_hash']) != source_hash:
+                    return None
+
+                return cls(
+                    data['char_vocab'].tolist(),
+                    data['pinyin_vocab'].tolist(),
+                    *(data[name] for name in _CORPUS_ARRAYS)
+                )
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            # A missing, truncated or corrupt cache is a miss and gets rebuilt
+            return None
+
+    @property
+    def chars(self) -> np.ndarray:
+        """Character string of each entry, as an object array."""
+        return np.asarray(self.char_vocab, dtype=object)[self.char_ids]
+
+    def radical_table(self) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        CSR-style table of the radicals in each distinct character.
+
+        Radicals are read from radical_dictionary on every call, so the table
+        always reflects the current RADICAL_MAP.
+
+        Returns:
+            Tuple of (indptr, radical ids, sorted unique radicals). The radicals
+            of character id c are radical ids[indptr[c]:indptr[c + 1]].
+        """
+        char_radicals = [get_radicals(char) for char in self.char_vocab]
+        unique_radicals = sorted({r for radicals in char_radicals for r in radicals})
+        radical_to_id = {radical: idx for idx, radical in enumerate(unique_radicals)}
+
+        indptr = np.zeros(len(char_radicals) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(radicals) for radicals in char_radicals])
+        indices = np.fromiter(
+            (radical_to_id[r] for radicals in char_radicals for r in radicals),
+            dtype=np.int64, count=int(indptr[-1])
+        )
+
+        return indptr, indices, unique_radicals
+
+    def radical_occurrences(self) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Expand the text into one entry per radical occurrence.
+
+        Returns:
+            Tuple of (corpus index of each occurrence, radical id of each
+            occurrence, sorted unique radicals). Occurrences are in text order,
+            with a character's radicals in dictionary order.
+        """
+        indptr, indices, unique_radicals = self.radical_table()
+        entry_index, radical_ids = expand_radicals(self.char_ids, indptr, indices)
+        return entry_index, radical_ids, unique_radicals
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def corpus_cache_path(csv_path: str, source_hash: str, cache_dir: Optional[Path] = None) -> Path:
+    """Cache file for a CSV with the given content hash under the current parser version."""
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    return cache_dir / f"{Path(csv_path).stem}-{source_hash[:16]}-v{PARSER_VERSION}.npz"
+
+
+def parse_ttc_csv(csv_path: str, use_cache: bool = True, cache_dir: Optional[Path] = None) -> Corpus:
     """
     Parse the TTC CSV file and extract all characters with their positions.
 
+    The parsed corpus is cached on disk as .npz, keyed on the CSV's content hash
+    and PARSER_VERSION, so later runs load the arrays instead of re-parsing.
+
     Args:
         csv_path: Path to the CSV file
+        use_cache: Read and write the on-disk corpus cache
+        cache_dir: Cache directory (defaults to CACHE_DIR)
 
     Returns:
-        List of Character objects ordered by appearance in the text
+        Corpus of characters ordered by appearance in the text (indexes and
+        iterates as Character objects)
     """
-    characters = []
-    global_position = 0
+    if not use_cache:
+        return _parse_csv(csv_path)
+
+    source_hash = file_hash(csv_path)
+    cache_path = corpus_cache_path(csv_path, source_hash, cache_dir)
+
+    corpus = Corpus.load(cache_path, source_hash)
+    if corpus is None:
+        corpus = _parse_csv(csv_path)
+        try:
+            corpus.save(cache_path, source_hash)
+        except OSError:
+            pass  # A read-only checkout still parses, it just can't cache
+
+    return corpus
+
+
+def _parse_csv(csv_path: str) -> Corpus:
+    """Parse the TTC CSV file without consulting the cache."""
+    char_to_id = {}
+    pinyin_to_id = {}
+    char_ids = []
+    pinyin_ids = []
+    chapters = []
+    positions = []
+
+    def add(char: str, pinyin: str, chapter: int, position: int):
+        char_ids.append(char_to_id.setdefault(char, len(char_to_id)))
+        pinyin_ids.append(pinyin_to_id.setdefault(pinyin, len(pinyin_to_id)))
+        chapters.append(chapter)
+        positions.append(position)
 
     with open(csv_path, 'r', encoding='utf-8') as f:
         reader = csv.reader(f)
-        header = next(reader)  # Skip header row
+        header = next(reader)
+
+        # Each chapter is a (character, pinyin) column pair, read top to
+        # bottom; rows are line positions ("Loc"), not chapters
+        n_chapters = (len(header) - 1) // 2
+        columns = [[] for _ in range(n_chapters)]
 
-        for row_idx, row in enumerate(reader, start=1):
+        for row in reader:
             if not row or len(row) < 3:
                 continue
 
-            # First column is chapter number
+            # First column is the line position
             try:
-                chapter = int(row[0])
+                int(row[0])
             except (ValueError, IndexError):
                 continue
 
-            # Process character columns (odd indices: char, even indices: pinyin)
-            position = 1
-            for i in range(1, len(row), 2):
-                if i >= len(row) or i + 1 >= len(row):
-                    break
-
-                char = row[i].strip()
-                pinyin = row[i + 1].strip() if i + 1 < len(row) else ""
-
-                # Skip empty cells and multi-character entries (like "天下")
-                # We want individual characters only
-                if char and len(char) == 1 and char != '':
-                    character = Character(char, pinyin, chapter, position)
-                    character.global_position = global_position
-                    characters.append(character)
-                    global_position += 1
+            for chapter_idx in range(min(n_chapters, (len(row) - 1) // 2)):
+                i = 1 + 2 * chapter_idx
+                columns[chapter_idx].append((row[i].strip(), row[i + 1].strip()))
+
+    # Chapters are numbered by column pair; the header labels are not used
+    # because one of them is a stray character instead of its number
+    for chapter, cells in enumerate(columns, start=1):
+        position = 1
+        for char, pinyin in cells:
+            # Skip empty cells and multi-character entries (like "天下")
+            # We want individual characters only
+            if char and len(char) == 1 and char != '':
+                add(char, pinyin, chapter, position)
+                position += 1
+            # Handle multi-character entries by splitting them
+            elif char and len(char) > 1 and ' ' not in char:
+                # Split compound entries like "天下" into individual chars
+                for single_char in char:
+                    add(single_char, pinyin, chapter, position)
                     position += 1
-                # Handle multi-character entries by splitting them
-                elif char and len(char) > 1 and ' ' not in char:
-                    # Split compound entries like "天下" into individual chars
-                    for single_char in char:
-                        character = Character(single_char, pinyin, chapter, position)
-                        character.global_position = global_position
-                        characters.append(character)
-                        global_position += 1
-                        position += 1
 
-    return characters
+    return Corpus(
+        list(char_to_id),
+        list(pinyin_to_id),
+        char_ids,
+        pinyin_ids,
+        chapters,
+        positions,
+        np.arange(len(char_ids))
+    )
 
 
 def get_unique_characters(characters: List[Character]) -> Dict[str, int]:
@@ -82,11 +338,15 @@ def get_unique_characters(characters: List[Character]) -> Dict[str, int]:
     Get frequency count of unique characters.
 
     Args:
-        characters: List of Character objects
+        characters: Corpus or list of Character objects
 
     Returns:
         Dictionary mapping character to frequency count
     """
+    if isinstance(characters, Corpus):
+        counts = np.bincount(characters.char_ids, minlength=len(characters.char_vocab))
+        return {char: int(count) for char, count in zip(characters.char_vocab, counts) if count}
+
     freq = {}
     for char in characters:
         freq[char.char] = freq.get(char.char, 0) + 1
@@ -98,12 +358,17 @@ def get_character_positions(characters: List[Character], target_char: str) -> Li
     Get all positions where a character appears.
 
     Args:
-        characters: List of Character objects
+        characters: Corpus or list of Character objects
         target_char: Character to search for
 
     Returns:
         List of (chapter, position) tuples
     """
+    if isinstance(characters, Corpus):
+        # Answered from the corpus's cached inverted index (see corpus_index)
+        from corpus_index import get_index
+        return get_index(characters).entry_positions(target_char)
+
     positions = []
     for char in characters:
         if char.char == target_char:
@@ -8,7 +8,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable
 import matplotlib.patches as mpatches
 
 from ttc_parser import parse_ttc_csv
@@ -27,7 +27,8 @@ def create_heatmap(
     title: str = "Radical Co-occurrence Heat Map",
     figsize: tuple = (20, 18),
     normalize: bool = True,
-    min_count: int = 0
+    min_count: int = 0,
+    chapters: Optional[Iterable[int]] = None
 ):
     """
     Create a heat map of radical co-occurrences.
@@ -39,7 +40,11 @@ def create_heatmap(
         figsize: Figure size (width, height)
         normalize: Whether to normalize values
         min_count: Minimum co-occurrence count to display
+        chapters: Only count these chapters, e.g. range(1, 38)
     """
+    if chapters is not None:
+        matrix = matrix.for_chapters(chapters)
+
     # Get the matrix data
     if normalize:
         data = matrix.get_normalized_matrix()
@@ -50,6 +55,10 @@ def create_heatmap(
         cmap = "YlOrRd"
         vmax = None
 
+    # The plot is dense anyway; sparse columns don't support item assignment
+    if any(isinstance(dtype, pd.SparseDtype) for dtype in data.dtypes):
+        data = data.sparse.to_dense()
+
     # Filter by minimum count
     if min_count > 0:
         data = data.copy()
@@ -88,7 +97,8 @@ def create_heatmap(
 def create_category_heatmap(
     matrix: RadicalCoOccurrenceMatrix,
     output_path: str,
-    title: str = "Radical Category Co-occurrence"
+    title: str = "Radical Category Co-occurrence",
+    chapters: Optional[Iterable[int]] = None
 ):
     """
     Create a heat map showing co-occurrences by radical category.
@@ -97,7 +107,11 @@ def create_category_heatmap(
         matrix: RadicalCoOccurrenceMatrix object
         output_path: Path to save the figure
         title: Title for the plot
+        chapters: Only count these chapters, e.g. range(1, 38)
     """
+    if chapters is not None:
+        matrix = matrix.for_chapters(chapters)
+
     # Get category-level matrix
     cat_matrix = matrix.get_category_cooccurrence()
 
@@ -194,7 +208,8 @@ def create_focused_heatmap(
     matrix: RadicalCoOccurrenceMatrix,
     radicals: List[str],
     output_path: str,
-    title: str = "Focused Radical Co-occurrence"
+    title: str = "Focused Radical Co-occurrence",
+    chapters: Optional[Iterable[int]] = None
 ):
     """
     Create a heat map focusing on specific radicals of interest.
@@ -204,7 +219,11 @@ def create_focused_heatmap(
         radicals: List of radicals to focus on
         output_path: Path to save the figure
         title: Title for the plot
+        chapters: Only count these chapters, e.g. range(1, 38)
     """
+    if chapters is not None:
+        matrix = matrix.for_chapters(chapters)
+
     # Filter matrix to only include specified radicals
     available_radicals = [r for r in radicals if r in matrix.unique_radicals]
 